@@ -32,7 +32,8 @@ DATABASES = {
 }
 
 # Add a middleware class
-MIDDLEWARE += ['dps_main.utilities.middleware.DPSActionsMiddleWare']
+MIDDLEWARE += ['dps_main.utilities.middleware.DPSMetricsMiddleWare',
+               'dps_main.utilities.middleware.DPSProfilerMiddleWare']
 
 # A custom context processor
 TEMPLATES[0]['OPTIONS']['context_processors'] += ['dps_main.utilities.processors.get_factotum']
@@ -85,9 +86,68 @@ CACHEOPS = {
     'auth.user': {'ops': 'get', 'timeout': 60 * 15},
     'auth.*': {'ops': ('fetch', 'get')},
     'auth.permission': {'ops': 'all'},
+    # every promise write updates its cause's aggregates, which would drop every cached cause queryset. Cause reads
+    # are cached by key in `dependencies` and `twotier` instead, cacheops only keeps querysets joining causes in step
+    'dps_main.cause': {'ops': ()},
     'dps_main.*': {'ops': 'all'},
 }
 
+# Lifetime of the entries cached along with their dependencies, in seconds. Writes invalidate them long before
+DEPENDENCIES_TIMEOUT = 60 * 60
+
+# Leaderboards, the default and the maximum N for top-N reports
+LEADERBOARD_SIZE = 5
+LEADERBOARD_MAX_SIZE = 100
+
+# Lifetime of the per-user promised causes sets, in seconds
+PROMISED_CAUSES_TIMEOUT = 60 * 60
+
+# Asynchronous promise ingestion, promises are queued and written in batches by `manage.py ingestpromises`
+PROMISE_INGESTION_ASYNC = False
+PROMISE_INGESTION_STATUS_TIMEOUT = 60 * 60 * 24
+
+# Promise rollups, seconds a promise is left alone after it's modified before `manage.py rollpromises` rolls it up
+ROLLUP_LAG = 60
+
+# Promise analytics snapshot, where `manage.py snapshotpromises` keeps its column files and the seconds a promise is
+# left alone after it's modified before it's copied
+ANALYTICS_DIR = os.path.join(BASE_DIR, 'analytics')
+ANALYTICS_LAG = 60
+
+# Distinct donor sketches, the weeks a weekly sketch is kept after it was last added to
+DONOR_SKETCH_WEEKS = 104
+
+# Metrics, seconds between flushes of a process' samples to redis and the addresses allowed to scrape `/metrics`
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+# Stampede protection, per expensive read: seconds a value is fresh, seconds more it may be served stale while one
+# worker recomputes it, the early refresh factor (0 disables) and the seconds a recompute may hold the lock
+STAMPEDE_POLICIES = {
+    'top_causes': {'ttl': 60, 'stale': 600, 'beta': 1.0, 'lock_timeout': 30},
+    'cause_first_page': {'ttl': 30, 'stale': 300, 'beta': 1.0, 'lock_timeout': 30},
+    'top_causes_window': {'ttl': 60, 'stale': 600, 'beta': 1.0, 'lock_timeout': 30},
+}
+
+# Two-tier cache, the number of objects each process keeps and for how long in seconds
+TWO_TIER_CACHE_SIZE = 1000
+TWO_TIER_CACHE_TIMEOUT = 30
+
+# Anonymous page cache, the number of pages each process keeps and for how long in seconds, in redis too
+PAGE_CACHE_SIZE = 200
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# users are read through the two-tier cache, `ModelBackend` stays for sessions opened before it was added
+AUTHENTICATION_BACKENDS = [
+    'dps_main.utilities.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Request profiling, the share of requests profiled at random, and how long and how many profiles are kept
+PROFILER_SAMPLE_RATE = 0.0
+PROFILER_TIMEOUT = 60 * 60 * 24
+PROFILER_MAX_PROFILES = 100
+
 #
 LOGIN_URL = '/auth/login'
 LOGIN_REDIRECT_URL = '/'
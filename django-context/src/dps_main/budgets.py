@@ -0,0 +1,72 @@
+"""
+Cost budgets for the routes in `dps_main/urls.py`, enforced by `tests/functional/test_budgets.py`.
+Each budget caps the queries, cache misses and wall time of one request to a route, made on a small seeded dataset
+with warm caches (safe requests are made once before being measured). A budget is the route's count plus a margin of
+two queries, so an N+1 over a page of results, or a cache a route stopped hitting, blows past it.
+Every named route needs a budget or an entry in `EXEMPT` saying why it has none.
+Tighten a budget when a route gets cheaper, and only loosen one with a reason
+"""
+
+from collections import namedtuple
+
+__all__ = ['Budget', 'BUDGETS', 'EXEMPT']
+
+# `route` is a url name and `args` name fixtures the harness resolves:
+#   `cause` a cause the member can promise, `promised` a cause the member promised, `promise` the member's promise,
+#   `tracking` the tracking id of a promise the member queued, `window` a rollup window and `format` an export format.
+# `user` is one of None (anonymous), 'member' or 'admin'
+Budget = namedtuple('Budget', 'route args method user queries cache_misses seconds')
+
+BUDGETS = (
+    # auth
+    Budget('register', (), 'get', None, queries=2, cache_misses=0, seconds=1.0),
+    Budget('login', (), 'get', None, queries=2, cache_misses=0, seconds=1.0),
+    # unwarmed, logging out twice would measure an anonymous request
+    Budget('logout', (), 'post', 'member', queries=5, cache_misses=2, seconds=1.0),
+
+    # web
+    # served from the anonymous page cache
+    Budget('home', (), 'get', None, queries=1, cache_misses=0, seconds=1.0),
+    Budget('home', (), 'get', 'member', queries=5, cache_misses=0, seconds=1.0),
+    Budget('make_promise', ('cause',), 'get', 'member', queries=6, cache_misses=0, seconds=1.0),
+    # unwarmed like `promise-make`, which writes the same way
+    Budget('make_promise_go', ('cause',), 'post', 'member', queries=7, cache_misses=2, seconds=1.0),
+    Budget('metrics', (), 'get', 'admin', queries=4, cache_misses=0, seconds=1.0),
+
+    # causes api
+    Budget('cause-list', (), 'get', None, queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-list', (), 'get', 'member', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-detail', ('cause',), 'get', 'member', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-available', (), 'get', 'member', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-promised', (), 'get', 'member', queries=3, cache_misses=0, seconds=1.0),
+    Budget('cause-promise', ('promised',), 'get', 'member', queries=3, cache_misses=0, seconds=1.0),
+    Budget('cause-promises', ('promised',), 'get', 'admin', queries=3, cache_misses=0, seconds=1.0),
+    # ranks are served from the cache, recomputed once promises or causes change
+    Budget('cause-top-amount', (), 'get', 'admin', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-top-promised', (), 'get', 'admin', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-top-amount-window', ('window',), 'get', 'admin', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-top-promised-window', ('window',), 'get', 'admin', queries=2, cache_misses=0, seconds=1.0),
+    Budget('cause-trend', ('promised',), 'get', 'admin', queries=3, cache_misses=0, seconds=1.0),
+    Budget('cause-stats', ('promised',), 'get', 'admin', queries=4, cache_misses=0, seconds=1.0),
+    Budget('cause-donors', ('promised',), 'get', 'admin', queries=3, cache_misses=0, seconds=1.0),
+    Budget('cause-reach', (), 'get', 'admin', queries=2, cache_misses=0, seconds=1.0),
+    # streamed in chunks, a query per chunk of 2000 rows
+    Budget('cause-export', ('format',), 'get', 'admin', queries=3, cache_misses=0, seconds=1.0),
+
+    # promises api
+    Budget('promise-list', (), 'get', 'member', queries=3, cache_misses=0, seconds=1.0),
+    # the promise, and its owner for the object permission
+    Budget('promise-detail', ('promise',), 'get', 'member', queries=4, cache_misses=0, seconds=1.0),
+    # unwarmed, and logging in invalidated the cached user so both of its tiers miss. The user, the serializer's
+    # lookups and uniqueness check, the insert and the cause's aggregates: the rest of what follows a promise is left
+    # to redis and the rollup job
+    Budget('promise-make', ('cause',), 'post', 'member', queries=10, cache_misses=2, seconds=1.0),
+    Budget('promise-ingestion', ('tracking',), 'get', 'member', queries=2, cache_misses=0, seconds=1.0),
+    Budget('promise-export', ('format',), 'get', 'admin', queries=3, cache_misses=0, seconds=1.0),
+)
+
+# route -> why it has no budget
+EXEMPT = {
+    'rest_framework:login': "the browsable API's login, for people exploring the API rather than its clients",
+    'rest_framework:logout': "the browsable API's logout, for people exploring the API rather than its clients",
+}
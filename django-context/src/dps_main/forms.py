@@ -1,6 +1,7 @@
 from django import forms
 from django.utils.timezone import now
 
+from dps_main.utilities import ingestion
 from dps_main.utilities.actions import ActionHelper
 
 
@@ -16,7 +17,10 @@ class MakePromiseForm(forms.Form):
         widget=forms.DateInput(attrs={'type': 'date'}))
 
     def make_promise(self, helper: ActionHelper):
-        helper.add_promise_to_cause(
+        if ingestion.is_enabled():
+            return helper.queue_promise_to_cause(self.cleaned_data['cause_id'], amount=self.cleaned_data['amount'],
+                                                 target_date=self.cleaned_data['target_date'])
+        return helper.add_promise_to_cause(
             cause_id=self.cleaned_data['cause_id'],
             user_id=self.cleaned_data['user_id'],
             amount=self.cleaned_data['amount'],
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.excerpts import backfill
+
+
+class Command(BaseCommand):
+    help = 'Backfills the description excerpts of causes written before they were stored'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Causes updated per query')
+        parser.add_argument('--all', action='store_true', dest='everything',
+                            help='Recompute the excerpts of every cause, not only of those missing them')
+
+    def handle(self, *args, **options):
+        try:
+            size = backfill(batch_size=max(options['batch_size'], 1), everything=options['everything'])
+            self.stdout.write(self.style.SUCCESS(F'Success! {size} cause(s) backfilled'))
+        except Exception as e:
+            raise CommandError(e)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.cachebench import MODES, run
+
+
+class Command(BaseCommand):
+    help = 'Measures the hit ratio of the available causes cache under a mixed read/write workload, with ' \
+           'dependency-aware invalidation against every write invalidating everything. Writes are rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=2000, help='Operations per run')
+        parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of the operations writing')
+        parser.add_argument('--edit-ratio', type=float, default=0.05,
+                            help='Share of the writes editing a cause, promises make up the rest')
+        parser.add_argument('--anonymous-ratio', type=float, default=0.3, help='Share of the reads made anonymously')
+        parser.add_argument('--members', type=int, default=50, help='Number of members reading and promising')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the workload')
+
+    def handle(self, *args, **options):
+        try:
+            results = run(operations=options['operations'], write_ratio=options['write_ratio'],
+                          edit_ratio=options['edit_ratio'], anonymous_ratio=options['anonymous_ratio'],
+                          members=options['members'], seed=options['seed'])
+        except ValueError as e:
+            raise CommandError(F'{e}, try `manage.py demodata`')
+
+        for mode in MODES:
+            result = results[mode]
+            self.stdout.write(F"{mode}: hit ratio {result['hit_ratio']:.1%}, {result['hits']} hits, "
+                              F"{result['misses']} misses over {result['reads']} reads and {result['writes']} writes")
+        self.stdout.write(self.style.SUCCESS('Success!'))
@@ -0,0 +1,45 @@
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from dps_main.models import Cause, Promise
+from dps_main.serializers import CauseSerializer, PromiseSerializer, CauseValuesSerializer, PromiseValuesSerializer
+
+
+class Command(BaseCommand):
+    help = 'Measures rows/sec when serializing a page of causes and promises, model serializers against `.values()` ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=50, help='Rows per page')
+        parser.add_argument('--rounds', type=int, default=50, help='Pages serialized per measurement')
+
+    @staticmethod
+    def _rate(render, rounds):
+        """
+        Rows rendered per second, the query included
+        """
+        rows = 0
+        start = default_timer()
+        for _ in range(rounds):
+            rows += len(render())
+        elapsed = default_timer() - start
+        return rows / elapsed if elapsed else 0.0
+
+    def handle(self, *args, **options):
+        size, rounds = options['size'], options['rounds']
+        context = {'request': APIRequestFactory().get('/api/v1/')}
+        cases = (
+            ('cause', Cause.objects.all(), CauseSerializer, CauseValuesSerializer),
+            ('promise', Promise.objects.all(), PromiseSerializer, PromiseValuesSerializer),
+        )
+        if not all(q.exists() for _, q, _, _ in cases):
+            raise CommandError('Causes and promises are required, try `manage.py demodata`')
+
+        for name, q, model_serializer, values_serializer in cases:
+            before = self._rate(lambda: model_serializer(q[:size], many=True, context=context).data, rounds)
+            after = self._rate(lambda: values_serializer(values_serializer.prepare(q)[:size], many=True,
+                                                         context=context).data, rounds)
+            self.stdout.write(F'{name}: {before:,.0f} rows/sec before, {after:,.0f} rows/sec after '
+                              F'({after / before if before else 0:.1f}x)')
+        self.stdout.write(self.style.SUCCESS('Success!'))
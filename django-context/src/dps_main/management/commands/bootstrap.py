@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.bootstrap import bootstrap
+
+
+class Command(BaseCommand):
+    help = 'Bootstraps the deployment (default superuser and group), once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Run even if the deployment was bootstrapped')
+
+    def handle(self, *args, **options):
+        try:
+            if bootstrap(force=options['force']):
+                self.stdout.write(self.style.SUCCESS('Success!'))
+            else:
+                self.stdout.write('Already bootstrapped, use --force to run again')
+        except Exception as e:
+            raise CommandError(e)
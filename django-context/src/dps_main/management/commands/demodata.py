@@ -1,31 +1,28 @@
-from random import randint
+import os
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.base import BaseCommand, CommandError
 
-from dps_main.utilities import faker
+from dps_main.utilities import datagen
 
 
 class Command(BaseCommand):
-    help = 'Generates random sample data for the app'
+    help = 'Generates random sample data for the app, streamed in bulk so it scales to millions of rows'
 
-    @staticmethod
-    def _generate_data():
-        """
-        Create models
-        """
-        # create a bunch of causes
-        faker.bulk_causes(320)
-
-        # create a bunch of users
-        faker.bulk_users(randint(40, 60))
-
-        return faker.make_bulk_promises(300 * 35)
+    def add_arguments(self, parser):
+        parser.add_argument('--causes', type=int, default=320, help='Number of causes to generate')
+        parser.add_argument('--users', type=int, default=50, help='Number of users to generate')
+        parser.add_argument('--promises', type=int, default=300 * 35,
+                            help='Number of promises to generate, capped at users x causes')
+        parser.add_argument('--seed', type=int, default=None, help='Seed, for reproducible data')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of processes writing promises')
 
     def handle(self, *args, **options):
         try:
-            e = self._generate_data()
-            if isinstance(e, Exception):
-                raise e
-            self.stdout.write(self.style.SUCCESS('Success!'))
-        except Exception as e:
+            written = datagen.generate(options['causes'], options['users'], options['promises'],
+                                       seed=options['seed'], workers=max(options['workers'], 1))
+        except ImproperlyConfigured as e:
             raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            'Success! ' + ', '.join(F'{size} {name}' for name, size in written.items())))
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.models import Cause
+from dps_main.utilities.queryplans import hot_querysets, check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAINs the hot path querysets and fails if any of them scans or sorts where an index should serve it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Generate demo data first, so the plans are taken against a large dataset')
+        parser.add_argument('--natural', action='store_true',
+                            help="Leave sequential scans enabled and report the planner's own choices")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            call_command('demodata')
+
+        member = User.objects.filter(is_superuser=False).first()
+        admin = User.objects.filter(is_superuser=True).first()
+        cause_ids = list(Cause.objects.values_list('id', flat=True)[:15])
+        if not (member and admin and cause_ids):
+            raise CommandError('A member, an admin and some causes are required, try --seed')
+
+        try:
+            offenders = check_query_plans(hot_querysets(member, admin, cause_ids), natural=options['natural'])
+        except ImproperlyConfigured as e:
+            raise CommandError(e)
+
+        for name, problems in offenders.items():
+            self.stderr.write(F'{name}: {", ".join(problems)}')
+        if offenders:
+            raise CommandError(F'{len(offenders)} hot path queryset(s) not served by their indexes')
+        self.stdout.write(self.style.SUCCESS('Success!'))
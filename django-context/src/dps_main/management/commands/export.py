@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities import export
+
+
+class Command(BaseCommand):
+    help = 'Streams promises or causes to a CSV or NDJSON file, in constant memory however many rows there are'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=list(export.MODELS), help='What to export')
+        parser.add_argument('--format', choices=export.FORMATS, default=export.CSV, dest='export_format',
+                            help='File format')
+        parser.add_argument('--cause', type=int, help='Only rows of this cause id')
+        parser.add_argument('--user', type=int, help='Only rows of this user id, the creator for causes')
+        parser.add_argument('--since', help='Only rows created on or after this date, YYYY-MM-DD')
+        parser.add_argument('--until', help='Only rows created on or before this date, YYYY-MM-DD')
+        parser.add_argument('--output', default=None, help='File the rows are written to, <model>.<format> by default')
+
+    def handle(self, *args, **options):
+        model, export_format = options['model'], options['export_format']
+        output = options['output'] or F'{model}.{export_format}'
+        try:
+            lookups = export.parse_filters(model, cause=options['cause'], user=options['user'],
+                                           since=options['since'], until=options['until'])
+            with open(output, 'w', newline='', encoding='utf-8') as f:
+                for chunk in export.render(model, export_format, **lookups):
+                    f.write(chunk)
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(F'Success! {model} written to {output}'))
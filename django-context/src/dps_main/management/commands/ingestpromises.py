@@ -0,0 +1,37 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities import ingestion
+
+
+class Command(BaseCommand):
+    help = 'Drains the asynchronous promise ingestion queue, writing promises in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Promises written per batch')
+        parser.add_argument('--worker', default='default',
+                            help='Worker name, each concurrent worker needs its own')
+        parser.add_argument('--interval', type=float, default=0.5, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = options['worker']
+        try:
+            recovered = ingestion.recover(worker)
+            if recovered:
+                self.stdout.write(F'{recovered} item(s) recovered from an interrupted batch')
+
+            while True:
+                counts = ingestion.drain(options['batch_size'], worker)
+                if counts:
+                    self.stdout.write(', '.join(F'{state}: {size}' for state, size in sorted(counts.items())))
+                elif options['once']:
+                    break
+                else:
+                    sleep(options['interval'])
+            self.stdout.write(self.style.SUCCESS('Success!'))
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+        except Exception as e:
+            raise CommandError(e)
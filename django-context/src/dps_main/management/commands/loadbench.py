@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.loadbench import ENDPOINTS, run
+
+
+class Command(BaseCommand):
+    help = 'Load tests the hot endpoints and reports latency percentiles, requests/sec and queries per request. ' \
+           'Promises are made along the way, run it against demo data only'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None,
+                            help='Base URL of a running server sharing this database, the app runs in-process otherwise')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of threads, one user each')
+        parser.add_argument('--requests', type=int, default=200, help='Requests measured per endpoint')
+        parser.add_argument('--warmup', type=int, default=10, help='Requests per thread left out of the measurements')
+        parser.add_argument('--seed', type=int, default=0, help='Seed used to pick users and causes')
+        parser.add_argument('--endpoints', nargs='+', choices=[endpoint.name for endpoint in ENDPOINTS],
+                            help='Endpoints to benchmark, all of them by default')
+        parser.add_argument('--output', default='loadbench.json', help='File the JSON results are written to')
+
+    def handle(self, *args, **options):
+        names = options['endpoints']
+        endpoints = [endpoint for endpoint in ENDPOINTS if not names or endpoint.name in names]
+        try:
+            results = run(endpoints, concurrency=max(options['concurrency'], 1), requests=options['requests'],
+                          warmup=options['warmup'], seed=options['seed'], base_url=options['url'])
+        except ValueError as e:
+            raise CommandError(F'{e}, try `manage.py demodata`')
+
+        for name, result in results.items():
+            queries = F", {result['queries_mean']} queries/req" if result['queries_mean'] is not None else ''
+            self.stdout.write(F"{name}: {result['rps']} req/sec, p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms, "
+                              F"p99 {result['p99_ms']}ms{queries}, statuses {result['statuses']}")
+
+        report = dict(started=datetime.utcnow().isoformat(), url=options['url'], concurrency=options['concurrency'],
+                      requests=options['requests'], warmup=options['warmup'], seed=options['seed'], endpoints=results)
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(F"Success! Results written to {options['output']}"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.amountstats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the running amount statistics of causes from the promises, e.g. once they drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cause', type=int, action='append', dest='causes',
+                            help='Only rebuild the statistics of this cause id. May be repeated')
+
+    def handle(self, *args, **options):
+        try:
+            size = rebuild(options.get('causes'))
+            self.stdout.write(self.style.SUCCESS(F'Success! {size} cause(s) rebuilt'))
+        except Exception as e:
+            raise CommandError(e)
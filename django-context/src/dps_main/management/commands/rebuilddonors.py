@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.donors import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the distinct donor sketches from the promises, dropping the users of deleted promises'
+
+    def handle(self, *args, **options):
+        try:
+            size = rebuild()
+            self.stdout.write(self.style.SUCCESS(F'Success! {size} promise(s) sketched'))
+        except Exception as e:
+            raise CommandError(e)
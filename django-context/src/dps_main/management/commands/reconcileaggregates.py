@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities.aggregates import rebuild_cause_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Backfills/reconciles the denormalized promise aggregates on causes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cause', type=int, action='append', dest='causes',
+                            help='Only reconcile this cause id. May be repeated')
+
+    def handle(self, *args, **options):
+        try:
+            size = rebuild_cause_aggregates(options.get('causes'))
+            self.stdout.write(self.style.SUCCESS(F'Success! {size} cause(s) reconciled'))
+        except Exception as e:
+            raise CommandError(e)
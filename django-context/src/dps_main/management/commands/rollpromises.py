@@ -0,0 +1,33 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities import rollups
+
+
+class Command(BaseCommand):
+    help = 'Keeps the hourly and daily promise rollups, donor sketches and amount statistics up to date with promises'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Promises rolled up per batch')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds to wait between runs')
+        parser.add_argument('--once', action='store_true', help='Exit after a single run')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute the rollups from scratch first')
+
+    def handle(self, *args, **options):
+        try:
+            if options['rebuild']:
+                self.stdout.write(F'{rollups.rebuild(options["batch_size"])} promise(s) rolled up from scratch')
+
+            while True:
+                rolled = rollups.run(options['batch_size'])
+                if rolled:
+                    self.stdout.write(F'{rolled} promise(s) rolled up')
+                if options['once']:
+                    break
+                sleep(options['interval'])
+            self.stdout.write(self.style.SUCCESS('Success!'))
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+        except Exception as e:
+            raise CommandError(e)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dps_main.utilities import analytics
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the columnar promise snapshot the admin analytics read from'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Take the snapshot afresh rather than incrementally')
+
+    def handle(self, *args, **options):
+        try:
+            counts = analytics.refresh(full=options['full'])
+        except Exception as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            F'Success! {counts["rows"]} promise(s) in the snapshot, {counts["read"]} read to refresh it'))
@@ -0,0 +1,50 @@
+# Generated by Django 4.0.6 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Sum, OuterRef, Subquery, FloatField, IntegerField
+from django.db.models.functions import Coalesce
+
+
+def backfill_cause_aggregates(apps, schema_editor):
+    """
+    Populate the new aggregate columns from existing promises
+    """
+    Cause = apps.get_model('dps_main', 'Cause')
+    Promise = apps.get_model('dps_main', 'Promise')
+    promises = Promise.objects.filter(cause=OuterRef('pk')).order_by().values('cause')
+    Cause.objects.update(
+        promise_count=Coalesce(Subquery(promises.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0),
+        promised_total=Coalesce(Subquery(promises.annotate(s=Sum('amount')).values('s'), output_field=FloatField()),
+                                0.0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dps_main', '0017_auto_20181212_1524'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cause',
+            name='promise_count',
+            field=models.PositiveIntegerField(default=0, editable=False,
+                                              help_text='Number of promises made toward the cause'),
+        ),
+        migrations.AddField(
+            model_name='cause',
+            name='promised_total',
+            field=models.FloatField(default=0.0, editable=False,
+                                    help_text='Sum of all amounts promised toward the cause, NGN',
+                                    verbose_name='Amount promised, NGN'),
+        ),
+        migrations.AddIndex(
+            model_name='cause',
+            index=models.Index(fields=['-promised_total'], name='cause_promised_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cause',
+            index=models.Index(fields=['-promise_count'], name='cause_promise_count_idx'),
+        ),
+        migrations.RunPython(backfill_cause_aggregates, migrations.RunPython.noop),
+    ]
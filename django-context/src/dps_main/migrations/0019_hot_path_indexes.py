@@ -0,0 +1,44 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dps_main', '0018_cause_promise_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cause',
+            index=models.Index(fields=['-created', '-id'], name='cause_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promise',
+            index=models.Index(fields=['user', '-created'], name='promise_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promise',
+            index=models.Index(fields=['cause', '-created'], name='promise_cause_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promise',
+            index=models.Index(fields=['-created', '-id'], name='promise_created_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='promise',
+            name='cause',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE,
+                                    to='dps_main.Cause'),
+        ),
+        migrations.AlterField(
+            model_name='promise',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE,
+                                    to=settings.AUTH_USER_MODEL),
+        ),
+    ]
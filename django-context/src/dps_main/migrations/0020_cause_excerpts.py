@@ -0,0 +1,44 @@
+# Generated by Django 4.0.6 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+from dps_main.utilities import excerpts
+
+
+def backfill_cause_excerpts(apps, schema_editor):
+    """
+    Populate the new excerpt columns from the descriptions of existing causes, a batch at a time
+    """
+    Cause = apps.get_model('dps_main', 'Cause')
+    q = Cause.objects.exclude(description='').order_by('id').only('id', 'description')
+    last = 0
+    while True:
+        causes = [excerpts.apply(cause) for cause in q.filter(pk__gt=last)[:500]]
+        if not causes:
+            return
+        Cause.objects.bulk_update(causes, ['excerpt', 'excerpt_html'])
+        last = causes[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dps_main', '0019_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cause',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False,
+                                   help_text='Opening words of the description as plain text, kept in step on save'),
+        ),
+        migrations.AddField(
+            model_name='cause',
+            name='excerpt_html',
+            field=models.TextField(blank=True, default='', editable=False,
+                                   help_text='Opening words of the description with its tags kept balanced, '
+                                             'kept in step on save'),
+        ),
+        migrations.RunPython(backfill_cause_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.0.6 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dps_main', '0020_cause_excerpts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CauseHourlyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the bucket, UTC')),
+                ('promise_count', models.PositiveIntegerField(default=0, help_text='Number of promises made in the bucket')),
+                ('promised_total', models.FloatField(default=0.0, help_text='Sum of the amounts promised in the bucket, NGN', verbose_name='Amount promised, NGN')),
+                ('user_count', models.PositiveIntegerField(default=0, help_text='Number of distinct users who promised in the bucket')),
+                ('cause', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='dps_main.cause')),
+            ],
+            options={
+                'unique_together': {('cause', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CauseDailyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the bucket, UTC')),
+                ('promise_count', models.PositiveIntegerField(default=0, help_text='Number of promises made in the bucket')),
+                ('promised_total', models.FloatField(default=0.0, help_text='Sum of the amounts promised in the bucket, NGN', verbose_name='Amount promised, NGN')),
+                ('user_count', models.PositiveIntegerField(default=0, help_text='Number of distinct users who promised in the bucket')),
+                ('cause', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='dps_main.cause')),
+            ],
+            options={
+                'unique_together': {('cause', 'bucket')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='causehourlyrollup',
+            index=models.Index(fields=['bucket'], name='cause_hourly_bucket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='causedailyrollup',
+            index=models.Index(fields=['bucket'], name='cause_daily_bucket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promise',
+            index=models.Index(fields=['modified', 'id'], name='promise_modified_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0.6 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dps_main', '0021_promise_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CauseAmountStats',
+            fields=[
+                ('cause', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='amount_stats', serialize=False, to='dps_main.cause')),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of promises counted')),
+                ('mean', models.FloatField(default=0.0, help_text='Mean amount promised, NGN')),
+                ('m2', models.FloatField(default=0.0, help_text='Sum of the squared deviations from the mean, for the variance')),
+                ('minimum', models.FloatField(blank=True, help_text='Smallest amount promised, NGN', null=True)),
+                ('maximum', models.FloatField(blank=True, help_text='Largest amount promised, NGN', null=True)),
+                ('sketch', models.JSONField(blank=True, default=dict, help_text='Promises per logarithmic amount bucket, for approximate quantiles')),
+            ],
+        ),
+    ]
@@ -29,6 +29,11 @@ class Contact(models.Model):
 class Cause(models.Model):
     title = models.CharField(max_length=300)
     description = models.TextField(help_text="Full description of the cause. This will be displayed to the user")
+    excerpt = models.TextField(blank=True, default='', editable=False,
+                               help_text="Opening words of the description as plain text, kept in step on save")
+    excerpt_html = models.TextField(blank=True, default='', editable=False,
+                                    help_text="Opening words of the description with its tags kept balanced, "
+                                              "kept in step on save")
     illustration = models.ImageField(help_text='Images associated with the cause',
                                      upload_to='illustration/%Y/%m/%d/')
     contact = models.OneToOneField(Contact, verbose_name='Primary Contact',
@@ -41,6 +46,10 @@ class Cause(models.Model):
     creator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     modified = models.DateTimeField(auto_now=True)
     enabled = models.BooleanField(default=True)
+    promise_count = models.PositiveIntegerField(default=0, editable=False,
+                                                help_text="Number of promises made toward the cause")
+    promised_total = models.FloatField('Amount promised, NGN', default=0.0, editable=False,
+                                       help_text="Sum of all amounts promised toward the cause, NGN")
 
     def __str__(self):
         return F'Cause <{self.id}, {self.title}>'
@@ -50,11 +59,17 @@ class Cause(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['-promised_total'], name='cause_promised_total_idx'),
+            models.Index(fields=['-promise_count'], name='cause_promise_count_idx'),
+            models.Index(fields=['-created', '-id'], name='cause_created_id_idx'),
+        ]
 
 
 class Promise(models.Model):
-    cause = models.ForeignKey(Cause, on_delete=models.CASCADE)
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # the composite indexes below lead with these columns, so the implicit single column ones are redundant
+    cause = models.ForeignKey(Cause, on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
     amount = models.FloatField('Amount promised, NGN', help_text="Amount promised toward the associated cause, NGN")
     target_date = models.DateField(help_text="The date for which the promise is expected to be redeemed",
                                    default=tomorrow)
@@ -70,3 +85,69 @@ class Promise(models.Model):
     class Meta:
         ordering = ['-created']
         unique_together = ('cause', 'user')
+        indexes = [
+            # lookups by user and cause go to the unique (cause, user) index
+            models.Index(fields=['user', '-created'], name='promise_user_created_idx'),
+            models.Index(fields=['cause', '-created'], name='promise_cause_created_idx'),
+            models.Index(fields=['-created', '-id'], name='promise_created_id_idx'),
+            # the rollups walk promises by modification
+            models.Index(fields=['modified', 'id'], name='promise_modified_id_idx'),
+        ]
+
+
+class CauseRollup(models.Model):
+    """
+    Promises to a cause created within a time bucket, kept current by `utilities/rollups.py`
+    """
+    # the unique constraint leads with the cause
+    cause = models.ForeignKey(Cause, on_delete=models.CASCADE, db_index=False)
+    bucket = models.DateTimeField(help_text="Start of the bucket, UTC")
+    promise_count = models.PositiveIntegerField(default=0, help_text="Number of promises made in the bucket")
+    promised_total = models.FloatField('Amount promised, NGN', default=0.0,
+                                       help_text="Sum of the amounts promised in the bucket, NGN")
+    user_count = models.PositiveIntegerField(default=0, help_text="Number of distinct users who promised in the bucket")
+
+    def __str__(self):
+        return F'{self.__class__.__name__} <{self.cause_id}, {self.bucket.isoformat()}>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    class Meta:
+        abstract = True
+
+
+class CauseHourlyRollup(CauseRollup):
+    class Meta:
+        unique_together = ('cause', 'bucket')
+        indexes = [
+            models.Index(fields=['bucket'], name='cause_hourly_bucket_idx'),
+        ]
+
+
+class CauseDailyRollup(CauseRollup):
+    class Meta:
+        unique_together = ('cause', 'bucket')
+        indexes = [
+            models.Index(fields=['bucket'], name='cause_daily_bucket_idx'),
+        ]
+
+
+class CauseAmountStats(models.Model):
+    """
+    Running statistics of the amounts promised to a cause, kept current by `utilities/amountstats.py`
+    """
+    cause = models.OneToOneField(Cause, on_delete=models.CASCADE, primary_key=True, related_name='amount_stats')
+    count = models.PositiveIntegerField(default=0, help_text="Number of promises counted")
+    mean = models.FloatField(default=0.0, help_text="Mean amount promised, NGN")
+    m2 = models.FloatField(default=0.0, help_text="Sum of the squared deviations from the mean, for the variance")
+    minimum = models.FloatField(null=True, blank=True, help_text="Smallest amount promised, NGN")
+    maximum = models.FloatField(null=True, blank=True, help_text="Largest amount promised, NGN")
+    sketch = models.JSONField(default=dict, blank=True,
+                              help_text="Promises per logarithmic amount bucket, for approximate quantiles")
+
+    def __str__(self):
+        return F'CauseAmountStats <{self.cause_id}, {self.count} promise(s)>'
+
+    def __repr__(self):
+        return self.__str__()
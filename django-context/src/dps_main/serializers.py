@@ -89,3 +89,82 @@ class PromiseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Promise
         fields = ('amount', 'target_date', 'cause', 'user', 'created', 'modified')
+
+
+# Read-only serializers over `.values()` rows.
+# List/retrieve paths render plain dicts fetched in one joined query, sparing a model instance (and a contact query)
+# per row. Output is identical to the model serializers above
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Subclasses declare the `values` to select and render a row in `to_representation`
+    """
+    values = ()
+
+    _date = serializers.DateField()
+    _datetime = serializers.DateTimeField()
+
+    @classmethod
+    def prepare(cls, queryset):
+        """
+        Narrow a queryset down to the rows this serializer renders
+        """
+        return queryset.values(*cls.values)
+
+
+class CauseValuesSerializer(ValuesSerializer):
+    """
+    Renders as `CauseSerializer`
+    """
+    values = ('id', 'title', 'description', 'illustration', 'expiration_date', 'target_amount', 'enabled', 'created',
+              'modified', 'contact__first_name', 'contact__last_name', 'contact__email', 'contact__address',
+              'contact__phone')
+
+    _storage = Cause._meta.get_field('illustration').storage
+
+    def _illustration(self, name):
+        """
+        Mirrors `ImageField(use_url=True)`
+        """
+        if not name:
+            return None
+        url = self._storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'illustration': self._illustration(row['illustration']),
+            'contact': {
+                'first_name': row['contact__first_name'],
+                'last_name': row['contact__last_name'],
+                'email': row['contact__email'],
+                'address': row['contact__address'],
+                'phone': row['contact__phone'],
+            },
+            'expiration_date': self._date.to_representation(row['expiration_date']),
+            'target_amount': float(row['target_amount']),
+            'enabled': row['enabled'],
+            'created': self._datetime.to_representation(row['created']),
+            'modified': self._datetime.to_representation(row['modified']),
+        }
+
+
+class PromiseValuesSerializer(ValuesSerializer):
+    """
+    Renders as `PromiseSerializer`
+    """
+    values = ('amount', 'target_date', 'cause', 'user', 'created', 'modified')
+
+    def to_representation(self, row):
+        return {
+            'amount': float(row['amount']),
+            'target_date': self._date.to_representation(row['target_date']),
+            'cause': row['cause'],
+            'user': row['user'],
+            'created': self._datetime.to_representation(row['created']),
+            'modified': self._datetime.to_representation(row['modified']),
+        }
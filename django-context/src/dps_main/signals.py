@@ -1,13 +1,16 @@
 import logging
 
+from django.apps import apps
 from django.conf import settings
-from django.db.backends.signals import connection_created
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from .utilities.routines import create_default_superuser, create_default_group, assign_default_group_to_user, \
-    hydrate_default_group
+from .models import Cause
+from .utilities import dependencies, excerpts, leaderboards, metrics, twotier, versions
+from .utilities.bootstrap import bootstrap
+from .utilities.routines import assign_default_group_to_user, hydrate_default_group
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
@@ -34,15 +37,13 @@ def swallow_exception(callback, *args, **kwargs):
             logger.error("Exception in #swallow_exception #{1}, {0}".format(e, callback))
 
 
-@receiver(connection_created, dispatch_uid="db_connection_created")
-def on_connection_created(sender, **kwargs):
+@receiver(post_migrate, dispatch_uid="post_migrate_bootstrap")
+def on_post_migrate(sender, **kwargs):
     """
-    Routines that will run when the first DB connection is made
+    Bootstrap once the schema is in place, which is once per deployment rather than once per DB connection
     """
-    if sender:
-        swallow_exception(create_default_superuser)
-        swallow_exception(create_default_group)
-        swallow_exception(hydrate_default_group)
+    if sender and sender.name == 'dps_main':
+        swallow_exception(bootstrap)
 
 
 @receiver(post_save, sender=get_user_model(), dispatch_uid="post_save_user")
@@ -53,3 +54,60 @@ def on_model_saved(sender, instance, created, **kwargs):
     if created is True and instance and not instance.is_superuser:
         swallow_exception(hydrate_default_group)
         swallow_exception(assign_default_group_to_user, user_instance=instance)
+    if not created:
+        twotier.users.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model(), dispatch_uid="post_delete_user")
+def on_user_deleted(sender, instance, **kwargs):
+    """
+    Forget a removed user
+    """
+    twotier.users.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=Cause, dispatch_uid="post_delete_cause")
+def on_cause_deleted(sender, instance, **kwargs):
+    """
+    Drop a removed cause from the leaderboards and expire conditional GET validators depending on it
+    """
+    cause_id = instance.id
+    transaction.on_commit(lambda: leaderboards.remove_cause(cause_id))
+    twotier.causes.invalidate(cause_id)
+    dependencies.cause_written(cause_id)
+    # its promises went along with it
+    dependencies.promise_written(cause_ids=[cause_id])
+    versions.touch(versions.CAUSE, versions.PROMISE)
+
+
+@receiver(pre_save, sender=Cause, dispatch_uid="pre_save_cause")
+def on_cause_saving(sender, instance, **kwargs):
+    """
+    Keep the excerpts in step with the description, left alone when the description wasn't loaded
+    """
+    if 'description' not in instance.get_deferred_fields():
+        excerpts.apply(instance)
+
+
+@receiver(post_save, sender=Cause, dispatch_uid="post_save_cause")
+def on_cause_saved(sender, instance, **kwargs):
+    """
+    Expire conditional GET validators depending on causes, and the cached cause
+    """
+    versions.touch(versions.CAUSE)
+    dependencies.cause_written(instance.id)
+    twotier.causes.invalidate(instance.id)
+
+
+def on_cache_read(sender, func, hit, **kwargs):
+    """
+    Count cacheops lookups, by model
+    """
+    metrics.inc('dps_cache_lookups_total', cache=sender._meta.label_lower if sender else 'cacheops',
+                result='hit' if hit else 'miss')
+
+
+# cacheops is left out of some settings, the tests' among them
+if apps.is_installed('cacheops'):
+    from cacheops.signals import cache_read
+    cache_read.connect(on_cache_read, dispatch_uid="cacheops_cache_read")
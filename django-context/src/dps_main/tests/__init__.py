@@ -1,8 +1,10 @@
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
+from dps_main.utilities.redisclient import get_redis
 
-class DpsTestCase(TestCase):
+
+class DpsTestMixin(object):
 
     @classmethod
     def get_settings(cls):
@@ -11,8 +13,28 @@ class DpsTestCase(TestCase):
         """
         return settings
 
+    def setUp(self):
+        """
+        Start from an empty redis, the mock one is shared by every test in the process
+        """
+        get_redis().flushdb()
+
+    def tearDown(self):
+        get_redis().flushdb()
+
     def assertTestEnvironment(self):
         """
         Asserts that the test environment has been loaded
         """
         self.assertEqual(settings.ENVIRONMENT, 'test')
+
+
+class DpsTestCase(DpsTestMixin, TestCase):
+    pass
+
+
+class DpsTransactionTestCase(DpsTestMixin, TransactionTestCase):
+    """
+    For code running on threads of its own, which hold their own connections and only see committed data
+    """
+    pass
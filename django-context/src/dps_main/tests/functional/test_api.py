@@ -8,9 +8,10 @@ from PIL import Image
 
 from django.test.utils import override_settings
 from rest_framework import status
+from rest_framework.settings import api_settings
 
 from dps_main.tests import DpsTestCase
-from dps_main.utilities import faker
+from dps_main.utilities import amountstats, faker, ingestion
 from dps_main.utilities.actions import ActionHelper
 
 
@@ -37,6 +38,7 @@ class APITestCase(DpsTestCase):
         """
         Initialize fixtures and resources we need for tests
         """
+        super().setUp()
         self.users = dict(user=faker.user(True)[1], super=faker.user(True, True)[1])
         self.action_helper_super = ActionHelper(self.users['super'])
         faker.bulk_causes(15, self.users['super'])
@@ -48,6 +50,7 @@ class APITestCase(DpsTestCase):
     def tearDown(self):
         self.api_client.logout()
         self.action_helper_super.list_causes().delete()
+        super().tearDown()
 
     @property
     def random_cause_id(self):
@@ -72,7 +75,7 @@ class APITestCase(DpsTestCase):
         """
         response = self.api_client.get('/api/v1/cause/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(len(response.data['results']), 15)
 
     def test_cause_get_list_authenticated(self):
         """
@@ -301,7 +304,7 @@ class APITestCase(DpsTestCase):
         self.api_client.force_login(self.users['super'])
         response = self.api_client.get('/api/v1/cause/{}/promises/'.format(cid))
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
-        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_cause_promise_get_detail_unauthenticated(self):
         """
@@ -354,7 +357,7 @@ class APITestCase(DpsTestCase):
         self.api_client.force_login(user)
         response = self.api_client.get('/api/v1/cause/promised/')
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
-        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_cause_top_amount_get_list_unauthenticated(self):
         """
@@ -399,3 +402,107 @@ class APITestCase(DpsTestCase):
         response = self.api_client.get('/api/v1/cause/top/promised/')
         self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
         self.assertEqual(response.data['count'], 5)
+
+    def test_cause_conditional_get(self):
+        """
+        GIVEN a request-worthy api
+        WHEN causes are polled with the validators of a previous response
+        THEN a 304 should be returned until a cause changes
+        """
+        response = self.api_client.get('/api/v1/cause/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = self.api_client.get('/api/v1/cause/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.api_client.get('/api/v1/cause/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.action_helper_super.update_cause(self.random_cause_id, title='Changed')
+        response = self.api_client.get('/api/v1/cause/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_promise_conditional_get(self):
+        """
+        GIVEN a request-worthy api
+        WHEN available causes are polled with the validators of a previous response
+        THEN a promise by the user should invalidate them
+        """
+        self.api_client.force_login(self.users['user'])
+        etag = self.api_client.get('/api/v1/cause/available/')['ETag']
+        response = self.api_client.get('/api/v1/cause/available/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.api_client.post('/api/v1/promise/{}/make/'.format(self.random_cause_id),
+                             data={'amount': 30, 'target_date': date.today()})
+        response = self.api_client.get('/api/v1/cause/available/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 14)
+
+    @override_settings(PROMISE_INGESTION_ASYNC=True)
+    def test_promise_post_detail_authenticated_async(self):
+        """
+        GIVEN a request-worthy api with asynchronous ingestion on
+        WHEN an `authed` POST request is made to promises
+        THEN the promise should be accepted for later writing and be trackable
+        """
+        cid = self.random_cause_id
+        self.api_client.force_login(self.users['user'])
+        response = self.api_client.post('/api/v1/promise/{}/make/'.format(cid),
+                                        data={'amount': 30, 'target_date': date.today()})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+
+        tracking = self.api_client.get(response.data['status'])
+        self.assertEqual(tracking.data['state'], ingestion.QUEUED)
+
+        ingestion.drain()
+        tracking = self.api_client.get(response.data['status'])
+        self.assertEqual(tracking.data['state'], ingestion.CREATED)
+        self.assertIn(api_settings.URL_FIELD_NAME, tracking.data)
+
+    def test_promise_export(self):
+        """
+        GIVEN promises
+        WHEN exported through the api
+        THEN admins should get them streamed, filtered as asked, and members should be refused
+        """
+        faker.make_bulk_promises(10, users=[self.users['user']], causes=self.cause_ids)
+        self.api_client.force_login(self.users['super'])
+        response = self.api_client.get('/api/v1/promise/export.csv/', {'user': self.users['user'].id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 11)
+
+        response = self.api_client.get('/api/v1/cause/export.ndjson/')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 15)
+
+        response = self.api_client.get('/api/v1/promise/export.csv/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.api_client.force_login(self.users['user'])
+        response = self.api_client.get('/api/v1/promise/export.csv/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cause_stats(self):
+        """
+        GIVEN promises to a cause
+        WHEN its amount statistics are requested
+        THEN admins should get them next to the target and members should be refused
+        """
+        cause_id = self.cause_ids[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, amount in ((self.users['user'], 100), (self.users['super'], 300)):
+                faker.make_promise(create=True, user=user, cause=cause_id, amount=amount)
+        amountstats.drain()
+        self.api_client.force_login(self.users['super'])
+        response = self.api_client.get(F'/api/v1/cause/{cause_id}/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['count'], response.data['mean']), (2, 200.0))
+        self.assertEqual((response.data['minimum'], response.data['maximum']), (100, 300))
+
+        self.api_client.force_login(self.users['user'])
+        response = self.api_client.get(F'/api/v1/cause/{cause_id}/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from timeit import default_timer
+
+from django.db import connection
+from django.test.utils import override_settings, CaptureQueriesContext
+from django.urls import reverse, get_resolver, URLResolver
+from rest_framework.test import APIClient
+
+from dps_main.budgets import BUDGETS, EXEMPT
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker, ingestion
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.cachestats import CaptureCacheStats
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'unique-snowflake',
+    }
+})
+class BudgetsTestCase(DpsTestCase):
+    """
+    Every route against its budget in `dps_main/budgets.py`
+    """
+
+    def setUp(self):
+        """
+        Seeded dataset
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        self.users = dict(member=faker.user(True)[1], admin=faker.user(True, True)[1])
+        faker.bulk_causes(30, self.users['admin'])
+        faker.bulk_users(5)
+        faker.make_bulk_promises(40)
+        promised = ActionHelper(self.users['member']).list_available_causes().first()
+        promise = faker.make_promise(create=True, user=self.users['member'], cause=promised)[1]
+        tracking = ingestion.enqueue(self.users['member'].id, promised.id, 30, date.today() + timedelta(days=30))
+        self.fixtures = dict(promised=promised.id, promise=promise.id, tracking=tracking, window='week',
+                             format='csv')
+
+    def _fixtures(self):
+        # a fresh cause per request, as promising one takes it off the member's available causes
+        return {**self.fixtures, 'cause': ActionHelper(self.users['member']).list_available_causes().first().id}
+
+    def _route_names(self, patterns, namespace=None):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from self._route_names(pattern.url_patterns, pattern.namespace or namespace)
+            elif pattern.name:
+                yield F'{namespace}:{pattern.name}' if namespace else pattern.name
+
+    def _request(self, client, budget, path, fixtures):
+        if budget.method == 'post':
+            data = {'amount': 30, 'target_date': date.today() + timedelta(days=30)}
+            if budget.route == 'make_promise_go':
+                data.update(cause_id=fixtures['cause'], user_id=self.users[budget.user].id, current_url='/')
+            return client.post(path, data=data)
+        response = client.get(path)
+        if response.streaming:
+            # streamed responses query as they are read
+            b''.join(response.streaming_content)
+        return response
+
+    def test_routes_have_budgets(self):
+        """
+        GIVEN the named routes of the app
+        WHEN they are matched against the budgets
+        THEN each should have a budget or a reason to be exempt
+        """
+        budgeted = {budget.route for budget in BUDGETS}
+        unbudgeted = set(self._route_names(get_resolver('dps_main.urls').url_patterns)) - budgeted - set(EXEMPT)
+        self.assertFalse(unbudgeted, 'Routes with neither a budget nor an exemption in dps_main/budgets.py')
+
+    def test_budgets(self):
+        """
+        GIVEN a seeded dataset and warm caches
+        WHEN each route is requested
+        THEN its queries, cache misses and wall time should be within budget
+        """
+        for budget in BUDGETS:
+            with self.subTest(route=budget.route, user=budget.user):
+                client = APIClient()
+                if budget.user:
+                    client.force_login(self.users[budget.user])
+                fixtures = self._fixtures()
+                path = reverse(budget.route, args=[fixtures[arg] for arg in budget.args])
+                if budget.method == 'get':
+                    self._request(client, budget, path, fixtures)
+
+                with CaptureQueriesContext(connection) as queries, CaptureCacheStats() as caches:
+                    started = default_timer()
+                    response = self._request(client, budget, path, fixtures)
+                    elapsed = default_timer() - started
+
+                self.assertLess(response.status_code, 400, path)
+                self.assertLessEqual(len(queries), budget.queries,
+                                     '\n'.join([path] + [query['sql'] for query in queries.captured_queries]))
+                self.assertLessEqual(caches.misses, budget.cache_misses, dict(caches.tally))
+                self.assertLessEqual(elapsed, budget.seconds, path)
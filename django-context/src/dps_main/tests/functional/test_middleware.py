@@ -12,6 +12,7 @@ class MiddlewareTestCase(DpsTestCase):
         """
         Initialize fixtures and resources we need for tests
         """
+        super().setUp()
         self.factory = RequestFactory()
         self.middleware = DPSActionsMiddleWare(lambda x: None)
 
@@ -7,7 +7,10 @@ from django.urls import reverse
 from rest_framework import status
 
 from dps_main.tests import DpsTestCase
+from dps_main.models import Cause
 from dps_main.utilities import faker
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.cachestats import CaptureCacheStats
 
 from dps_main.views.views import CausesListView
 
@@ -27,6 +30,7 @@ class APITestCase(DpsTestCase):
         """
         Initialize fixtures and resources we need for tests
         """
+        super().setUp()
         self.users = dict(user=faker.user(True, password='020202')[1], super=faker.user(True, True)[1])
         faker.bulk_causes(15, self.users['super'])
 
@@ -40,6 +44,51 @@ class APITestCase(DpsTestCase):
         self.assertEqual(status.HTTP_200_OK, response.status_code)
         self.assertContains(response, text='promise', count=CausesListView.paginate_by + 1)
 
+    def test_anonymous_home_pages(self):
+        """
+        GIVEN more causes than fit a page
+        WHEN the next page is followed
+        THEN the remaining causes should be listed and pointing back should be possible
+        """
+        faker.bulk_causes(5, self.users['super'])
+        response = self.client.get('/')
+        self.assertTrue(response.context['page_obj'].has_next())
+
+        response = self.client.get('/', {'after': response.context['page_obj'].next_cursor})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(response.context['object_list']), 5)
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+        response = self.client.get('/', {'after': 'garbage'})
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_anonymous_home_cached(self):
+        """
+        GIVEN the home page rendered for an anonymous visitor
+        WHEN requested again, anonymously and logged in, and again once a cause is edited
+        THEN the anonymous visitor should get the same bytes without a render until the edit, members their own page
+        """
+        rendered = self.client.get('/')
+        with CaptureCacheStats() as stats:
+            response = self.client.get('/', {'utm_source': 'campaign'})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertIsNone(response.context)
+        self.assertEqual(response.content, rendered.content)
+        self.assertEqual(stats.tally[('page.local', 'hit')], 1)
+
+        cause = Cause.objects.order_by('-created', '-id').first()
+        ActionHelper(self.users['super']).update_cause(cause.id, title='A freshly edited title')
+        response = self.client.get('/')
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'A freshly edited title')
+
+        self.client.login(username=self.users['user'].username, password='020202')
+        with CaptureCacheStats() as stats:
+            response = self.client.get('/')
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Logout')
+        self.assertFalse([cache for cache, _ in stats.tally if cache.startswith('page.')])
+
     def test_login(self):
         """
         GIVEN our site
@@ -55,6 +55,7 @@ class CauseActionsTestCase(DpsTestCase):
         """
         Fixtures
         """
+        super().setUp()
         Contact.objects.create(id=1, first_name='First', last_name='Last', address='Address', phone='+00000000',
                                email='a@email.com')
         cn = Contact.objects.create(id=2, first_name='First 2', last_name='Last 2', address='Address',
@@ -71,6 +71,7 @@ class PromiseActionsTestCase(DpsTestCase):
         """
         Fixtures
         """
+        super().setUp()
         cn = Contact.objects.create(id=1, first_name='First', last_name='Last', address='Address',
                                     phone='+00000000',
                                     email='a@email.com')
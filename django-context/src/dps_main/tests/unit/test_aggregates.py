@@ -0,0 +1,57 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+
+from dps_main.models import Contact, Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.aggregates import rebuild_cause_aggregates
+
+
+class AggregatesTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        cn = Contact.objects.create(first_name='First', last_name='Last', address='Address', phone='+00000000',
+                                    email='a@email.com')
+        self.user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        self.su = User.objects.create_superuser('admin5', 'super@email.com', 'sgsgsgsgwt2r2t23')
+        self.cause = ActionHelper(self.su).create_cause(title='Title', description='Description', contact=cn,
+                                                        expiration_date=date.today(), target_amount=30000)
+
+    def _aggregates(self):
+        cause = Cause.objects.get(pk=self.cause.id)
+        return cause.promise_count, cause.promised_total
+
+    def test_promise_writes(self):
+        """
+        GIVEN a cause
+        WHEN promises are made, updated and deleted through the action helper
+        THEN the aggregates on the cause should follow along
+        """
+        ah = ActionHelper(self.user)
+        p = ah.add_promise_to_cause(self.cause.id, amount=30, target_date=date.today())
+        ActionHelper(self.su).add_promise_to_cause(self.cause.id, amount=70, target_date=date.today())
+        self.assertEqual(self._aggregates(), (2, 100))
+
+        ah.update_promise(p.id, amount=130)
+        self.assertEqual(self._aggregates(), (2, 200))
+
+        ah.delete_promise(p.id)
+        self.assertEqual(self._aggregates(), (1, 70))
+
+    def test_rebuild(self):
+        """
+        GIVEN promises written behind the back of the write path
+        WHEN the aggregates are rebuilt
+        THEN they should reflect the promises table
+        """
+        Promise.objects.create(cause=self.cause, user=self.user, amount=45, target_date=date.today())
+        self.assertEqual(self._aggregates(), (0, 0))
+
+        self.assertEqual(rebuild_cause_aggregates(), 1)
+        self.assertEqual(self._aggregates(), (1, 45))
@@ -0,0 +1,73 @@
+import statistics
+
+from dps_main.models import Cause, Promise, CauseAmountStats
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import amountstats, faker
+from dps_main.utilities.actions import ActionHelper
+
+
+class AmountStatsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.admin = ActionHelper(faker.bulk_causes(2))
+        self.cause, self.other = Cause.objects.order_by('id')[:2]
+        self.amounts = [100.0, 250.0, 400.0, 1000.0, 5000.0]
+        with self.captureOnCommitCallbacks(execute=True):
+            for amount in self.amounts:
+                faker.make_promise(create=True, user=faker.user(True)[1], cause=self.cause, amount=amount)
+        self.assertEqual(amountstats.drain(), len(self.amounts))
+
+    def _summary(self):
+        return amountstats.summary(CauseAmountStats.objects.filter(cause=self.cause).first())
+
+    def assertMatches(self, summary, amounts):
+        self.assertEqual(summary['count'], len(amounts))
+        self.assertAlmostEqual(summary['mean'], statistics.mean(amounts))
+        self.assertAlmostEqual(summary['stddev'], statistics.stdev(amounts))
+        self.assertEqual((summary['minimum'], summary['maximum']), (min(amounts), max(amounts)))
+        self.assertAlmostEqual(summary['quantiles']['50'], statistics.median_low(amounts),
+                               delta=statistics.median_low(amounts) * amountstats.ACCURACY)
+
+    def test_record(self):
+        """
+        GIVEN promises to a cause
+        WHEN one is changed and the one holding the largest amount deleted
+        THEN the statistics should follow once drained, and match those rebuilt from the promises
+        """
+        self.assertMatches(self._summary(), self.amounts)
+
+        promises = {promise.amount: promise for promise in Promise.objects.filter(cause=self.cause)}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.update_promise(promises[250.0].id, amount=300.0)
+            self.admin.delete_promise(promises[5000.0].id)
+        # the writes leave the statistics alone
+        self.assertMatches(self._summary(), self.amounts)
+        self.assertEqual(amountstats.drain(), 2)
+        amounts = [100.0, 300.0, 400.0, 1000.0]
+        self.assertMatches(self._summary(), amounts)
+
+        recorded = self._summary()
+        self.assertEqual(amountstats.rebuild([self.cause.id]), 1)
+        rebuilt = self._summary()
+        self.assertMatches(rebuilt, amounts)
+        self.assertEqual(recorded['quantiles'], rebuilt['quantiles'])
+
+    def test_sketch(self):
+        """
+        GIVEN the sketches of two causes
+        WHEN merged
+        THEN the quantiles should be those of the amounts of both, within the accuracy
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            for amount in (20.0, 30.0):
+                faker.make_promise(create=True, user=faker.user(True)[1], cause=self.other, amount=amount)
+        amountstats.drain()
+        sketches = [stats.sketch for stats in CauseAmountStats.objects.filter(cause__in=[self.cause, self.other])]
+        merged = amountstats.merge(*sketches)
+        self.assertEqual(sum(merged.values()), 7)
+        self.assertAlmostEqual(amountstats.quantile(merged, 0), 20.0, delta=20.0 * amountstats.ACCURACY)
+        self.assertAlmostEqual(amountstats.quantile(merged, 0.5), 250.0, delta=250.0 * amountstats.ACCURACY)
+        self.assertIsNone(amountstats.quantile({}, 0.5))
+        self.assertEqual(amountstats.summary(None)['count'], 0)
@@ -0,0 +1,91 @@
+import os
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from dps_main.models import Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import analytics, faker
+from dps_main.utilities.actions import ActionHelper
+
+
+class AnalyticsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(ANALYTICS_DIR=self.directory.name, ANALYTICS_LAG=0)
+        self.settings.enable()
+        self.admin = ActionHelper(faker.bulk_causes(3))
+        self.causes = list(Cause.objects.order_by('id'))
+        self.users = [faker.user(True)[1] for _ in range(3)]
+        # cause -> amounts, each from another user
+        self.amounts = {self.causes[0]: (100, 200, 300), self.causes[1]: (1000,), self.causes[2]: (50, 60)}
+        for cause, amounts in self.amounts.items():
+            for user, amount in zip(self.users, amounts):
+                faker.make_promise(create=True, user=user, cause=cause, amount=amount)
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_queries(self):
+        """
+        GIVEN a snapshot of promises
+        WHEN grouped, ranked, bucketed and split into percentiles and cohorts
+        THEN the answers should match the promises
+        """
+        self.assertEqual(analytics.refresh(), {'rows': 6, 'read': 6})
+        snapshot = analytics.load()
+
+        self.assertEqual(snapshot.top('cause_id', 2), [(self.causes[1].id, 1000), (self.causes[0].id, 600)])
+        groups, users = snapshot.group_by('cause_id', analytics.USERS)
+        self.assertEqual(dict(zip(groups.tolist(), users.tolist())),
+                         {cause.id: len(amounts) for cause, amounts in self.amounts.items()})
+        self.assertEqual(sum(bucket['count'] for bucket in snapshot.histogram(bins=4, log=True)), 6)
+        self.assertEqual(snapshot.percentiles((50,)), {50: 150})
+
+        groups, quantiles = snapshot.group_percentiles('cause_id', (50,), snapshot.mask(cause=self.causes[0].id))
+        self.assertEqual((groups.tolist(), quantiles[50].tolist()), ([self.causes[0].id], [200]))
+        self.assertEqual(snapshot.top_causes(1)[0], {'cause_id': self.causes[1].id, 'amount': 1000, 'promises': 1,
+                                                     'median': 1000, 'p90': 1000})
+
+        cohorts = snapshot.cohorts()
+        self.assertEqual(sum(cohort['promises'] for cohort in cohorts), 6)
+        self.assertEqual(sum(cohort['users'] for cohort in cohorts),
+                         User.objects.filter(promise__isnull=False).distinct().count())
+
+    def test_refresh(self):
+        """
+        GIVEN a snapshot
+        WHEN a promise is updated and another deleted, then the snapshot refreshed
+        THEN only the updated promise should be read and the deleted one should be gone
+        """
+        analytics.refresh()
+        promises = list(Promise.objects.filter(cause=self.causes[0]).order_by('id'))
+        self.admin.update_promise(promises[0].id, amount=150)
+        self.admin.delete_promise(promises[1].id)
+
+        self.assertEqual(analytics.refresh(), {'rows': 5, 'read': 1})
+        snapshot = analytics.load()
+        self.assertEqual(snapshot.columns['id'].tolist(), list(Promise.objects.order_by('id')
+                                                               .values_list('id', flat=True)))
+        self.assertEqual(snapshot.top('cause_id', 3)[1], (self.causes[0].id, 450))
+
+    def test_generations(self):
+        """
+        GIVEN a snapshot mapped by a reader
+        WHEN the snapshot is refreshed, then refreshed again
+        THEN the reader's generation should be kept through the first refresh and deleted by the second
+        """
+        analytics.refresh()
+        mapped = analytics.load()
+        analytics.refresh()
+        self.assertEqual(len([name for name in os.listdir(self.directory.name)
+                              if os.path.isdir(os.path.join(self.directory.name, name))]), 2)
+        self.assertEqual(mapped.top('cause_id', 1), [(self.causes[1].id, 1000)])
+        analytics.refresh()
+        self.assertFalse(os.path.exists(mapped.path))
@@ -0,0 +1,46 @@
+import os
+from unittest.mock import patch
+
+from django.contrib.auth.models import User, Group
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from dps_main.tests import DpsTestCase
+from dps_main.utilities.bootstrap import bootstrap, is_bootstrapped
+from dps_main.utilities.routines import get_default_group
+
+
+class BootstrapTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+
+    @patch.dict(os.environ, {'DJANGO_SUPER_USER': 'boot', 'DJANGO_SUPER_EMAIL': 'boot@email.com',
+                             'DJANGO_SUPER_PASSWORD': 'sgsgsgsgwt2r2t23'})
+    def test_bootstrap_once(self):
+        """
+        GIVEN a fresh deployment
+        WHEN it is bootstrapped repeatedly
+        THEN the routines should run only the first time, unless forced
+        """
+        self.assertFalse(is_bootstrapped())
+        self.assertTrue(bootstrap())
+        self.assertTrue(User.objects.get(username='boot').is_superuser)
+        self.assertTrue(Group.objects.filter(name=get_default_group()).exists())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(bootstrap())
+        self.assertTrue(bootstrap(force=True))
+        self.assertEqual(User.objects.filter(username='boot').count(), 1)
+
+    @override_settings(ENVIRONMENT='development')
+    def test_connection_created(self):
+        """
+        GIVEN a worker outside of tests
+        WHEN a new DB connection is made
+        THEN no bootstrap queries should be run
+        """
+        with self.assertNumQueries(0):
+            connection_created.send(sender=connection.__class__, connection=connection)
@@ -0,0 +1,52 @@
+from unittest import skipUnless
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+
+from dps_main.models import Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import datagen, faker
+
+
+class DataGenTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+
+    def test_sample_pairs(self):
+        """
+        GIVEN a grid of users and causes
+        WHEN pairs are sampled, sparsely or densely
+        THEN they should be distinct, within the grid and capped at its size
+        """
+        rng = np.random.default_rng(7)
+        for size in (10, 150, 500):
+            rows, columns = datagen.sample_pairs(rng, 20, 10, size)
+            self.assertEqual(len(rows), min(size, 200))
+            self.assertEqual(len(set(zip(rows.tolist(), columns.tolist()))), len(rows))
+            self.assertTrue(0 <= rows.min() and rows.max() < 20 and 0 <= columns.min() and columns.max() < 10)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Demo data is streamed with COPY, which needs postgresql')
+    def test_generate(self):
+        """
+        GIVEN an empty database
+        WHEN demo data is generated
+        THEN the requested rows should be written, with the aggregates derived from them
+        """
+        written = datagen.generate(causes=6, users=8, promises=30, seed=3)
+        self.assertEqual(written, dict(users=8, causes=6, promises=30))
+        self.assertEqual(Cause.objects.count(), 6)
+        self.assertEqual(User.objects.filter(username__startswith='demo').count(), 8)
+        self.assertEqual(Promise.objects.count(), 30)
+        self.assertEqual(set(Cause.objects.values_list('illustration', flat=True)), {faker.PLACEHOLDER_ILLUSTRATION})
+
+        self.assertEqual(sum(Cause.objects.values_list('promise_count', flat=True)), 30)
+        self.assertAlmostEqual(sum(Cause.objects.values_list('promised_total', flat=True)),
+                               Promise.objects.aggregate(s=Sum('amount'))['s'], places=2)
+
+        # more promises than the new users can make are capped
+        written = datagen.generate(causes=0, users=2, promises=100, seed=3)
+        self.assertEqual(written['promises'], 12)
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import AnonymousUser
+
+from dps_main.models import Cause
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import cachebench, dependencies, faker
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.cachestats import CaptureCacheStats
+
+
+class DependenciesTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.admin = ActionHelper(faker.bulk_causes(5))
+        self.member = ActionHelper(faker.user(True)[1])
+        self.other = ActionHelper(faker.user(True)[1])
+        self.anonymous = ActionHelper(AnonymousUser())
+        self.causes = list(Cause.objects.order_by('id').values_list('id', flat=True))
+
+    def _pages(self):
+        """
+        The first page of available causes of the member, of another member and of an anonymous visitor
+        :return: tuple of (list of ids per page, cachestats tally)
+        """
+        with CaptureCacheStats() as stats:
+            pages = [[cause.id for cause in helper.page_available_causes(15)]
+                     for helper in (self.member, self.other, self.anonymous)]
+        return pages, [stats.tally[('available-causes', 'hit')], stats.tally[('available-causes', 'miss')]]
+
+    def test_cached(self):
+        """
+        GIVEN a value cached along with its dependencies
+        WHEN read again, before and after one of them is invalidated
+        THEN it should be served from the cache, and then recomputed
+        """
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return len(computed)
+
+        tags = [dependencies.cause(1), dependencies.CAUSE_LIST]
+        self.assertEqual(dependencies.cached('test', 'key', tags, compute), 1)
+        self.assertEqual(dependencies.cached('test', 'key', tags, compute), 1)
+        dependencies.invalidate(dependencies.cause(2))
+        self.assertEqual(dependencies.cached('test', 'key', tags, compute), 1)
+        dependencies.invalidate(dependencies.cause(1))
+        self.assertEqual(dependencies.cached('test', 'key', tags, compute), 2)
+        dependencies.invalidate(dependencies.EVERYTHING)
+        self.assertEqual(dependencies.cached('test', 'key', tags, compute), 3)
+
+    def test_promise(self):
+        """
+        GIVEN cached pages of available causes
+        WHEN a member promises
+        THEN only that member's availability, the cause's aggregates and the leaderboards should be invalidated
+        """
+        self._pages()
+        cause_id = self.causes[0]
+        unaffected = dependencies.generation(dependencies.cause(cause_id), dependencies.CAUSE_LIST,
+                                             dependencies.cause_aggregates(self.causes[1]))
+        affected = dependencies.generation(dependencies.cause_aggregates(cause_id), dependencies.LEADERBOARDS)
+
+        self.member.add_promise_to_cause(cause_id, amount=100.0, target_date=date.today() + timedelta(days=30))
+
+        (member, other, anonymous), (hits, misses) = self._pages()
+        self.assertEqual((hits, misses), (2, 1))
+        self.assertNotIn(cause_id, member)
+        self.assertIn(cause_id, other)
+        self.assertEqual(dependencies.generation(dependencies.cause(cause_id), dependencies.CAUSE_LIST,
+                                                 dependencies.cause_aggregates(self.causes[1])), unaffected)
+        self.assertNotEqual(dependencies.generation(dependencies.cause_aggregates(cause_id),
+                                                    dependencies.LEADERBOARDS), affected)
+
+    def test_cause_edit(self):
+        """
+        GIVEN cached pages of available causes
+        WHEN a cause is edited
+        THEN only that cause and the cause list should be invalidated
+        """
+        self._pages()
+        cause_id = self.causes[0]
+        unaffected = dependencies.generation(dependencies.cause(self.causes[1]), dependencies.LEADERBOARDS,
+                                             dependencies.availability(self.member.user.id))
+        affected = dependencies.generation(dependencies.cause(cause_id))
+
+        self.admin.update_cause(cause_id, title='Edited')
+
+        _, (hits, misses) = self._pages()
+        self.assertEqual((hits, misses), (0, 3))
+        self.assertEqual(dependencies.generation(dependencies.cause(self.causes[1]), dependencies.LEADERBOARDS,
+                                                 dependencies.availability(self.member.user.id)), unaffected)
+        self.assertNotEqual(dependencies.generation(dependencies.cause(cause_id)), affected)
+
+    def test_benchmark(self):
+        """
+        GIVEN a mixed read/write workload
+        WHEN run with dependency-aware invalidation and with every write invalidating everything
+        THEN dependency-aware invalidation should hit more often, and the writes should be rolled back
+        """
+        faker.user(True)
+        promises = self.member.list_promises().count()
+        results = cachebench.run(operations=300, write_ratio=0.2, members=3, seed=1)
+        self.assertGreater(results['fine']['hit_ratio'], results['coarse']['hit_ratio'])
+        self.assertEqual(results['fine']['writes'], results['coarse']['writes'])
+        self.assertEqual(self.member.list_promises().count(), promises)
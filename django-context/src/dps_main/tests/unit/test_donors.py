@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils.timezone import now
+
+from dps_main.models import Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import donors, faker, rollups
+from dps_main.utilities.actions import ActionHelper
+
+
+@override_settings(ROLLUP_LAG=0)
+class DonorsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.admin = ActionHelper(faker.bulk_causes(2))
+        self.first, self.second = Cause.objects.order_by('id')[:2]
+        users = [faker.user(True)[1] for _ in range(4)]
+        for user in users[:3]:
+            faker.make_promise(create=True, user=user, cause=self.first)
+        for user in users[2:]:
+            faker.make_promise(create=True, user=user, cause=self.second)
+        # the rollup job feeds the sketches
+        self.assertEqual(donors.count(), 0)
+        rollups.run()
+
+    def test_count(self):
+        """
+        GIVEN donors to two causes, one of them to both
+        WHEN counted per cause, across both, this week and in weeks without promises
+        THEN each donor should count once
+        """
+        this_week = donors.weeks(now(), now())
+        self.assertEqual(donors.count([self.first.id]), 3)
+        self.assertEqual(donors.count([self.second.id]), 2)
+        self.assertEqual(donors.count([self.first.id, self.second.id]), 4)
+        self.assertEqual(donors.count(), 4)
+        self.assertEqual(donors.count(in_weeks=this_week), 4)
+        self.assertEqual(donors.count([self.second.id], this_week), 2)
+        self.assertEqual(donors.count(in_weeks=donors.weeks(now() - timedelta(weeks=5), now() - timedelta(weeks=2))),
+                         0)
+
+    def test_settled_weeks(self):
+        """
+        GIVEN a count over past weeks, whose merged sketches are then kept
+        WHEN a late donor is added to one of those weeks
+        THEN the next count should include them
+        """
+        past = now() - timedelta(weeks=2)
+        in_weeks = donors.weeks(past, now())
+        users = [faker.user(True)[1] for _ in range(2)]
+        donors.add([(users[0].id, self.second.id, past)])
+        self.assertEqual(donors.count([self.second.id], in_weeks), 3)
+        self.assertEqual(donors.count([self.second.id], in_weeks), 3)
+        donors.add([(users[1].id, self.second.id, past)])
+        self.assertEqual(donors.count([self.second.id], in_weeks), 4)
+
+    def test_rebuild(self):
+        """
+        GIVEN a deleted promise
+        WHEN the sketches are rebuilt
+        THEN its donor should no longer count
+        """
+        self.admin.delete_promise(Promise.objects.filter(cause=self.second).order_by('id').first().id)
+        rollups.run()
+        self.assertEqual(donors.count([self.second.id]), 2)
+        self.assertEqual(donors.rebuild(), 4)
+        self.assertEqual(donors.count([self.second.id]), 1)
+
+    def test_error(self):
+        """
+        GIVEN many distinct users
+        WHEN estimated
+        THEN the estimate should be within three standard errors
+        """
+        registers = bytearray(2 ** donors.PRECISION)
+        for user_id in range(20000):
+            register, rank = donors._register(user_id)
+            registers[register] = max(registers[register], rank)
+        self.assertAlmostEqual(donors._estimate(registers), 20000, delta=20000 * donors.ERROR * 3)
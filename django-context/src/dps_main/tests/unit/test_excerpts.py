@@ -0,0 +1,73 @@
+from datetime import date
+
+from dps_main.models import Cause
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import excerpts, faker
+from dps_main.utilities.actions import ActionHelper
+
+_DESCRIPTION = '<p>' + ' '.join(F'word{index}' for index in range(50)) + '</p>'
+
+
+class ExcerptsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.ah = ActionHelper(faker.user(True, True)[1])
+        self.cause = self.ah.create_cause(title='Title', description=_DESCRIPTION, contact=faker.contact(create=True)[1],
+                                          expiration_date=date.today(), target_amount=30000)
+
+    def test_make(self):
+        """
+        GIVEN a description longer than an excerpt, with markup
+        WHEN excerpts are made of it
+        THEN both should hold its first words, the plain one without markup and the other with balanced tags
+        """
+        plain, html = excerpts.make(_DESCRIPTION)
+        self.assertEqual(plain, ' '.join(F'word{index}' for index in range(excerpts.WORDS)) + ' …')
+        self.assertEqual(html, '<p>' + plain + '</p>')
+        self.assertEqual(excerpts.make(None), ('', ''))
+
+    def test_maintained(self):
+        """
+        GIVEN a cause
+        WHEN its description is changed, by saving it or through an update
+        THEN its excerpts should follow, and a save that didn't load the description should leave them alone
+        """
+        self.assertEqual((self.cause.excerpt, self.cause.excerpt_html), excerpts.make(_DESCRIPTION))
+
+        self.cause.description = 'Saved'
+        self.cause.save()
+        self.assertEqual(Cause.objects.get(pk=self.cause.pk).excerpt, 'Saved')
+
+        self.ah.update_cause(self.cause.pk, description='<b>Updated</b>')
+        self.assertEqual(Cause.objects.values_list('excerpt', 'excerpt_html').get(pk=self.cause.pk),
+                         ('Updated', '<b>Updated</b>'))
+
+        deferred = Cause.objects.defer('description').get(pk=self.cause.pk)
+        deferred.title = 'Retitled'
+        with self.assertNumQueries(1):
+            deferred.save()
+        self.assertEqual(Cause.objects.get(pk=self.cause.pk).excerpt, 'Updated')
+
+    def test_backfill(self):
+        """
+        GIVEN causes without excerpts
+        WHEN backfilled in batches
+        THEN each should get its excerpts, once
+        """
+        faker.bulk_causes(3)
+        Cause.objects.update(excerpt='', excerpt_html='')
+        self.assertEqual(excerpts.backfill(batch_size=2), 4)
+        self.assertEqual(excerpts.backfill(batch_size=2), 0)
+        self.assertEqual(Cause.objects.get(pk=self.cause.pk).excerpt_html, excerpts.make(_DESCRIPTION)[1])
+        self.assertEqual(excerpts.backfill(everything=True), 4)
+
+    def test_lists_defer_description(self):
+        """
+        GIVEN causes
+        WHEN listed
+        THEN their descriptions should be left unloaded
+        """
+        self.assertIn('description', self.ah.list_causes().first().get_deferred_fields())
+        self.assertIn('description', self.ah.list_available_causes().first().get_deferred_fields())
@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+from datetime import date, timedelta
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from dps_main.models import Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import export, faker
+
+
+class ExportTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        faker.bulk_causes(4)
+        faker.bulk_users(3)
+        faker.make_bulk_promises(10)
+        self.cause = Promise.objects.order_by('id').first().cause_id
+
+    def test_csv(self):
+        """
+        GIVEN promises
+        WHEN exported as CSV, whole and filtered by cause
+        THEN there should be a header and a row per promise, in id order
+        """
+        lines = list(csv.reader(StringIO(''.join(export.render(export.PROMISES, export.CSV)))))
+        self.assertEqual(tuple(lines[0]), export.MODELS[export.PROMISES][1])
+        self.assertEqual([int(line[0]) for line in lines[1:]], list(Promise.objects.order_by('id')
+                                                                    .values_list('id', flat=True)))
+
+        lookups = export.parse_filters(export.PROMISES, cause=str(self.cause))
+        lines = list(csv.reader(StringIO(''.join(export.render(export.PROMISES, export.CSV, **lookups)))))
+        self.assertEqual(len(lines) - 1, Promise.objects.filter(cause_id=self.cause).count())
+        self.assertEqual({int(line[1]) for line in lines[1:]}, {self.cause})
+
+    def test_ndjson(self):
+        """
+        GIVEN causes
+        WHEN exported as NDJSON
+        THEN each line should be a JSON object of a cause
+        """
+        rows = [json.loads(line) for line in ''.join(export.render(export.CAUSES, export.NDJSON)).splitlines()]
+        self.assertEqual(len(rows), Cause.objects.count())
+        self.assertEqual(set(rows[0]), set(export.MODELS[export.CAUSES][1]))
+
+    def test_filters(self):
+        """
+        GIVEN raw filters
+        WHEN parsed
+        THEN dates should bound the creation day inclusively and malformed ones should be refused
+        """
+        today = date.today()
+        lookups = export.parse_filters(export.PROMISES, user='3', since=today.isoformat(), until=today.isoformat())
+        self.assertEqual(lookups['user_id'], 3)
+        self.assertEqual(lookups['created__lt'] - lookups['created__gte'], timedelta(days=1))
+        self.assertEqual(Promise.objects.filter(**lookups).count(), Promise.objects.filter(user_id=3).count())
+        self.assertEqual(export.parse_filters(export.CAUSES, user=1), {'creator_id': 1})
+        for filters in (dict(cause='one'), dict(since='yesterday'), dict(until='2026-13-01')):
+            with self.subTest(**filters), self.assertRaises(ValueError):
+                export.parse_filters(export.PROMISES, **filters)
+        with self.assertRaises(ValueError):
+            export.render(export.PROMISES, 'xml')
+
+    def test_command(self):
+        """
+        GIVEN promises
+        WHEN exported by the management command
+        THEN the file should hold all of them
+        """
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'promises.ndjson')
+            call_command('export', 'promises', '--format', 'ndjson', '--output', output, stdout=StringIO())
+            with open(output) as f:
+                self.assertEqual(len(f.readlines()), Promise.objects.count())
+            with self.assertRaises(CommandError):
+                call_command('export', 'promises', '--since', 'yesterday', '--output', output, stdout=StringIO())
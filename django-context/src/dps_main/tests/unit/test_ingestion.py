@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+
+from dps_main.models import Contact, Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import ingestion
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.redisclient import get_redis
+
+
+class IngestionTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        self.user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        self.su = User.objects.create_superuser('admin5', 'super@email.com', 'sgsgsgsgwt2r2t23')
+        cn = Contact.objects.create(first_name='First', last_name='Last', address='Address', phone='+00000000',
+                                    email='a@email.com')
+        self.cause = ActionHelper(self.su).create_cause(title='Title', description='Description', contact=cn,
+                                                        expiration_date=date.today(), target_amount=30000)
+
+    def _queue(self, user, cause_id, amount=30):
+        return ActionHelper(user).queue_promise_to_cause(cause_id, amount=amount, target_date=date.today())
+
+    def test_drain(self):
+        """
+        GIVEN queued promises, one of them a duplicate and one against a missing cause
+        WHEN the queue is drained
+        THEN promises should be written in a batch and every item should report its own state
+        """
+        created, other = self._queue(self.user, self.cause.id), self._queue(self.su, self.cause.id, 70)
+        duplicate, failed = self._queue(self.user, self.cause.id), self._queue(self.user, self.cause.id + 1000)
+        self.assertEqual(ingestion.status(created)['state'], ingestion.QUEUED)
+
+        self.assertEqual(ingestion.drain(), {ingestion.CREATED: 2, ingestion.DUPLICATE: 1, ingestion.FAILED: 1})
+        self.assertEqual(ingestion.drain(), {})
+
+        self.assertEqual(ingestion.status(created)['promise_id'],
+                         Promise.objects.get(cause=self.cause, user=self.user).id)
+        self.assertEqual(ingestion.status(other)['state'], ingestion.CREATED)
+        self.assertEqual(ingestion.status(duplicate)['state'], ingestion.DUPLICATE)
+        self.assertEqual(ingestion.status(failed)['state'], ingestion.FAILED)
+
+        # aggregates follow the batch
+        cause = Cause.objects.get(pk=self.cause.id)
+        self.assertEqual((cause.promise_count, cause.promised_total), (2, 100))
+
+    def test_recover(self):
+        """
+        GIVEN a worker that died with items in its processing list
+        WHEN the worker restarts
+        THEN those items should be queued again
+        """
+        self._queue(self.user, self.cause.id)
+        get_redis().rpoplpush('dps_main:ingestion:queue', 'dps_main:ingestion:processing:default')
+        self.assertEqual(ingestion.drain(), {})
+
+        self.assertEqual(ingestion.recover(), 1)
+        self.assertEqual(ingestion.drain(), {ingestion.CREATED: 1})
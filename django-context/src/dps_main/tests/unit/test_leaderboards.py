@@ -0,0 +1,98 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from redis.exceptions import ConnectionError
+
+from dps_main.models import Contact, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import leaderboards
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.redisclient import get_redis
+
+
+class LeaderboardsTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        self.user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        self.su = User.objects.create_superuser('admin5', 'super@email.com', 'sgsgsgsgwt2r2t23')
+        ah = ActionHelper(self.su)
+        self.causes = [ah.create_cause(title='Title', description='Description', target_amount=30000,
+                                       expiration_date=date.today(),
+                                       contact=Contact.objects.create(first_name='First', last_name='Last',
+                                                                      address='Address', phone='+00000000',
+                                                                      email='a@email.com'))
+                       for _ in range(3)]
+
+    def _promise(self, user, cause, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ActionHelper(user).add_promise_to_cause(cause.id, amount=amount, target_date=date.today())
+
+    def test_promise_writes(self):
+        """
+        GIVEN a few causes
+        WHEN promises are made, updated and deleted
+        THEN the leaderboards should rank the causes accordingly
+        """
+        rich, popular, other = self.causes
+        p = self._promise(self.user, rich, 5000)
+        self._promise(self.user, popular, 10)
+        self._promise(self.su, popular, 10)
+
+        self.assertEqual(leaderboards.top(leaderboards.BY_AMOUNT, 1), [(rich.id, 5000)])
+        self.assertEqual(leaderboards.top(leaderboards.BY_PROMISES, 1), [(popular.id, 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ActionHelper(self.user).delete_promise(p.id)
+        self.assertEqual(leaderboards.top(leaderboards.BY_AMOUNT, 1), [(popular.id, 20)])
+
+        # unranked causes pad the result
+        self.assertEqual([cause.id for cause in leaderboards.top_causes(leaderboards.BY_AMOUNT, 3)][:1],
+                         [popular.id])
+        self.assertEqual(len(leaderboards.top_causes(leaderboards.BY_AMOUNT, 3)), 3)
+
+    def test_rebuild(self):
+        """
+        GIVEN a leaderboard that lost its data
+        WHEN it is rebuilt from the database
+        THEN the ranking should be restored
+        """
+        rich, popular, other = self.causes
+        self._promise(self.user, rich, 5000)
+        get_redis().flushdb()
+        self.assertEqual(leaderboards.top(leaderboards.BY_AMOUNT), [])
+
+        self.assertEqual(leaderboards.rebuild(), 1)
+        self.assertEqual(leaderboards.top(leaderboards.BY_AMOUNT), [(rich.id, 5000)])
+
+    def test_size(self):
+        """
+        GIVEN the configurable N
+        WHEN a limit is resolved
+        THEN defaults, caps and invalid values should be honoured
+        """
+        self.assertEqual(leaderboards.leaderboard_size(), self.get_settings().LEADERBOARD_SIZE)
+        self.assertEqual(leaderboards.leaderboard_size('7'), 7)
+        self.assertEqual(leaderboards.leaderboard_size(10 ** 6), self.get_settings().LEADERBOARD_MAX_SIZE)
+        with self.assertRaises(ValueError):
+            leaderboards.leaderboard_size(-1)
+
+    def test_redis_outage(self):
+        """
+        GIVEN redis going away
+        WHEN a promise commits
+        THEN the promise should stand, and a rebuild should put it on the leaderboards
+        """
+        rich = self.causes[0]
+        with patch.object(leaderboards, 'record', side_effect=ConnectionError()), \
+                self.assertLogs('dps_main.utilities.redisclient', 'ERROR'):
+            p = self._promise(self.user, rich, 5000)
+        self.assertTrue(Promise.objects.filter(pk=p.id).exists())
+
+        leaderboards.rebuild()
+        self.assertEqual(leaderboards.top(leaderboards.BY_AMOUNT), [(rich.id, 5000)])
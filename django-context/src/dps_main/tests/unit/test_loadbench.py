@@ -0,0 +1,66 @@
+from dps_main.tests import DpsTestCase, DpsTransactionTestCase
+from dps_main.utilities import faker
+from dps_main.utilities.loadbench import ENDPOINTS, percentile, run, _summarize
+
+
+class LoadBenchTestCase(DpsTestCase):
+
+    def test_percentile(self):
+        """
+        GIVEN sorted latencies
+        WHEN percentiles are taken
+        THEN the nearest ranks should be returned
+        """
+        ordered = list(range(1, 101))
+        self.assertEqual(percentile(ordered, 50), 50)
+        self.assertEqual(percentile(ordered, 95), 95)
+        self.assertEqual(percentile(ordered, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize(self):
+        """
+        GIVEN measured requests
+        WHEN they are summarized
+        THEN throughput should span the requests, and statuses and queries should be tallied
+        """
+        samples = [(0.0, 0.1, 200, 2), (0.1, 0.3, 200, 4), (0.2, 0.5, 400, 1), (0.3, 1.0, 200, 3)]
+        summary = _summarize(samples)
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['rps'], 4.0)
+        self.assertEqual(summary['p50_ms'], 200.0)
+        self.assertEqual(summary['p99_ms'], 700.0)
+        self.assertEqual(summary['queries_mean'], 2.5)
+        self.assertEqual(summary['queries_max'], 4)
+        self.assertEqual(summary['statuses'], {'200': 3, '400': 1})
+
+
+class LoadBenchRunTestCase(DpsTransactionTestCase):
+
+    def setUp(self):
+        """
+        A small dataset, committed for the benchmark's threads to see
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        faker.bulk_causes(10)
+        for _ in range(2):
+            faker.user(True)
+
+    def test_run(self):
+        """
+        GIVEN a small dataset
+        WHEN the endpoints are benchmarked in-process
+        THEN each should be reported with its measured requests, latencies, queries and successful statuses
+        """
+        report = run(concurrency=2, requests=4, warmup=1)
+        self.assertEqual(list(report), [endpoint.name for endpoint in ENDPOINTS])
+        for name, summary in report.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(set(summary), {'requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_mean',
+                                                'queries_max', 'statuses'})
+                self.assertEqual(summary['requests'], 4)
+                self.assertLessEqual(summary['p50_ms'], summary['p95_ms'])
+                self.assertLessEqual(summary['p95_ms'], summary['p99_ms'])
+                self.assertIsNotNone(summary['queries_mean'])
+                self.assertTrue(all(int(status) < 400 for status in summary['statuses']), summary['statuses'])
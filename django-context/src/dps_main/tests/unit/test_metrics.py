@@ -0,0 +1,64 @@
+from django.contrib.auth.models import AnonymousUser
+
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import metrics
+from dps_main.utilities.actions import ActionHelper
+
+
+class MetricsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+        super().tearDown()
+
+    def test_render(self):
+        """
+        GIVEN counters and histograms, some flushed already
+        WHEN rendered
+        THEN every sample should be added up, with histogram buckets cumulative
+        """
+        metrics.inc('dps_responses_total', view='home', status=200)
+        metrics.observe('dps_request_duration_seconds', 0.003, view='home')
+        metrics.flush()
+        metrics.inc('dps_responses_total', view='home', status=200)
+        metrics.observe('dps_request_duration_seconds', 0.2, view='home')
+
+        text = metrics.render()
+        self.assertIn('# TYPE dps_request_duration_seconds histogram', text)
+        self.assertIn('dps_responses_total{status="200",view="home"} 2', text)
+        self.assertIn('dps_request_duration_seconds_bucket{view="home",le="0.001"} 0', text)
+        self.assertIn('dps_request_duration_seconds_bucket{view="home",le="0.005"} 1', text)
+        self.assertIn('dps_request_duration_seconds_bucket{view="home",le="0.25"} 2', text)
+        self.assertIn('dps_request_duration_seconds_bucket{view="home",le="+Inf"} 2', text)
+        self.assertIn('dps_request_duration_seconds_count{view="home"} 2', text)
+
+    def test_action_helper(self):
+        """
+        GIVEN the action helper
+        WHEN its methods are called
+        THEN each should be timed under its own name
+        """
+        helper = ActionHelper(AnonymousUser())
+        helper.ping()
+        list(helper.list_available_causes())
+        text = metrics.render()
+        self.assertIn('dps_action_duration_seconds_count{method="ping"} 1', text)
+        self.assertIn('dps_action_duration_seconds_count{method="list_available_causes"} 1', text)
+        self.assertEqual(helper.ping(), 'pong')
+
+    def test_endpoint(self):
+        """
+        GIVEN a request to a page
+        WHEN the metrics are scraped
+        THEN the request should be counted under the page's url name
+        """
+        self.client.get('/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'dps_request_duration_seconds_count{view="home"} 1', response.content)
+        self.assertIn(b'dps_db_queries_total{view="home"}', response.content)
@@ -4,6 +4,7 @@ from dps_main.tests import DpsTestCase
 
 class ContactTestCase(DpsTestCase):
     def setUp(self):
+        super().setUp()
         self.assertTestEnvironment()
         Contact.objects.create(first_name="Barrack", last_name="Obama", address="White House",
                                phone="+111111111", email="potus@whitehouse.gov")
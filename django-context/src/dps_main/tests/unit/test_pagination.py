@@ -0,0 +1,50 @@
+from dps_main.models import Cause
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker
+from dps_main.utilities.pagination import keyset_page, encode_cursor, decode_cursor
+
+
+class PaginationTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        faker.bulk_causes(12)
+        self.causes = list(Cause.objects.order_by('-created', '-id'))
+
+    def test_cursor(self):
+        """
+        GIVEN an instance
+        WHEN a cursor is made out of it
+        THEN it should decode back to its position, while garbage should be refused
+        """
+        cause = self.causes[0]
+        self.assertEqual(decode_cursor(encode_cursor(cause)), (cause.created, cause.id))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_walk(self):
+        """
+        GIVEN a list of causes
+        WHEN walked forward and back with cursors
+        THEN pages should follow each other without gaps or overlaps
+        """
+        first = keyset_page(Cause.objects.all(), 5)
+        self.assertEqual(first.object_list, self.causes[:5])
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+
+        second = keyset_page(Cause.objects.all(), 5, after=first.next_cursor)
+        self.assertEqual(second.object_list, self.causes[5:10])
+        last = keyset_page(Cause.objects.all(), 5, after=second.next_cursor)
+        self.assertEqual(last.object_list, self.causes[10:])
+        self.assertFalse(last.has_next())
+
+        back = keyset_page(Cause.objects.all(), 5, before=last.previous_cursor)
+        self.assertEqual(back.object_list, self.causes[5:10])
+        self.assertTrue(back.has_previous())
+        self.assertEqual(keyset_page(Cause.objects.all(), 5, before=back.previous_cursor).object_list,
+                         self.causes[:5])
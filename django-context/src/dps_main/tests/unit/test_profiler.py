@@ -0,0 +1,64 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, override_settings
+
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker, profiler
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'unique-snowflake',
+    }
+})
+class ProfilerTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.factory = RequestFactory()
+        self.admin = faker.user(True, True)[1]
+        self.admin.is_staff = True
+        self.admin.save()
+
+    def _request(self, user, **extra):
+        request = self.factory.get('/', **extra)
+        request.user = user
+        return request
+
+    def test_should_profile(self):
+        """
+        GIVEN requests asking to be profiled, or not
+        WHEN checked
+        THEN only staff or holders of a valid token should be profiled, unless sampled
+        """
+        self.assertTrue(profiler.should_profile(self._request(self.admin, data={'profile': ''})))
+        self.assertFalse(profiler.should_profile(self._request(self.admin)))
+        self.assertFalse(profiler.should_profile(self._request(AnonymousUser(), data={'profile': ''})))
+        self.assertFalse(profiler.should_profile(self._request(AnonymousUser(), HTTP_X_DPS_PROFILE='forged')))
+        self.assertTrue(profiler.should_profile(self._request(AnonymousUser(),
+                                                              HTTP_X_DPS_PROFILE=profiler.make_token())))
+        self.assertFalse(profiler.should_profile(self._request(AnonymousUser(),
+                                                               HTTP_X_DPS_PROFILE=profiler.make_token(-1))))
+        with override_settings(PROFILER_SAMPLE_RATE=1.0):
+            self.assertTrue(profiler.should_profile(self._request(AnonymousUser())))
+
+    def test_profile(self):
+        """
+        GIVEN a staff user
+        WHEN a page is requested with the profile flag
+        THEN its hot functions and SQL should be stored and listed
+        """
+        faker.bulk_causes(3, self.admin)
+        self.client.force_login(self.admin)
+        self.client.get('/', {'profile': ''})
+        self.client.get('/')
+
+        profiles = profiler.recent()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]['view'], 'home')
+        self.assertGreater(profiles[0]['query_count'], 0)
+
+        found = profiler.get(profiles[0]['id'])
+        self.assertTrue(found['functions'])
+        self.assertTrue(any('dps_main_cause' in query['sql'] for query in found['queries']))
@@ -0,0 +1,76 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+
+from dps_main.models import Contact, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import promisedcauses
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.promisedcauses import promised_cause_ids
+
+
+class PromisedCausesTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        self.user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        su = User.objects.create_superuser('admin5', 'super@email.com', 'sgsgsgsgwt2r2t23')
+        ah = ActionHelper(su)
+        self.causes = [ah.create_cause(title='Title', description='Description', target_amount=30000,
+                                       expiration_date=date.today(),
+                                       contact=Contact.objects.create(first_name='First', last_name='Last',
+                                                                      address='Address', phone='+00000000',
+                                                                      email='a@email.com'))
+                       for _ in range(2)]
+
+    def test_lazy_fill(self):
+        """
+        GIVEN a user with a promise
+        WHEN the promised causes are read twice
+        THEN only the first read should hit the database
+        """
+        Promise.objects.create(cause=self.causes[0], user=self.user, amount=30, target_date=date.today())
+        with self.assertNumQueries(1):
+            self.assertEqual(promised_cause_ids(self.user.id), {self.causes[0].id})
+        with self.assertNumQueries(0):
+            self.assertEqual(promised_cause_ids(self.user.id), {self.causes[0].id})
+
+    def test_promise_writes(self):
+        """
+        GIVEN a user's cached set of promised causes
+        WHEN the user makes and deletes promises
+        THEN available causes should follow along
+        """
+        ah = ActionHelper(self.user)
+        self.assertEqual(promised_cause_ids(self.user.id), set())
+        self.assertEqual(len(ah.list_available_causes()), 2)
+
+        p = ah.add_promise_to_cause(self.causes[1].id, amount=30, target_date=date.today())
+        self.assertEqual(list(ah.list_available_causes()), [self.causes[0]])
+
+        ah.delete_promise(p.id)
+        self.assertEqual(len(ah.list_available_causes()), 2)
+
+    def test_racing_read(self):
+        """
+        GIVEN a read of the promised causes that started before a promise write
+        WHEN the write invalidates the set before the read stores it
+        THEN the read's rows should not be stored
+        """
+        load = promisedcauses._load
+
+        def racing(user_id):
+            ids = load(user_id)
+            Promise.objects.create(cause=self.causes[0], user=self.user, amount=30, target_date=date.today())
+            promisedcauses.invalidate(user_id)
+            return ids
+
+        with patch.object(promisedcauses, '_load', racing):
+            self.assertEqual(promised_cause_ids(self.user.id), set())
+        with self.assertNumQueries(1):
+            self.assertEqual(promised_cause_ids(self.user.id), {self.causes[0].id})
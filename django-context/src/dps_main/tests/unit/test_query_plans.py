@@ -0,0 +1,69 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+
+from dps_main.models import Cause, Promise
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker
+from dps_main.utilities.queryplans import HotQuery, hot_querysets, check_query_plans, sequential_scans, \
+    index_conditions, sorts
+
+
+class QueryPlansTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        self.admin = faker.bulk_causes(20)
+        faker.bulk_users(5)
+        self.member = User.objects.filter(is_superuser=False).first() or faker.user(create=True)[1]
+        faker.make_bulk_promises(30)
+
+    def test_sequential_scans(self):
+        """
+        GIVEN a plan tree
+        WHEN it is searched for sequential scans
+        THEN only scans of the app's tables should be reported, however deep
+        """
+        plan = {'Node Type': 'Limit', 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'auth_user'},
+            {'Node Type': 'Hash Join', 'Plans': [{'Node Type': 'Seq Scan', 'Relation Name': 'dps_main_promise'}]}]}
+        self.assertEqual(sequential_scans(plan), ['dps_main_promise'])
+
+    def test_index_use(self):
+        """
+        GIVEN a plan reading a whole index and sorting what it filtered
+        WHEN its index conditions and sorts are looked for
+        THEN the filter shouldn't be taken for indexed and the sort should be found
+        """
+        plan = {'Node Type': 'Sort', 'Plans': [
+            {'Node Type': 'Index Scan', 'Relation Name': 'dps_main_promise', 'Index Name': 'promise_created_id_idx',
+             'Filter': '(user_id = 1)'}]}
+        self.assertEqual(index_conditions(plan), [])
+        self.assertTrue(sorts(plan))
+        self.assertFalse(sorts(plan['Plans'][0]))
+
+    @skipUnless(connection.vendor == 'postgresql', 'Query plans are checked against postgresql')
+    def test_hot_paths_are_indexed(self):
+        """
+        GIVEN the hot path querysets
+        WHEN they are EXPLAINed with sequential scans priced out
+        THEN none of them should fall back to one, filter outside an index condition or sort rows an index orders
+        """
+        cause_ids = list(Cause.objects.values_list('id', flat=True)[:15])
+        self.assertEqual(check_query_plans(hot_querysets(self.member, self.admin, cause_ids)), {})
+
+    @skipUnless(connection.vendor == 'postgresql', 'Query plans are checked against postgresql')
+    def test_unindexed_filter_is_reported(self):
+        """
+        GIVEN a queryset filtering on a column no index leads with
+        WHEN it is EXPLAINed with sequential scans priced out
+        THEN the filter should be reported even though an index is scanned
+        """
+        hot = HotQuery('by_amount', Promise.objects.filter(amount=100).order_by('-created', '-id')[:15], ('amount',),
+                       True)
+        self.assertEqual(check_query_plans([hot]), {'by_amount': ['no index condition on amount']})
@@ -1,9 +1,12 @@
 import redis
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 from mockredis import mock_redis_client, mock_strict_redis_client
+from redis.exceptions import ConnectionError
 
 from dps_main.tests import DpsTestCase
+from dps_main.utilities import versions
+from dps_main.utilities.redisclient import now_and_on_commit
 
 
 class RedisTestCase(DpsTestCase):
@@ -27,6 +30,7 @@ class RedisTestCase(DpsTestCase):
         """
         Sets a key value pre-test
         """
+        super().setUp()
         self.assertTestEnvironment()
         self.redis.set('one', 1)
 
@@ -61,3 +65,31 @@ class RedisTestCase(DpsTestCase):
             cls.redis.flushdb()
         cls.redis = None
         super().tearDownClass()
+
+
+class RedisOutageTestCase(DpsTestCase):
+
+    def test_now_and_on_commit(self):
+        """
+        GIVEN redis going away
+        WHEN a write invalidates along with its transaction
+        THEN the failures should be logged, now and on commit, rather than raised
+        """
+        callback = Mock(side_effect=ConnectionError())
+        with self.assertLogs('dps_main.utilities.redisclient', 'ERROR') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            now_and_on_commit('drop things', callback, 1, 2)
+        self.assertEqual(callback.call_count, 2)
+        callback.assert_called_with(1, 2)
+        self.assertEqual(len(logs.output), 2)
+
+    def test_touch(self):
+        """
+        GIVEN redis going away
+        WHEN a write touches the versions
+        THEN the write should carry on
+        """
+        with patch.object(versions, 'bump', side_effect=ConnectionError()), \
+                self.assertLogs('dps_main.utilities.redisclient', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            versions.touch(versions.CAUSE)
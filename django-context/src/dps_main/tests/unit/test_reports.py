@@ -66,6 +66,7 @@ def _create_fixtures():
 class ReportsTestCase(DpsTestCase):
 
     def setUp(self):
+        super().setUp()
         self.assertTestEnvironment()
         self.money_cause, self.number_cause = _create_fixtures()
 
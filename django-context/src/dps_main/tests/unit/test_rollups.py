@@ -0,0 +1,79 @@
+from datetime import timedelta, timezone
+
+from django.test import override_settings
+from django.utils.timezone import now
+
+from dps_main.models import Cause, Promise, CauseHourlyRollup, CauseDailyRollup
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import donors, faker, leaderboards, rollups
+from dps_main.utilities.actions import ActionHelper
+
+
+@override_settings(ROLLUP_LAG=0)
+class RollupsTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.admin = ActionHelper(faker.bulk_causes(3))
+        self.causes = list(Cause.objects.order_by('id'))
+        self.users = [faker.user(True)[1] for _ in range(3)]
+
+    def _promise(self, user, cause, amount):
+        return faker.make_promise(create=True, user=user, cause=cause, amount=amount)[1]
+
+    def test_run(self):
+        """
+        GIVEN promises to a cause from three users
+        WHEN rolled up, then rolled up again
+        THEN the hour and the day should count them, sum them and count their users, the donors should be counted,
+        and nothing should be rolled up the second time
+        """
+        cause = self.causes[0]
+        for user, amount in ((self.users[0], 100), (self.users[1], 200), (self.users[2], 300)):
+            self._promise(user, cause, amount)
+
+        self.assertEqual(rollups.run(), 3)
+        for model in (CauseHourlyRollup, CauseDailyRollup):
+            rollup = model.objects.get(cause=cause)
+            self.assertEqual((rollup.promise_count, rollup.promised_total, rollup.user_count), (3, 600, 3))
+        self.assertEqual(CauseDailyRollup.objects.get(cause=cause).bucket.astimezone(timezone.utc).hour, 0)
+        self.assertEqual(donors.count([cause.id]), 3)
+        self.assertEqual(rollups.run(), 0)
+
+    def test_changes(self):
+        """
+        GIVEN rolled up promises
+        WHEN one is updated in place and another deleted
+        THEN the buckets should be recomputed on the next run
+        """
+        cause = self.causes[0]
+        kept, gone = self._promise(self.users[0], cause, 100), self._promise(self.users[1], cause, 200)
+        rollups.run()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.update_promise(kept.id, amount=150)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.delete_promise(gone.id)
+        rollups.run()
+
+        rollup = CauseHourlyRollup.objects.get(cause=cause)
+        self.assertEqual((rollup.promise_count, rollup.promised_total, rollup.user_count), (1, 150, 1))
+
+    def test_top_causes(self):
+        """
+        GIVEN causes promised over the last day and a month ago
+        WHEN ranked over a day and over a month
+        THEN only the promises within each window should count
+        """
+        first, second, _ = self.causes
+        self._promise(self.users[0], first, 100)
+        old = self._promise(self.users[1], second, 1000)
+        Promise.objects.filter(pk=old.pk).update(created=now() - timedelta(days=20))
+        rollups.run()
+
+        self.assertEqual([cause.id for cause in rollups.top_causes(leaderboards.BY_AMOUNT, 'day')], [first.id])
+        self.assertEqual([cause.id for cause in rollups.top_causes(leaderboards.BY_AMOUNT, 'month')],
+                         [second.id, first.id])
+        self.assertEqual(rollups.trend(second.id, rollups.DAY, since=now() - timedelta(days=30))[0]['promised_total'],
+                         1000)
@@ -0,0 +1,51 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from dps_main.models import Cause, Promise
+from dps_main.serializers import CauseSerializer, PromiseSerializer, CauseValuesSerializer, PromiseValuesSerializer
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker
+
+
+class ValuesSerializersTestCase(DpsTestCase):
+
+    def setUp(self):
+        """
+        Fixtures
+        """
+        super().setUp()
+        self.assertTestEnvironment()
+        faker.bulk_causes(10)
+        faker.bulk_users(3)
+        faker.make_bulk_promises(10)
+        self.context = {'request': APIRequestFactory().get('/api/v1/cause/')}
+
+    @staticmethod
+    def _json(data):
+        return json.loads(JSONRenderer().render(data))
+
+    def test_identical_output(self):
+        """
+        GIVEN causes and promises
+        WHEN rendered by the model serializers and by the `.values()` ones
+        THEN the JSON should be identical
+        """
+        for q, model_serializer, values_serializer in ((Cause.objects.all(), CauseSerializer, CauseValuesSerializer),
+                                                       (Promise.objects.all(), PromiseSerializer,
+                                                        PromiseValuesSerializer)):
+            self.assertEqual(self._json(model_serializer(q, many=True, context=self.context).data),
+                             self._json(values_serializer(values_serializer.prepare(q), many=True,
+                                                          context=self.context).data))
+
+    def test_single_query(self):
+        """
+        GIVEN a page of causes with contacts
+        WHEN rendered by the `.values()` serializer
+        THEN a single query should be issued
+        """
+        with self.assertNumQueries(1):
+            data = CauseValuesSerializer(CauseValuesSerializer.prepare(Cause.objects.all()), many=True,
+                                         context=self.context).data
+        self.assertEqual(len(data), 10)
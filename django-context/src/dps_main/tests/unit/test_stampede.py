@@ -0,0 +1,73 @@
+import threading
+from time import sleep
+
+from django.test import override_settings
+
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import stampede
+
+
+@override_settings(STAMPEDE_POLICIES={'test': {'ttl': 60, 'stale': 60, 'beta': 0, 'lock_timeout': 5}})
+class StampedeTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        self.computed = []
+
+    def _compute(self, value):
+        def compute():
+            self.computed.append(value)
+            sleep(0.2)
+            return value
+        return compute
+
+    def _race(self, value, generation, size=8):
+        """
+        Fetch from `size` threads at once
+        :return: the values each thread got
+        """
+        barrier = threading.Barrier(size)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(stampede.fetch('test', self._compute(value), generation=generation))
+
+        threads = [threading.Thread(target=worker) for _ in range(size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_single_flight(self):
+        """
+        GIVEN many workers reading a value that isn't cached
+        WHEN they read it at once
+        THEN only one should compute it, the others waiting for its result
+        """
+        self.assertEqual(self._race('first', 1), ['first'] * 8)
+        self.assertEqual(self.computed, ['first'])
+
+    def test_stale_while_revalidate(self):
+        """
+        GIVEN a cached value gone stale
+        WHEN many workers read it at once
+        THEN only one should recompute it, the others being served the stale value meanwhile
+        """
+        stampede.fetch('test', self._compute('first'), generation=1)
+        results = self._race('second', 2)
+        self.assertEqual(self.computed, ['first', 'second'])
+        self.assertEqual(sorted(results), ['first'] * 7 + ['second'])
+        self.assertEqual(stampede.fetch('test', self._compute('third'), generation=2), 'second')
+
+    @override_settings(STAMPEDE_POLICIES={'test': {'ttl': 60, 'stale': 60, 'beta': 1e9}})
+    def test_early_refresh(self):
+        """
+        GIVEN a fresh value whose computation was costly, relative to the time left
+        WHEN read
+        THEN it should be refreshed ahead of its expiry
+        """
+        stampede.fetch('test', self._compute('first'))
+        self.assertEqual(stampede.fetch('test', self._compute('second')), 'second')
@@ -1,6 +1,14 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.template import Context, Template
+from django.test import RequestFactory
+from django.urls import resolve
 
 from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker
+from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.processors import get_factotum
 
 
 class TemplateTagTestCase(DpsTestCase):
@@ -11,6 +19,18 @@ class TemplateTagTestCase(DpsTestCase):
         context = Context(context)
         return Template(string).render(context)
 
+    @staticmethod
+    def _request(user, path='/', cause_ids=None):
+        """
+        A request as the middleware and views would have prepared it
+        """
+        request = RequestFactory().get(path)
+        request.user = user
+        request.action_helper = ActionHelper(user)
+        request.resolver_match = resolve(path)
+        request.context_cause_ids = cause_ids or []
+        return request
+
     def test_tag(self):
         """
         GIVEN a view
@@ -29,4 +49,29 @@ class TemplateTagTestCase(DpsTestCase):
         WHEN said view contains string with a custom context processor
         THEN processor executes as expected
         """
-        pass
+        user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        promised, other = faker.bulk_causes(2).cause_set.all()
+        ActionHelper(user).add_promise_to_cause(promised.id, amount=30, target_date=date.today())
+
+        factotum = get_factotum(self._request(user, '/make/promise/{}'.format(promised.id)))['factotum']
+        self.assertFalse(factotum.can_promise_for_context_cause)
+        self.assertEqual(factotum.promise_for_context_cause.cause_id, promised.id)
+        self.assertTrue(factotum.can_promise[other])
+
+    def test_context_processor_queries(self):
+        """
+        GIVEN a page of causes
+        WHEN `can_promise` is resolved for every cause on the page
+        THEN the lookups should cost a single query, whatever the page size
+        """
+        user = User.objects.create_user('user', 'email@email.com', 'fasfj20r92f3')
+        causes = list(faker.bulk_causes(15).cause_set.all())
+        ActionHelper(user).add_promise_to_cause(causes[0].id, amount=30, target_date=date.today())
+
+        factotum = get_factotum(self._request(user, cause_ids=[cause.id for cause in causes]))['factotum']
+        with self.assertNumQueries(1):
+            rendered = self._render_template(
+                '{% load dps_tags %}'
+                '{% for cause in causes %}{{ factotum.can_promise|key_value:cause }} {% endfor %}',
+                {'causes': causes, 'factotum': factotum})
+        self.assertEqual(rendered.split(), ['False'] + ['True'] * 14)
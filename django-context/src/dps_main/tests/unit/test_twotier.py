@@ -0,0 +1,73 @@
+from time import sleep
+
+from dps_main.models import Cause
+from dps_main.tests import DpsTestCase
+from dps_main.utilities import faker, twotier
+from dps_main.utilities.cachestats import CaptureCacheStats
+
+
+class TwoTierTestCase(DpsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTestEnvironment()
+        twotier.causes.local.clear()
+        self.admin = faker.bulk_causes(2)
+        self.cause = Cause.objects.first()
+
+    def tearDown(self):
+        twotier.causes.local.clear()
+        super().tearDown()
+
+    def test_lru(self):
+        """
+        GIVEN a bounded LRU
+        WHEN filled past its size, or left past its timeout
+        THEN the least recently used, or the expired, entries should go
+        """
+        lru = twotier.LRU(max_size=2, timeout=0.05)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+        sleep(0.06)
+        self.assertIsNone(lru.get('a'))
+
+    def test_tiers(self):
+        """
+        GIVEN a cause read through the two-tier cache
+        WHEN read again, from this process and from a process with a cold local tier
+        THEN the database should be spared, the local and then the redis tier serving it
+        """
+        twotier.causes.get(self.cause.id)
+        with self.assertNumQueries(0), CaptureCacheStats() as stats:
+            self.assertEqual(twotier.causes.get(self.cause.id), self.cause)
+            twotier.causes.local.clear()
+            self.assertEqual(twotier.causes.get(self.cause.id), self.cause)
+        self.assertEqual(stats.tally[('cause.local', 'hit')], 1)
+        self.assertEqual(stats.tally[('cause.redis', 'hit')], 1)
+        # every read gets its own copy
+        self.assertIsNot(twotier.causes.get(self.cause.id), twotier.causes.get(self.cause.id))
+
+    def test_invalidation(self):
+        """
+        GIVEN a cached cause
+        WHEN it's edited or promised
+        THEN the next read should see the change, promises leaving the cached cause in place
+        """
+        twotier.causes.get(self.cause.id)
+        self.cause.title = 'Changed'
+        self.cause.save()
+        self.assertEqual(twotier.causes.get(self.cause.id).title, 'Changed')
+
+        user = faker.user(True)[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            faker.make_promise(create=True, user=user, cause=self.cause, amount=250)
+        with CaptureCacheStats() as stats:
+            cause = twotier.causes.get(self.cause.id)
+        self.assertEqual(stats.tally[('cause.local', 'hit')], 1)
+        # the aggregates are read from their columns
+        with self.assertNumQueries(1):
+            self.assertEqual(cause.promise_count, 1)
+        self.assertEqual(cause.promised_total, 250)
@@ -29,10 +29,19 @@ class UserTestCase(DpsTestCase):
         signals.initialize()
         super().setUpClass()
 
+    @classmethod
+    def setUpTestData(cls):
+        """
+        The default superuser and group, made by the bootstrap that runs after migrations in a deployment
+        """
+        from dps_main.utilities.bootstrap import bootstrap
+        bootstrap(force=True)
+
     def setUp(self):
         """
         Sets up a user fixture
         """
+        super().setUp()
         self.assertTestEnvironment()
         User.objects.create_user('potus', 'potus@whitehouse.gov', 'flotus')
 
@@ -8,6 +8,8 @@ from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST, require_safe
 
+from dps_main.utilities import dependencies
+from dps_main.utilities.pagecache import anonymous_page
 from dps_main.views import views
 from dps_main.views.viewsets import CauseViewSet, PromiseViewSet
 
@@ -20,12 +22,14 @@ urlpatterns = [
     path('auth/register/', views.RegisterView.as_view(template_name='dps_main/auth/register.html'), name='register'),
     path('auth/login/', auth_views.LoginView.as_view(template_name='dps_main/auth/login.html'), name='login'),
     path('auth/logout/', auth_views.LogoutView.as_view(template_name='dps_main/auth/logout.html'), name='logout'),
-    path('', require_safe(views.CausesListView.as_view(template_name='dps_main/user/home.html')), name='home'),
+    path('', require_safe(anonymous_page(dependencies.CAUSE_LIST)(
+        views.CausesListView.as_view(template_name='dps_main/user/home.html'))), name='home'),
     path('make/promise/<int:pk>',
          login_required(views.CausesPromiseDetailsView.as_view(template_name='dps_main/user/make_promise.html')),
          name='make_promise'),
     path('make/promise/<int:pk>/go',
          login_required(require_POST(views.MakePromiseFormView.as_view())), name='make_promise_go'),
+    path('metrics', require_safe(views.metrics_view), name='metrics'),
     path('api/', lambda request: redirect('/api/v1/', permanent=False)),
     path(r'api/v1/', include(router.urls)),
     path(r'api/v1/auth/', include('rest_framework.urls', namespace='rest_framework'))
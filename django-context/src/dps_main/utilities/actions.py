@@ -1,8 +1,13 @@
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
+from django.db import transaction
+from django.utils import timezone
 
 from dps_main.models import Cause, Promise
+from . import aggregates, dependencies, excerpts, ingestion, twotier, versions
+from .metrics import timed_methods
+from .pagination import keyset_page
+from .promisedcauses import promised_cause_ids
 
 
 def _no_id(**kwargs):
@@ -15,6 +20,7 @@ def _no_id(**kwargs):
     return _kwargs
 
 
+@timed_methods
 class ActionHelper(object):
     """
     Launches actions that may be executed within the context of a user
@@ -42,33 +48,56 @@ class ActionHelper(object):
     @classmethod
     def list_causes(cls):
         """
-        Everyone gets to see causes, even anonymous users
+        Everyone gets to see causes, even anonymous users.
+        Lists render the stored excerpt, so the description is left unloaded
         :return: QuerySet
         """
-        return Cause.objects.all()
+        return Cause.objects.defer('description')
 
     def list_available_causes(self):
         """
-        Lists causes where the current user hasn't promised
+        Lists causes where the current user hasn't promised.
+        The ids promised come from a per-user cached set, this spares the database an anti-join per request
         :return: QuerySet
         """
         if self.user.is_authenticated:
-            return Cause.objects.filter(~Q(id__in=Promise.objects.values_list('cause').filter(user=self.user)))
+            return Cause.objects.defer('description').exclude(pk__in=promised_cause_ids(self.user.id)) \
+                .order_by('-created', '-id')
         return self.list_causes()
 
+    def page_available_causes(self, size, after=None, before=None):
+        """
+        A page of available causes, see `pagination.keyset_page`.
+        Pages are cached until causes change or, for members, until the member's own promises change
+        :raises ValueError: when a cursor is malformed
+        """
+        tags = [dependencies.CAUSE_LIST]
+        if self.user.is_authenticated:
+            tags.append(dependencies.availability(self.user.id))
+        return dependencies.cached('available-causes', F'{self.user.id}:{size}:{after or ""}:{before or ""}', tags,
+                                   lambda: keyset_page(self.list_available_causes(), size, after=after, before=before))
+
     @classmethod
     def get_cause(cls, _id):
         """
-        Gets the details of a cause
+        Gets the details of a cause, through the two-tier cache
         """
-        return Cause.objects.get(pk=_id)
+        cause = twotier.causes.get(_id)
+        if cause is None:
+            raise Cause.DoesNotExist()
+        return cause
 
     def update_cause(self, _id, **kwargs):
         """
         Only admins can update causes
         """
         if self.user.is_superuser:
+            if 'description' in kwargs:
+                kwargs['excerpt'], kwargs['excerpt_html'] = excerpts.make(kwargs['description'])
             Cause.objects.filter(pk=_id).update(**_no_id(**kwargs))
+            versions.touch(versions.CAUSE)
+            dependencies.cause_written(_id)
+            twotier.causes.invalidate(_id)
             return
         raise PermissionDenied()
 
@@ -85,7 +114,17 @@ class ActionHelper(object):
         """
         Allows a user to make a promise agains a cause
         """
-        return Promise.objects.create(**_no_id(**{**kwargs, **{'user': self.user, 'cause_id': cause_id}}))
+        with transaction.atomic():
+            promise = Promise.objects.create(**_no_id(**{**kwargs, **{'user': self.user, 'cause_id': cause_id}}))
+            aggregates.promise_created(promise)
+        return promise
+
+    def queue_promise_to_cause(self, cause_id, amount, target_date):
+        """
+        Queues a promise against a cause for asynchronous writing, see `ingestion`
+        :return: the tracking id
+        """
+        return ingestion.enqueue(self.user.id, cause_id, amount, target_date)
 
     def list_promises(self):
         """
@@ -120,7 +159,13 @@ class ActionHelper(object):
         q = Promise.objects.filter(pk=_id)
         if not self.user.is_superuser:
             q = q.filter(user=self.user)
-        q.update(**_no_id(**kwargs))
+        with transaction.atomic():
+            previous = q.select_for_update().first()
+            if previous is None:
+                return
+            # queryset updates skip `auto_now`, incremental readers walk promises by modification
+            q.update(**{'modified': timezone.now(), **_no_id(**kwargs)})
+            aggregates.promise_updated(previous, Promise.objects.get(pk=previous.pk))
 
     def delete_promise(self, _id):
         """
@@ -130,7 +175,11 @@ class ActionHelper(object):
         q = Promise.objects.filter(pk=_id)
         if not self.user.is_superuser:
             q = q.filter(user=self.user)
-        q.delete()
+        with transaction.atomic():
+            promises = list(q.select_for_update())
+            q.delete()
+            for promise in promises:
+                aggregates.promise_deleted(promise)
 
     def list_promises_by_cause(self, cause_id):
         """
@@ -150,6 +199,15 @@ class ActionHelper(object):
             return Promise.objects.filter(cause_id=cause_id, user=self.user)
         return Promise.objects.none()
 
+    def get_promises_for_causes(self, cause_ids):
+        """
+        Get own promises attached to any of the causes
+        :return:
+        """
+        if self.user.is_authenticated:
+            return Promise.objects.filter(cause_id__in=cause_ids, user=self.user)
+        return Promise.objects.none()
+
     def list_all_causes_promised(self):
         """
         Gets all causes that have been promised
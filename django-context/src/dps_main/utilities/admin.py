@@ -1,10 +1,16 @@
 from collections import OrderedDict
+from datetime import timedelta
 
 from django.contrib import admin
+from django.http import Http404
+from django.utils import timezone
 from django.shortcuts import render
 
 from adminplus.sites import AdminSitePlus
 
+from dps_main.models import Cause
+from . import analytics, donors, profiler
+from .leaderboards import leaderboard_size
 from .reports import top_causes_by_amount, top_causes_by_promises
 
 __all__ = ['register_admin_views']
@@ -28,20 +34,74 @@ def register_admin_views():
             o['%s/%s' % (getattr(item, 'id'), getattr(item, k))] = getattr(item, v)
         return o
 
-    @admin.site.register_view('reports/causes/amount', name='Top 5 causes by amount')
+    size = leaderboard_size()
+
+    @admin.site.register_view('reports/causes/amount', name=F'Top {size} causes by amount')
     def reports_cause_amount(request):
         """
         A view to provide reports
         """
         return render(request, 'dps_main/admin/reports/causes-amount.html',
                       {'title': 'Top causes by amount',
-                       'report': query_to_dict(top_causes_by_amount(), 'title', 'sum')})
+                       'report': query_to_dict(top_causes_by_amount(), 'title', 'promised_total')})
 
-    @admin.site.register_view('reports/causes/promises', name='Top 5 causes by promises')
+    @admin.site.register_view('reports/causes/promises', name=F'Top {size} causes by promises')
     def reports_causes_promises(request):
         """
         A view to provide reports
         """
         return render(request, 'dps_main/admin/reports/causes-promises.html',
                       {'title': 'Top causes by promises',
-                       'report': query_to_dict(top_causes_by_promises(), 'title', 'count')})
+                       'report': query_to_dict(top_causes_by_promises(), 'title', 'promise_count')})
+
+    @admin.site.register_view('reports/analytics', name='Promise analytics')
+    def reports_analytics(request):
+        """
+        Promise amounts, top causes and signup cohorts, from the columnar snapshot rather than live SQL
+        """
+        snapshot = analytics.load()
+        context = {'title': 'Promise analytics', 'snapshot': snapshot}
+        if snapshot is not None:
+            top = snapshot.top_causes(size)
+            titles = Cause.objects.in_bulk([row['cause_id'] for row in top])
+            for row in top:
+                row['title'] = getattr(titles.get(row['cause_id']), 'title', row['cause_id'])
+            context.update(promises=len(snapshot), percentiles=snapshot.percentiles(),
+                           histogram=snapshot.histogram(log=True), top=top, cohorts=snapshot.cohorts())
+        return render(request, 'dps_main/admin/reports/analytics.html', context)
+
+    @admin.site.register_view('reports/donors', name='Unique donors')
+    def reports_donors(request):
+        """
+        Approximate distinct donors overall, per week and for the top causes
+        """
+        today = timezone.now()
+        recent = donors.weeks(today - timedelta(weeks=7), today)
+        top = top_causes_by_amount()
+        return render(request, 'dps_main/admin/reports/donors.html', {
+            'title': 'Unique donors',
+            'error': donors.ERROR * 100,
+            'everyone': donors.count(),
+            'recent': donors.count(in_weeks=recent),
+            'weeks': [(week, donors.count(in_weeks=[week])) for week in reversed(recent)],
+            'causes': [(cause, donors.count([cause.id])) for cause in top],
+            'top': donors.count([cause.id for cause in top]),
+        })
+
+    @admin.site.register_view('profiles', name='Request profiles')
+    def profiles(request):
+        """
+        Recently profiled requests
+        """
+        return render(request, 'dps_main/admin/profiles/list.html',
+                      {'title': 'Request profiles', 'profiles': profiler.recent(), 'token': profiler.make_token()})
+
+    @admin.site.register_view('profiles/(?P<profile_id>[0-9a-f]+)', urlname='dps_main_profile', visible=False)
+    def profile(request, profile_id):
+        """
+        The hot functions and the SQL of a profiled request
+        """
+        found = profiler.get(profile_id)
+        if not found:
+            raise Http404('Profile expired')
+        return render(request, 'dps_main/admin/profiles/detail.html', {'title': found['path'], 'profile': found})
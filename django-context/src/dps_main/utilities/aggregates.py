@@ -0,0 +1,102 @@
+"""
+Denormalized promise aggregates.
+Every promise write is funneled through here so that values derived from promises stay in step with them.
+Callers are expected to wrap the write and the matching call in a transaction, redis side effects are deferred
+until that transaction commits
+"""
+
+from collections import defaultdict
+
+from django.db.models import F, Count, Sum, OuterRef, Subquery, FloatField, IntegerField
+from django.db.models.functions import Coalesce
+
+from dps_main.models import Cause, Promise
+from . import amountstats, dependencies, leaderboards, promisedcauses, rollups, versions
+from .redisclient import on_commit, now_and_on_commit
+
+__all__ = ['promise_created', 'promises_created', 'promise_updated', 'promise_deleted', 'rebuild_cause_aggregates']
+
+
+def _apply_to_cause(cause_id, count, amount):
+    """
+    Atomically shift the aggregates on a cause, in the database
+    """
+    Cause.objects.filter(pk=cause_id).update(promise_count=F('promise_count') + count,
+                                             promised_total=F('promised_total') + amount)
+    on_commit(F'record cause {cause_id} on the leaderboards, rebuildleaderboards recovers them', leaderboards.record,
+              cause_id, count, amount)
+
+
+def _forget_promised_causes(*user_ids):
+    """
+    Drop the users' promised causes sets along with the write, see `redisclient.now_and_on_commit`
+    """
+    now_and_on_commit(F'drop the promised causes of users {", ".join(map(str, user_ids))}', promisedcauses.invalidate,
+                      *user_ids)
+
+
+def promise_created(promise: Promise):
+    """
+    A promise was added
+    """
+    promises_created([promise])
+
+
+def promises_created(promises):
+    """
+    A batch of promises was added, each cause is shifted once for the lot
+    """
+    by_cause = defaultdict(list)
+    for promise in promises:
+        by_cause[promise.cause_id].append(float(promise.amount))
+    if not by_cause:
+        return
+    for cause_id, amounts in by_cause.items():
+        _apply_to_cause(cause_id, len(amounts), sum(amounts))
+        amountstats.queue(cause_id, added=amounts)
+    user_ids = {promise.user_id for promise in promises}
+    _forget_promised_causes(*user_ids)
+    dependencies.promise_written(user_ids, by_cause)
+    versions.touch(versions.PROMISE)
+
+
+def promise_updated(previous: Promise, current: Promise):
+    """
+    A promise was changed, `previous` is its state before the change
+    """
+    if previous.cause_id != current.cause_id or previous.user_id != current.user_id:
+        promise_deleted(previous)
+        promise_created(current)
+        return
+    delta = float(current.amount) - float(previous.amount)
+    if delta:
+        _apply_to_cause(current.cause_id, 0, delta)
+        amountstats.queue(current.cause_id, added=[current.amount], removed=[previous.amount])
+        dependencies.promise_written(cause_ids=[current.cause_id])
+        rollups.promise_changed(current)
+    versions.touch(versions.PROMISE)
+
+
+def promise_deleted(promise: Promise):
+    """
+    A promise was removed
+    """
+    _apply_to_cause(promise.cause_id, -1, -float(promise.amount))
+    amountstats.queue(promise.cause_id, removed=[promise.amount])
+    _forget_promised_causes(promise.user_id)
+    dependencies.promise_written([promise.user_id], [promise.cause_id])
+    rollups.promise_changed(promise)
+    versions.touch(versions.PROMISE)
+
+
+def rebuild_cause_aggregates(cause_ids=None):
+    """
+    Recompute the aggregates from the promises table. All causes are rebuilt if `cause_ids` isn't supplied
+    :return: int, the number of causes rebuilt
+    """
+    promises = Promise.objects.filter(cause=OuterRef('pk')).order_by().values('cause')
+    q = Cause.objects.all() if cause_ids is None else Cause.objects.filter(pk__in=cause_ids)
+    return q.update(
+        promise_count=Coalesce(Subquery(promises.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0),
+        promised_total=Coalesce(Subquery(promises.annotate(s=Sum('amount')).values('s'), output_field=FloatField()),
+                                0.0))
@@ -0,0 +1,235 @@
+"""
+Running statistics of the amounts promised to each cause, in a row per cause (`CauseAmountStats`).
+Count, mean and variance are kept with Welford's updates, which can be reversed, so a removed or changed promise
+is taken back out without reading the others. Quantiles come from a sketch counting promises per logarithmic bucket
+of amount: any quantile is within `ACCURACY` of a true one relative to its value, sketches merge by adding counts,
+and a removal decrements its bucket. Only removing the smallest or largest amount reads the cause's promises,
+to find the next one.
+Promise writes don't touch the rows: `aggregates` queues the amounts added and removed in redis as the writes
+commit, and `drain` applies them a cause at a time from the rollup job (`rollups.run`), so the statistics trail the
+promises by a run. Amounts lost with redis are recovered by `rebuild`, `manage.py rebuildamountstats`
+"""
+
+import json
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Min, Max
+
+from dps_main.models import Cause, Promise, CauseAmountStats
+from .redisclient import get_redis, on_commit
+
+__all__ = ['ACCURACY', 'QUANTILES', 'queue', 'drain', 'record', 'rebuild', 'quantile', 'merge', 'summary']
+
+# relative accuracy of the quantiles
+ACCURACY = 0.01
+# quantiles reported by `summary`
+QUANTILES = (25, 50, 75, 90, 99)
+
+_gamma = (1 + ACCURACY) / (1 - ACCURACY)
+_log_gamma = math.log(_gamma)
+# amounts of zero or less have a bucket of their own
+_ZERO = 'zero'
+# rows written per query while rebuilding
+_BATCH = 500
+
+_pending = 'dps_main:amountstats:pending'
+
+
+def _bucket(amount):
+    return _ZERO if amount <= 0 else str(math.ceil(math.log(amount) / _log_gamma))
+
+
+def _value(bucket):
+    """
+    The amount standing for a bucket, within `ACCURACY` of any amount in it
+    """
+    return 0.0 if bucket == _ZERO else 2 * _gamma ** int(bucket) / (_gamma + 1)
+
+
+def _order(bucket):
+    return -math.inf if bucket == _ZERO else int(bucket)
+
+
+def _add(stats, amount):
+    stats.count += 1
+    delta = amount - stats.mean
+    stats.mean += delta / stats.count
+    stats.m2 += delta * (amount - stats.mean)
+    stats.minimum = amount if stats.minimum is None else min(stats.minimum, amount)
+    stats.maximum = amount if stats.maximum is None else max(stats.maximum, amount)
+    bucket = _bucket(amount)
+    stats.sketch[bucket] = stats.sketch.get(bucket, 0) + 1
+
+
+def _remove(stats, amount):
+    """
+    Take an amount back out, the reverse of `_add`
+    :return: bool, whether it was the smallest or largest amount, which needs finding again
+    """
+    if stats.count <= 1:
+        stats.count, stats.mean, stats.m2, stats.minimum, stats.maximum, stats.sketch = 0, 0.0, 0.0, None, None, {}
+        return False
+    previous = stats.mean
+    stats.count -= 1
+    stats.mean = previous - (amount - previous) / stats.count
+    # rounding can leave a hair below zero
+    stats.m2 = max(0.0, stats.m2 - (amount - previous) * (amount - stats.mean))
+    bucket = _bucket(amount)
+    if stats.sketch.get(bucket, 0) > 1:
+        stats.sketch[bucket] -= 1
+    else:
+        stats.sketch.pop(bucket, None)
+    return amount <= stats.minimum or amount >= stats.maximum
+
+
+def queue(cause_id, added=(), removed=()):
+    """
+    Amounts were promised to a cause or taken back, a changed promise is both. Queued for `drain` once the write
+    commits
+    """
+    item = json.dumps({'cause_id': cause_id, 'added': [float(amount) for amount in added],
+                       'removed': [float(amount) for amount in removed]})
+    on_commit(F'queue the amounts of cause {cause_id}, rebuildamountstats recovers them', get_redis().rpush, _pending,
+              item)
+
+
+def drain(batch_size=1000):
+    """
+    Apply the queued amounts, a batch at a time. One drain should run at a time
+    :return: int, the number of writes applied
+    """
+    r = get_redis()
+    drained = 0
+    while True:
+        pipe = r.pipeline()
+        pipe.lrange(_pending, 0, batch_size - 1)
+        pipe.ltrim(_pending, batch_size, -1)
+        raw = pipe.execute()[0]
+        if not raw:
+            return drained
+        by_cause = defaultdict(lambda: ([], []))
+        for item in raw:
+            item = json.loads(item)
+            added, removed = by_cause[item['cause_id']]
+            added.extend(item['added'])
+            removed.extend(item['removed'])
+        try:
+            with transaction.atomic():
+                # the amounts of causes deleted since went along with them
+                existing = set(Cause.objects.filter(pk__in=by_cause).values_list('id', flat=True))
+                for cause_id, (added, removed) in sorted(by_cause.items()):
+                    if cause_id in existing:
+                        record(cause_id, added, removed)
+        except Exception:
+            # back at the head, in order, for the next drain
+            r.lpush(_pending, *reversed(raw))
+            raise
+        drained += len(raw)
+
+
+def record(cause_id, added=(), removed=()):
+    """
+    Apply amounts promised to a cause or taken back, see `queue`.
+    Expected within a transaction, the cause's row is locked until it commits
+    """
+    q = CauseAmountStats.objects.select_for_update().filter(cause_id=cause_id)
+    stats = q.first()
+    if stats is None:
+        # the first promise to the cause, a concurrent one may be creating the row too
+        CauseAmountStats.objects.bulk_create([CauseAmountStats(cause_id=cause_id, sketch={})], ignore_conflicts=True)
+        stats = q.get()
+    extremes = False
+    for amount in removed:
+        extremes = _remove(stats, float(amount)) or extremes
+    for amount in added:
+        _add(stats, float(amount))
+    if extremes and stats.count:
+        found = Promise.objects.filter(cause_id=cause_id).aggregate(minimum=Min('amount'), maximum=Max('amount'))
+        stats.minimum, stats.maximum = found['minimum'], found['maximum']
+    stats.save()
+
+
+@transaction.atomic
+def rebuild(cause_ids=None):
+    """
+    Recompute the statistics from the promises table. All causes are rebuilt if `cause_ids` isn't supplied, and the
+    queued amounts, which the promises table holds already, are dropped
+    :return: int, the number of causes with promises
+    """
+    q = Promise.objects.order_by('cause_id')
+    existing = CauseAmountStats.objects.all()
+    if cause_ids is None:
+        get_redis().delete(_pending)
+    else:
+        cause_ids = list(cause_ids)
+        if not cause_ids:
+            return 0
+        q = q.filter(cause_id__in=cause_ids)
+        existing = existing.filter(cause_id__in=cause_ids)
+    existing.delete()
+
+    rows, stats, size = [], None, 0
+    for cause_id, amount in q.values_list('cause_id', 'amount').iterator(chunk_size=2000):
+        if stats is None or stats.cause_id != cause_id:
+            if len(rows) >= _BATCH:
+                CauseAmountStats.objects.bulk_create(rows)
+                rows = []
+            stats = CauseAmountStats(cause_id=cause_id, sketch={})
+            rows.append(stats)
+            size += 1
+        _add(stats, float(amount))
+    CauseAmountStats.objects.bulk_create(rows)
+    return size
+
+
+def quantile(sketch, q):
+    """
+    The amount at quantile `q`, from 0 to 1, of a sketch
+    :return: float, or None when the sketch is empty
+    """
+    buckets = sorted(sketch, key=_order)
+    total = sum(sketch.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for bucket in buckets:
+        seen += sketch[bucket]
+        if seen > rank:
+            return _value(bucket)
+    return _value(buckets[-1])
+
+
+def merge(*sketches):
+    """
+    A sketch of the amounts of several, e.g. of a group of causes
+    :return: dict
+    """
+    merged = {}
+    for sketch in sketches:
+        for bucket, count in sketch.items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    return merged
+
+
+def summary(stats):
+    """
+    What a cause's statistics tell of its amounts, quantiles are clamped to the amounts seen
+    :return: dict
+    """
+    count = stats.count if stats else 0
+    if not count:
+        return {'count': 0, 'mean': None, 'stddev': None, 'minimum': None, 'maximum': None,
+                'quantiles': {str(q): None for q in QUANTILES}}
+    return {
+        'count': count,
+        'mean': stats.mean,
+        # of the sample, promises stand for those a cause could get
+        'stddev': math.sqrt(stats.m2 / (count - 1)) if count > 1 else 0.0,
+        'minimum': stats.minimum,
+        'maximum': stats.maximum,
+        'quantiles': {str(q): min(max(quantile(stats.sketch, q / 100), stats.minimum), stats.maximum)
+                      for q in QUANTILES},
+    }
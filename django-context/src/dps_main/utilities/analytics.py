@@ -0,0 +1,313 @@
+"""
+Columnar snapshot of promises for ad-hoc analytics.
+Promises are copied into one numpy array per column, in id order, and saved as `.npy` files that every process maps
+into memory rather than reading. Group-bys, top-N, histograms and percentiles are then vectorized operations over
+the columns and leave postgres alone.
+`refresh` keeps the snapshot current: it merges the promises modified since the last refresh and drops the ones
+gone. Each refresh writes a new generation next to the previous one and switches `CURRENT` to it, so readers never
+see a half-written snapshot, and the previous one is kept until the next refresh for readers still mapping it.
+Promises modified within `settings.ANALYTICS_LAG` seconds wait for the next refresh.
+One refresh should run at a time, `manage.py snapshotpromises`
+"""
+
+import json
+import os
+import shutil
+from datetime import timedelta
+from uuid import uuid4
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from dps_main.models import Promise
+
+__all__ = ['COLUMNS', 'WEEK', 'SIGNUP_WEEK', 'COUNT', 'SUM', 'MEAN', 'USERS', 'refresh', 'load', 'Snapshot']
+
+# column -> dtype
+COLUMNS = {
+    'id': np.int64,
+    'cause_id': np.int64,
+    'user_id': np.int64,
+    'amount': np.float64,
+    'created': 'datetime64[s]',
+    'target_date': 'datetime64[D]',
+}
+
+# columns derived from the others, the Monday of the week a promise was created and the one its user signed up
+WEEK = 'week'
+SIGNUP_WEEK = 'signup_week'
+
+# group aggregates
+COUNT = 'count'
+SUM = 'sum'
+MEAN = 'mean'
+USERS = 'users'
+
+# rows read per query while snapshotting
+_BATCH = 50000
+_CURRENT = 'CURRENT'
+_META = 'meta.json'
+
+# (path, Snapshot) of the generation this process has mapped
+_loaded = [None]
+
+
+def _directory():
+    return getattr(settings, 'ANALYTICS_DIR', os.path.join(settings.BASE_DIR, 'analytics'))
+
+
+def _seconds(moments):
+    return np.array([moment.timestamp() for moment in moments], dtype=np.int64).astype('datetime64[s]')
+
+
+def _column(name, values):
+    return _seconds(values) if name == 'created' else np.array(values, dtype=COLUMNS[name])
+
+
+def _fetch(q):
+    """
+    The promises of a queryset as columns, read in id order a batch at a time
+    :return: dict of column -> array
+    """
+    names = list(COLUMNS)
+    chunks = {name: [] for name in names}
+    last = 0
+    while True:
+        rows = list(q.filter(id__gt=last).order_by('id').values_list(*names)[:_BATCH])
+        if not rows:
+            break
+        for name, values in zip(names, zip(*rows)):
+            chunks[name].append(_column(name, values))
+        last = rows[-1][0]
+    return {name: np.concatenate(chunks[name]) if chunks[name] else _column(name, []) for name in names}
+
+
+def _live_ids():
+    return np.fromiter(Promise.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=_BATCH),
+                       dtype=np.int64)
+
+
+def _users():
+    rows = list(User.objects.order_by('id').values_list('id', 'date_joined'))
+    return np.array([row[0] for row in rows], dtype=np.int64), _seconds(row[1] for row in rows)
+
+
+def _save(columns, until):
+    directory = _directory()
+    generation = uuid4().hex[:16]
+    path = os.path.join(directory, generation)
+    os.makedirs(path)
+    for name, values in columns.items():
+        np.save(os.path.join(path, F'promises.{name}.npy'), values)
+    user_ids, joined = _users()
+    np.save(os.path.join(path, 'users.id.npy'), user_ids)
+    np.save(os.path.join(path, 'users.joined.npy'), joined)
+    with open(os.path.join(path, _META), 'w') as f:
+        json.dump({'until': until.isoformat(), 'rows': len(columns['id'])}, f)
+
+    try:
+        with open(os.path.join(directory, _CURRENT)) as f:
+            previous = f.read().strip()
+    except FileNotFoundError:
+        previous = None
+    pointer = os.path.join(directory, F'{_CURRENT}.{generation}')
+    with open(pointer, 'w') as f:
+        f.write(generation)
+    os.replace(pointer, os.path.join(directory, _CURRENT))
+    # processes that mapped the previous generation keep reading it until they load this one, so it stays until the
+    # next refresh, only older ones go
+    for name in os.listdir(directory):
+        if name not in (generation, previous) and os.path.isdir(os.path.join(directory, name)):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def refresh(full=False):
+    """
+    Bring the snapshot up to date with the promises table, incrementally unless `full` or there is none yet
+    :return: dict, the rows in the snapshot and the rows read to refresh it
+    """
+    until = now() - timedelta(seconds=getattr(settings, 'ANALYTICS_LAG', 60))
+    current = None if full else load()
+    q = Promise.objects.filter(modified__lte=until)
+    if current is None:
+        columns = _fetch(q)
+        read = len(columns['id'])
+    else:
+        fresh = _fetch(q.filter(modified__gt=current.until))
+        ids = current.columns['id']
+        # the ids no longer in the table are deletes, those read again replace their previous copy
+        keep = np.isin(ids, _live_ids(), assume_unique=True) & ~np.isin(ids, fresh['id'], assume_unique=True)
+        merged = {name: np.concatenate([current.columns[name][keep], fresh[name]]) for name in COLUMNS}
+        order = np.argsort(merged['id'], kind='stable')
+        columns = {name: values[order] for name, values in merged.items()}
+        read = len(fresh['id'])
+    _save(columns, until)
+    return {'rows': len(columns['id']), 'read': read}
+
+
+def load():
+    """
+    The current snapshot, kept mapped by the process until a refresh replaces it
+    :return: Snapshot, or None when none was taken yet
+    """
+    directory = _directory()
+    try:
+        with open(os.path.join(directory, _CURRENT)) as f:
+            path = os.path.join(directory, f.read().strip())
+    except FileNotFoundError:
+        return None
+    if _loaded[0] and _loaded[0][0] == path:
+        return _loaded[0][1]
+    snapshot = Snapshot(path)
+    _loaded[0] = (path, snapshot)
+    return snapshot
+
+
+def _monday(moments):
+    days = moments.astype('datetime64[D]').astype(np.int64)
+    # 1970-01-01 was a Thursday
+    return (days - (days + 3) % 7).astype('datetime64[D]')
+
+
+class Snapshot(object):
+    """
+    Memory-mapped promise columns in id order, along with the signup time of every user for cohorts.
+    Queries take an optional `mask` from `Snapshot.mask` to narrow the promises they cover
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = {name: np.load(os.path.join(path, F'promises.{name}.npy'), mmap_mode='r') for name in COLUMNS}
+        self.user_ids = np.load(os.path.join(path, 'users.id.npy'), mmap_mode='r')
+        self.user_joined = np.load(os.path.join(path, 'users.joined.npy'), mmap_mode='r')
+        with open(os.path.join(path, _META)) as f:
+            self.until = parse_datetime(json.load(f)['until'])
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def mask(self, cause=None, user=None, since=None, until=None):
+        """
+        The promises to a cause, of a user, created from `since` and before `until`
+        :return: boolean array
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if cause is not None:
+            mask &= self.columns['cause_id'] == cause
+        if user is not None:
+            mask &= self.columns['user_id'] == user
+        if since is not None:
+            mask &= self.columns['created'] >= np.datetime64(int(since.timestamp()), 's')
+        if until is not None:
+            mask &= self.columns['created'] < np.datetime64(int(until.timestamp()), 's')
+        return mask
+
+    def column(self, name, mask=None):
+        """
+        A column, or one of the derived `WEEK` and `SIGNUP_WEEK`
+        :return: array
+        """
+        if name == WEEK:
+            values = _monday(self.columns['created'])
+        elif name == SIGNUP_WEEK:
+            # promises go along with their user, so every user id is found
+            at = np.searchsorted(self.user_ids, self.columns['user_id']).clip(0, max(len(self.user_ids) - 1, 0))
+            values = _monday(self.user_joined[at])
+        else:
+            values = self.columns[name]
+        return values if mask is None else values[mask]
+
+    def group_by(self, key, how=SUM, mask=None):
+        """
+        Aggregate promises by the values of a column: `COUNT` them, `SUM` or `MEAN` their amounts, or count their
+        distinct `USERS`
+        :return: tuple of (sorted group keys, aggregate per group)
+        """
+        keys = self.column(key, mask)
+        groups, inverse = np.unique(keys, return_inverse=True)
+        if how == COUNT:
+            return groups, np.bincount(inverse, minlength=len(groups))
+        if how == USERS:
+            pairs = np.unique(np.stack([inverse, self.column('user_id', mask)], axis=1), axis=0)
+            return groups, np.bincount(pairs[:, 0], minlength=len(groups))
+        sums = np.bincount(inverse, weights=self.column('amount', mask), minlength=len(groups))
+        if how == SUM:
+            return groups, sums
+        if how == MEAN:
+            return groups, sums / np.bincount(inverse, minlength=len(groups))
+        raise ValueError(F'Unknown aggregate {how}')
+
+    def top(self, key, n=10, how=SUM, mask=None):
+        """
+        The `n` groups with the highest aggregate, ties broken by key
+        :return: list of (key, aggregate)
+        """
+        groups, values = self.group_by(key, how, mask)
+        order = np.argsort(-values, kind='stable')[:n]
+        return list(zip(groups[order].tolist(), values[order].tolist()))
+
+    def histogram(self, bins=20, log=False, mask=None):
+        """
+        Promise amounts in `bins` buckets, spaced logarithmically when `log` as amounts are heavy tailed
+        :return: list of dict
+        """
+        amounts = self.column('amount', mask)
+        if log:
+            amounts = amounts[amounts > 0]
+        if not len(amounts):
+            return []
+        low, high = amounts.min(), amounts.max()
+        edges = np.geomspace(low, high, bins + 1) if log and low < high else bins
+        counts, edges = np.histogram(amounts, bins=edges)
+        return [{'low': float(edges[i]), 'high': float(edges[i + 1]), 'count': int(count)}
+                for i, count in enumerate(counts)]
+
+    def percentiles(self, qs=(50, 90, 99), mask=None):
+        """
+        Percentiles of the promise amounts
+        :return: dict of percentile -> amount
+        """
+        amounts = self.column('amount', mask)
+        if not len(amounts):
+            return {}
+        return dict(zip(qs, np.percentile(amounts, qs).tolist()))
+
+    def group_percentiles(self, key, qs=(50, 90), mask=None):
+        """
+        Percentiles of the promise amounts within each group, the nearest rank in one sort of the lot
+        :return: tuple of (sorted group keys, dict of percentile -> amount per group)
+        """
+        keys, amounts = self.column(key, mask), self.column('amount', mask)
+        order = np.lexsort((amounts, keys))
+        groups, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+        ranked = amounts[order]
+        return groups, {q: ranked[starts + np.round(q / 100 * (counts - 1)).astype(np.int64)] for q in qs}
+
+    def top_causes(self, n=10, mask=None):
+        """
+        The `n` causes promised the most, with their promise count and their median and 90th percentile amounts
+        :return: list of dict
+        """
+        top = self.top('cause_id', n, SUM, mask)
+        ids = np.array([cause_id for cause_id, _ in top], dtype=np.int64)
+        within = np.isin(self.columns['cause_id'], ids)
+        if mask is not None:
+            within &= mask
+        groups, counts = self.group_by('cause_id', COUNT, within)
+        _, quantiles = self.group_percentiles('cause_id', (50, 90), within)
+        return [{'cause_id': cause_id, 'amount': amount, 'promises': int(counts[i]), 'median': float(quantiles[50][i]),
+                 'p90': float(quantiles[90][i])} for (cause_id, amount), i in zip(top, np.searchsorted(groups, ids))]
+
+    def cohorts(self, mask=None):
+        """
+        Promises by the week their user signed up
+        :return: list of dict, oldest cohort first
+        """
+        weeks, promises = self.group_by(SIGNUP_WEEK, COUNT, mask)
+        _, amounts = self.group_by(SIGNUP_WEEK, SUM, mask)
+        _, users = self.group_by(SIGNUP_WEEK, USERS, mask)
+        return [{'week': week, 'users': int(user_count), 'promises': int(count), 'amount': float(amount)}
+                for week, user_count, count, amount in zip(weeks.tolist(), users, promises, amounts)]
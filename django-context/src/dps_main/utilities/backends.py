@@ -0,0 +1,17 @@
+"""
+Authentication backends
+"""
+
+from django.contrib.auth.backends import ModelBackend
+
+from . import twotier
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    `ModelBackend` reading the user of each authenticated request through the two-tier cache
+    """
+
+    def get_user(self, user_id):
+        user = twotier.users.get(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,42 @@
+"""
+One-time bootstrap of a deployment: the default superuser and the default members group.
+Runs after migrations and on demand (`manage.py bootstrap`), never on the request path. A redis marker, taken under
+a lock, makes repeated runs a single round trip. The routines themselves are idempotent, so losing the marker only
+costs a re-run
+"""
+
+from time import time
+
+from .redisclient import get_redis
+from .routines import create_default_superuser, create_default_group, hydrate_default_group
+
+__all__ = ['BOOTSTRAP_VERSION', 'bootstrap', 'is_bootstrapped']
+
+# bump to have every deployment bootstrap again, e.g. when the default group's permissions change
+BOOTSTRAP_VERSION = 1
+
+_marker = F'dps_main:bootstrap:{BOOTSTRAP_VERSION}'
+_lock = 'dps_main:bootstrap:lock'
+
+
+def is_bootstrapped() -> bool:
+    return bool(get_redis().get(_marker))
+
+
+def bootstrap(force=False) -> bool:
+    """
+    Bootstrap unless already done for this version
+    :return: bool, whether the routines ran
+    """
+    if not force and is_bootstrapped():
+        return False
+    r = get_redis()
+    with r.lock(_lock, timeout=60):
+        # another process may have finished while we waited on the lock
+        if not force and is_bootstrapped():
+            return False
+        create_default_superuser()
+        create_default_group()
+        hydrate_default_group()
+        r.set(_marker, time())
+    return True
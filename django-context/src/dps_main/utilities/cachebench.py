@@ -0,0 +1,100 @@
+"""
+Hit ratio of the available causes cache under a mixed read/write workload.
+Members and anonymous visitors page through causes while a share of the operations write: members promise and an
+admin edits causes. The same seeded workload runs with dependency-aware invalidation and with every write
+invalidating everything (`dependencies.coarse`), the way blanket queryset invalidation behaves.
+Each run happens in a transaction that is rolled back, so the data is left as it was found
+"""
+
+from contextlib import nullcontext
+from datetime import date, timedelta
+from random import Random
+
+from django.contrib.auth.models import User, AnonymousUser
+from django.db import transaction
+from django.utils import timezone
+
+from dps_main.models import Cause
+from . import dependencies, promisedcauses
+from .actions import ActionHelper
+from .cachestats import CaptureCacheStats
+
+__all__ = ['CACHE', 'MODES', 'run']
+
+CACHE = 'available-causes'
+FINE = 'fine'
+COARSE = 'coarse'
+MODES = (FINE, COARSE)
+
+_PAGE_SIZE = 15
+
+
+def _read(rng, helper):
+    """
+    The first page, and now and then the one after it
+    """
+    page = helper.page_available_causes(_PAGE_SIZE)
+    if page.has_next() and rng.random() < 0.3:
+        helper.page_available_causes(_PAGE_SIZE, after=page.next_cursor)
+
+
+def _write(rng, members, admin, cause_ids, edit_ratio):
+    if rng.random() < edit_ratio:
+        admin.update_cause(rng.choice(cause_ids), modified=timezone.now())
+        return
+    member = rng.choice(members)
+    available = list(member.list_available_causes().values_list('id', flat=True)[:_PAGE_SIZE])
+    if available:
+        member.add_promise_to_cause(rng.choice(available), amount=float(rng.randint(100, 10000)),
+                                    target_date=date.today() + timedelta(days=30))
+
+
+def _workload(seed, members, admin, cause_ids, operations, write_ratio, edit_ratio, anonymous_ratio):
+    rng = Random(seed)
+    anonymous = ActionHelper(AnonymousUser())
+    stats = CaptureCacheStats()
+    writes = 0
+    for _ in range(operations):
+        if rng.random() < write_ratio:
+            writes += 1
+            _write(rng, members, admin, cause_ids, edit_ratio)
+            continue
+        with stats:
+            _read(rng, anonymous if rng.random() < anonymous_ratio else rng.choice(members))
+
+    hits, misses = stats.tally[(CACHE, 'hit')], stats.tally[(CACHE, 'miss')]
+    return dict(reads=hits + misses, writes=writes, hits=hits, misses=misses,
+                hit_ratio=round(hits / (hits + misses), 4) if hits + misses else 0.0)
+
+
+def run(operations=2000, write_ratio=0.1, edit_ratio=0.05, anonymous_ratio=0.3, members=50, seed=0):
+    """
+    Run the workload under each invalidation mode
+    :param write_ratio: the share of operations writing
+    :param edit_ratio: the share of writes editing a cause rather than promising
+    :param anonymous_ratio: the share of reads made anonymously
+    :return: dict of mode -> results
+    :raises ValueError: when there are no members, admins or causes to work with
+    """
+    rng = Random(seed)
+    member_ids = list(User.objects.filter(is_staff=False, is_superuser=False, is_active=True).order_by('id')
+                      .values_list('id', flat=True))
+    admin = User.objects.filter(is_superuser=True, is_active=True).order_by('id').first()
+    cause_ids = list(Cause.objects.order_by('id').values_list('id', flat=True))
+    if not member_ids or not admin or not cause_ids:
+        raise ValueError('Members, an admin and causes are required')
+    members = [ActionHelper(user) for user in User.objects.filter(
+        pk__in=rng.sample(member_ids, min(members, len(member_ids)))).order_by('id')]
+
+    results = {}
+    for mode in MODES:
+        # start cold
+        dependencies.invalidate(dependencies.EVERYTHING)
+        with transaction.atomic(), dependencies.coarse() if mode == COARSE else nullcontext():
+            results[mode] = _workload(seed, members, ActionHelper(admin), cause_ids, operations, write_ratio,
+                                      edit_ratio, anonymous_ratio)
+            transaction.set_rollback(True)
+        # don't leave anything read from the rolled back writes behind
+        dependencies.invalidate(dependencies.EVERYTHING)
+        promisedcauses.invalidate(*[member.user.id for member in members])
+    return results
@@ -0,0 +1,66 @@
+"""
+Hit and miss tallies for the app's caches.
+Caches report their lookups here, they are counted in the metrics. Tallies are also kept while a capture is open,
+on the capturing thread, which lets tests budget cache misses the way `assertNumQueries` budgets queries
+"""
+
+import threading
+from collections import Counter
+
+from . import metrics
+
+__all__ = ['HIT', 'MISS', 'hit', 'miss', 'CaptureCacheStats']
+
+HIT = 'hit'
+MISS = 'miss'
+
+_local = threading.local()
+
+
+def _record(cache, outcome):
+    metrics.inc('dps_cache_lookups_total', cache=cache, result=outcome)
+    for capture in getattr(_local, 'captures', ()):
+        capture.tally[(cache, outcome)] += 1
+
+
+def hit(cache):
+    """
+    A lookup in `cache` was served from it
+    """
+    _record(cache, HIT)
+
+
+def miss(cache):
+    """
+    A lookup in `cache` came up empty, and was served from the source instead
+    """
+    _record(cache, MISS)
+
+
+class CaptureCacheStats(object):
+    """
+    Context manager tallying cache lookups made by the current thread
+    """
+
+    def __init__(self):
+        self.tally = Counter()
+
+    def __enter__(self):
+        if not hasattr(_local, 'captures'):
+            _local.captures = []
+        _local.captures.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.captures.remove(self)
+
+    def _count(self, outcome):
+        return sum(size for (_, _outcome), size in self.tally.items() if _outcome == outcome)
+
+    @property
+    def hits(self):
+        return self._count(HIT)
+
+    @property
+    def misses(self):
+        return self._count(MISS)
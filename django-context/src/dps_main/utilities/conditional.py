@@ -0,0 +1,72 @@
+"""
+Conditional GET support for DRF views, validated against the model version counters
+"""
+
+from hashlib import md5
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versions
+
+__all__ = ['ConditionalGetMixin']
+
+
+class NotModified(Exception):
+    """
+    Raised to short-circuit a request whose validators match the client's
+    """
+    pass
+
+
+class ConditionalGetMixin(object):
+    """
+    Answers GET/HEAD with ETag and Last-Modified headers, and 304s before any query or serialization runs.
+    Mixin requires the following defined on the instance:
+    - conditional_models, a map of action -> the model labels (see `versions`) its response depends on
+    """
+    conditional_models = {}
+
+    def _validators(self, request):
+        """
+        The (etag, last modified) pair of the current request, `None` if it isn't conditional
+        """
+        labels = self.conditional_models.get(self.action)
+        if labels is None or request.method not in ('GET', 'HEAD'):
+            return None
+        current, modified = versions.current(*labels)
+        # responses differ by user (availability, ownership), so the user is part of the tag
+        tag = F'{request.get_full_path()}|{request.user.pk}|{current}'
+        return quote_etag(md5(tag.encode()).hexdigest()), modified
+
+    @staticmethod
+    def _not_modified(request, etag, modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags or etag in [tag.replace('W/', '', 1) for tag in etags]
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+        return since is not None and int(modified) <= since
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional = self._validators(request)
+        if self._conditional and self._not_modified(request, *self._conditional):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        conditional = getattr(self, '_conditional', None)
+        if conditional and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, modified = conditional
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(modified)
+            patch_vary_headers(response, ('Cookie', 'Authorization'))
+        return response
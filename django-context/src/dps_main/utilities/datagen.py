@@ -0,0 +1,225 @@
+"""
+Large scale demo data, for capacity tests.
+Columns are sampled with numpy and rows are streamed into postgres with `COPY ... FROM STDIN`. Promises, the bulk of
+the rows, are written by a pool of processes, one shard each. Text is drawn from small pools generated up front and
+every cause shares the local placeholder illustration, so nothing is fetched or generated per row
+"""
+
+import csv
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.utils.timezone import now
+from mimesis import Generic
+
+from dps_main.models import Contact, Cause, Promise
+from . import aggregates, amountstats, dependencies, donors, excerpts, leaderboards, versions
+from .faker import user, placeholder_illustration
+
+__all__ = ['sample_pairs', 'generate']
+
+# rows per COPY statement
+_CHUNK = 50000
+# distinct values generated for each text column
+_POOL = 500
+# created stamps are spread over this many past seconds
+_SPAN = 365 * 24 * 60 * 60
+
+
+def sample_pairs(rng, rows, columns, size):
+    """
+    Sample distinct (row, column) index pairs from a `rows` x `columns` grid, without materializing the grid
+    :return: tuple of two int arrays. At most `rows * columns` pairs are returned
+    """
+    space = rows * columns
+    size = min(size, space)
+    if not size:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if size * 2 > space:
+        flat = rng.permutation(space)[:size]
+    else:
+        # oversample with replacement, drop repeats and top up until there are enough
+        flat = np.empty(0, dtype=np.int64)
+        while len(flat) < size:
+            drawn = rng.integers(0, space, size=int((size - len(flat)) * 1.1) + 16)
+            flat = np.unique(np.concatenate([flat, drawn]))
+        flat = rng.choice(flat, size=size, replace=False)
+    return np.divmod(flat, columns)
+
+
+def _pools(seed):
+    g = Generic('en', seed=seed)
+    pools = dict(
+        first_name=[g.person.name() for _ in range(_POOL)],
+        last_name=[g.person.last_name() for _ in range(_POOL)],
+        address=[g.address.address() for _ in range(_POOL)],
+        phone=[g.person.telephone() for _ in range(_POOL)],
+        email=[g.person.email() for _ in range(_POOL)],
+        title=[g.text.title() for _ in range(_POOL)],
+        description=[g.text.text(quantity=6 + i % 15) for i in range(_POOL)])
+    made = [excerpts.make(description) for description in pools['description']]
+    pools['excerpt'] = [plain for plain, _ in made]
+    pools['excerpt_html'] = [html for _, html in made]
+    return pools
+
+
+def _pick(rng, pools, name, size, picks=None):
+    return np.array(pools[name], dtype=object)[rng.integers(0, _POOL, size) if picks is None else picks]
+
+
+def _timestamps(rng, size, moment):
+    """
+    ISO timestamps spread over the year before `moment`
+    """
+    moment = np.datetime64(moment.astimezone(timezone.utc).replace(tzinfo=None), 's')
+    stamps = moment - rng.integers(0, _SPAN, size).astype('timedelta64[s]')
+    return np.char.add(stamps.astype(str), '+00:00')
+
+
+def _dates(rng, size, low, high):
+    """
+    ISO dates between `low` and `high` days from today
+    """
+    return (np.datetime64(now().date(), 'D') + rng.integers(low, high, size).astype('timedelta64[D]')).astype(str)
+
+
+def _reserve_ids(cursor, model_class, size):
+    """
+    Draw `size` ids from the table's sequence, so rows can reference each other before they are written
+    """
+    cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                   [model_class._meta.db_table, 'id', size])
+    return np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+
+
+def _copy(cursor, model_class, columns, rows):
+    """
+    Stream rows into the model's table, `_CHUNK` rows per COPY
+    """
+    quote = connection.ops.quote_name
+    sql = F'COPY {quote(model_class._meta.db_table)} ({", ".join(quote(c) for c in columns)}) FROM STDIN ' \
+          F'WITH (FORMAT csv)'
+    buffer, size = io.StringIO(), 0
+    for row in rows:
+        buffer.write(row)
+        size += 1
+        if size == _CHUNK:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            buffer, size = io.StringIO(), 0
+    if size:
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+
+
+def _csv(*columns):
+    """
+    CSV lines, one per row of the supplied columns
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for row in zip(*columns):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _write_users(cursor, rng, pools, size):
+    ids = _reserve_ids(cursor, User, size)
+    moment = now().isoformat()
+    # demo users can't log in, and share the hash so no time is spent hashing
+    password = make_password(None)
+    _copy(cursor, User, ('id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+                         'is_staff', 'is_active', 'date_joined'),
+          _csv(ids.tolist(), [password] * size, ['f'] * size, [F'demo{i}' for i in ids.tolist()],
+               _pick(rng, pools, 'first_name', size), _pick(rng, pools, 'last_name', size),
+               _pick(rng, pools, 'email', size), ['f'] * size, ['t'] * size, [moment] * size))
+    return ids
+
+
+def _write_causes(cursor, rng, pools, size, creator):
+    contact_ids = _reserve_ids(cursor, Contact, size)
+    created = _timestamps(rng, size, now())
+    _copy(cursor, Contact, ('id', 'first_name', 'last_name', 'address', 'phone', 'email', 'created'),
+          _csv(contact_ids.tolist(), _pick(rng, pools, 'first_name', size), _pick(rng, pools, 'last_name', size),
+               _pick(rng, pools, 'address', size), _pick(rng, pools, 'phone', size),
+               _pick(rng, pools, 'email', size), created))
+
+    ids = _reserve_ids(cursor, Cause, size)
+    # a description goes along with its excerpts
+    descriptions = rng.integers(0, _POOL, size)
+    _copy(cursor, Cause, ('id', 'title', 'description', 'excerpt', 'excerpt_html', 'illustration', 'contact_id',
+                          'expiration_date', 'target_amount', 'created', 'creator_id', 'modified', 'enabled',
+                          'promise_count', 'promised_total'),
+          _csv(ids.tolist(), _pick(rng, pools, 'title', size), _pick(rng, pools, 'description', size, descriptions),
+               _pick(rng, pools, 'excerpt', size, descriptions), _pick(rng, pools, 'excerpt_html', size, descriptions),
+               [placeholder_illustration()] * size, contact_ids.tolist(), _dates(rng, size, 30, 730),
+               np.round(rng.lognormal(13.0, 1.0, size), 2).tolist(), created, [creator.id] * size, created,
+               ['t'] * size, [0] * size, [0.0] * size))
+    return ids
+
+
+def _write_promises(shard):
+    """
+    Write one shard of promises, possibly in a pool process
+    :return: int, the number of promises written
+    """
+    seed, user_ids, cause_ids = shard
+    rng = np.random.default_rng(seed)
+    size = len(user_ids)
+    created = _timestamps(rng, size, now())
+    with connection.cursor() as cursor:
+        _copy(cursor, Promise, ('user_id', 'cause_id', 'amount', 'target_date', 'created', 'modified'),
+              _csv(user_ids.tolist(), cause_ids.tolist(), np.round(rng.lognormal(9.0, 1.2, size), 2).tolist(),
+                   _dates(rng, size, 1, 366), created, created))
+    return size
+
+
+def generate(causes, users, promises, seed=None, workers=1):
+    """
+    Generate demo causes, users and promises in bulk.
+    Promises are made by the generated users toward any cause, so they never clash with existing promises. Their
+    number is capped at what the generated users can make
+    :return: dict of model name -> number of rows written
+    :raises ImproperlyConfigured: when the database isn't postgres
+    """
+    if connection.vendor != 'postgresql':
+        raise ImproperlyConfigured('Bulk demo data is streamed with COPY, which needs postgres')
+
+    rng = np.random.default_rng(seed)
+    pools = _pools(seed)
+    creator = User.objects.filter(is_superuser=True).order_by('id').first() or user(create=True, superuser=True)[1]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        user_ids = _write_users(cursor, rng, pools, users) if users else np.empty(0, dtype=np.int64)
+        if causes:
+            _write_causes(cursor, rng, pools, causes, creator)
+    cause_ids = np.array(Cause.objects.order_by().values_list('id', flat=True), dtype=np.int64)
+
+    rows, columns = sample_pairs(rng, len(user_ids), len(cause_ids), promises)
+    shards = [(int(shard_seed), user_ids[r], cause_ids[c]) for shard_seed, r, c in
+              zip(rng.integers(0, 2 ** 32, workers), np.array_split(rows, workers), np.array_split(columns, workers))]
+    if workers > 1:
+        # children must open connections of their own rather than share the parent's socket
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            written = sum(pool.map(_write_promises, shards))
+    else:
+        written = sum(map(_write_promises, shards))
+
+    # COPY bypasses the write path, so derive what it would have maintained
+    aggregates.rebuild_cause_aggregates()
+    leaderboards.rebuild()
+    amountstats.rebuild()
+    donors.rebuild()
+    dependencies.invalidate(dependencies.EVERYTHING)
+    versions.touch(versions.CAUSE, versions.PROMISE)
+    return dict(users=users, causes=causes, promises=written)
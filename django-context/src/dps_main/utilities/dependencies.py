@@ -0,0 +1,153 @@
+"""
+Dependency-aware invalidation for cached reads.
+An entry is stored along with the versions of the tags (dependencies) it was computed from, and is only served while
+none of them moved. Writes bump the tags they affect and nothing else: a promise bumps its user's availability, its
+cause's aggregates and the leaderboards, a cause edit bumps that cause and the cause list. Validating an entry is a
+single MGET of the entry and its tags, no entry is ever deleted
+"""
+
+import pickle
+from contextlib import contextmanager
+from uuid import uuid4
+
+from django.conf import settings
+
+from . import cachestats
+from .redisclient import get_redis, now_and_on_commit
+
+__all__ = ['CAUSE_LIST', 'LEADERBOARDS', 'ROLLUPS', 'EVERYTHING', 'availability', 'cause', 'cause_aggregates',
+           'invalidate', 'promise_written', 'cause_written', 'generation', 'cached', 'coarse']
+
+CAUSE_LIST = 'causes'
+LEADERBOARDS = 'leaderboards'
+# moved by each rollup run that changed something, see `rollups`
+ROLLUPS = 'rollups'
+# a dependency of every entry, for writes that bypass the write path (bulk loads)
+EVERYTHING = 'everything'
+
+# see `coarse`
+_coarse = [False]
+
+
+def availability(user_id):
+    """
+    The causes a user may still promise
+    """
+    return F'user:{user_id}:availability'
+
+
+def cause(cause_id):
+    """
+    A cause's own fields
+    """
+    return F'cause:{cause_id}'
+
+
+def cause_aggregates(cause_id):
+    """
+    The values a cause derives from its promises
+    """
+    return F'cause:{cause_id}:aggregates'
+
+
+def _tag_key(tag):
+    return F'dps_main:dependency:{tag}'
+
+
+def _entry_key(name, key):
+    return F'dps_main:dependent:{name}:{key}'
+
+
+def _version():
+    return uuid4().hex[:16]
+
+
+def _bump(tags):
+    pipe = get_redis().pipeline()
+    for tag in tags:
+        pipe.set(_tag_key(tag), _version())
+    pipe.execute()
+
+
+def invalidate(*tags):
+    """
+    Bump the tags along with a write, see `redisclient.now_and_on_commit`
+    """
+    tags = [*tags, EVERYTHING] if _coarse[0] else list(tags)
+    if tags:
+        now_and_on_commit(F'invalidate {", ".join(tags)}', _bump, tags)
+
+
+def promise_written(user_ids=(), cause_ids=()):
+    """
+    Promises of these users, to these causes, were added, changed or removed
+    """
+    invalidate(*[availability(user_id) for user_id in user_ids],
+               *[cause_aggregates(cause_id) for cause_id in cause_ids], LEADERBOARDS)
+
+
+def cause_written(*cause_ids):
+    """
+    These causes were added, changed or removed
+    """
+    invalidate(*[cause(cause_id) for cause_id in cause_ids], CAUSE_LIST)
+
+
+def _versions(r, tags, rows):
+    """
+    Versions are random rather than counted, so they don't repeat once redis is emptied
+    """
+    if None in rows:
+        # never written since redis was last emptied, start afresh so nothing cached before can match
+        pipe = r.pipeline()
+        for tag, row in zip(tags, rows):
+            if row is None:
+                pipe.set(_tag_key(tag), _version(), nx=True)
+        pipe.execute()
+        rows = r.mget([_tag_key(tag) for tag in tags])
+    return tuple(row.decode() if isinstance(row, bytes) else row for row in rows)
+
+
+def generation(*tags):
+    """
+    The current versions of the tags, e.g. as the generation of a `stampede` value
+    :return: tuple
+    """
+    tags = [*tags, EVERYTHING]
+    r = get_redis()
+    return _versions(r, tags, r.mget([_tag_key(tag) for tag in tags]))
+
+
+def cached(name, key, tags, compute, timeout=None):
+    """
+    The value computed by `compute()`, from the cache while none of the tags moved since it was stored.
+    Lookups are counted under `name` in `cachestats`
+    :param key: tells apart values under the same name
+    """
+    tags = [*tags, EVERYTHING]
+    r = get_redis()
+    raw, *rows = r.mget([_entry_key(name, key)] + [_tag_key(tag) for tag in tags])
+    # read before computing, so a write landing meanwhile leaves the entry stale rather than wrong
+    versions = _versions(r, tags, rows)
+    if raw:
+        stored, value = pickle.loads(raw)
+        if stored == versions:
+            cachestats.hit(name)
+            return value
+    cachestats.miss(name)
+    value = compute()
+    r.set(_entry_key(name, key), pickle.dumps((versions, value)),
+          ex=timeout or getattr(settings, 'DEPENDENCIES_TIMEOUT', 60 * 60))
+    return value
+
+
+@contextmanager
+def coarse():
+    """
+    Every write invalidates every entry while on, the way blanket queryset invalidation behaves. For comparisons
+    """
+    _coarse[0] = True
+    try:
+        yield
+    finally:
+        _coarse[0] = False
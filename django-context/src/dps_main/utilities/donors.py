@@ -0,0 +1,241 @@
+"""
+Approximate distinct donor counts, with HyperLogLog sketches kept in redis.
+A sketch holds 2^`PRECISION` registers, each the longest run of leading zeros seen among the hashes of the users
+added to it. Distinct users are estimated from the registers with a standard error of `ERROR` (1.04 / sqrt(4096),
+about 1.6%), so 95% of estimates fall within twice that, whatever the number of donors. Sketches of disjoint or
+overlapping groups union by taking the largest of each register, which is what makes "donors across these causes
+over these weeks" cheap: one sketch is kept per cause, per week, per cause and week, and for everyone.
+Registers are packed a byte each into a 4KB redis string, read whole with one GET, and raised in a WATCH/MULTI
+transaction so concurrent writers can't lower one another's.
+Weeks before this one are settled, so counts over them merge their sketches once and keep the union for
+`_merged_ttl`. A generation bumped whenever a settled week's sketch is raised, or the sketches are rebuilt, retires
+the unions kept.
+Sketches are fed by the rollup job rather than by promise writes, so they trail the promises by a run.
+Sketches only grow: deleting a promise doesn't take its user back out, `rebuild` recomputes them from the promises.
+Weekly sketches expire `settings.DONOR_SKETCH_WEEKS` weeks after they were last added to
+"""
+
+import math
+from collections import defaultdict
+from datetime import timedelta, timezone
+from hashlib import blake2b
+
+from django.conf import settings
+from django.utils.timezone import now
+from redis.exceptions import WatchError
+
+from dps_main.models import Promise
+from .redisclient import get_redis
+
+__all__ = ['PRECISION', 'ERROR', 'week_of', 'weeks', 'add', 'count', 'rebuild']
+
+PRECISION = 12
+ERROR = 1.04 / (2 ** PRECISION) ** 0.5
+
+_registers = 2 ** PRECISION
+_width = 64 - PRECISION
+_alpha = 0.7213 / (1 + 1.079 / _registers)
+_empty = bytes(_registers)
+
+_prefix = 'dps_main:donors'
+_everyone = F'{_prefix}:all'
+_generation = F'{_prefix}:generation'
+# how long the union of settled weeks' sketches is kept for a count
+_merged_ttl = 24 * 60 * 60
+
+
+def _cause_key(cause_id):
+    return F'{_prefix}:cause:{cause_id}'
+
+
+def _week_key(week):
+    return F'{_prefix}:week:{week.isoformat()}'
+
+
+def _cause_week_key(cause_id, week):
+    return F'{_prefix}:cause:{cause_id}:week:{week.isoformat()}'
+
+
+def week_of(moment):
+    """
+    The Monday of the week of a moment, in UTC
+    :return: date
+    """
+    day = moment.astimezone(timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+def weeks(since, until):
+    """
+    The weeks from the one of `since` to the one of `until`, inclusive
+    :return: list of date
+    """
+    first, last = week_of(since), week_of(until)
+    return [first + timedelta(weeks=i) for i in range((last - first).days // 7 + 1)]
+
+
+def _register(user_id):
+    """
+    The register a user falls in and the rank it would raise it to
+    """
+    h = int.from_bytes(blake2b(str(user_id).encode(), digest_size=8).digest(), 'big')
+    rest = h & ((1 << _width) - 1)
+    return h >> _width, _width - rest.bit_length() + 1
+
+
+def _keys(cause_id, created):
+    week = week_of(created)
+    return (_everyone, _cause_key(cause_id)), (_week_key(week), _cause_week_key(cause_id, week))
+
+
+def _ttl():
+    return getattr(settings, 'DONOR_SKETCH_WEEKS', 104) * 7 * 24 * 60 * 60
+
+
+def _raise(updates, expiring, settled):
+    """
+    Raise registers to the ranks given unless they are higher already, in one transaction retried on contention
+    :param updates: dict of key -> dict of register -> rank
+    :param expiring: the keys to expire, weekly sketches
+    :param settled: the weekly sketches of weeks before this one, raising any retires the merged unions
+    """
+    keys = list(updates)
+    with get_redis().pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(*keys)
+                raised = {}
+                for key in keys:
+                    registers = bytearray(pipe.get(key) or _empty)
+                    higher = {register: rank for register, rank in updates[key].items() if registers[register] < rank}
+                    if higher:
+                        for register, rank in higher.items():
+                            registers[register] = rank
+                        raised[key] = bytes(registers)
+                pipe.multi()
+                for key, registers in raised.items():
+                    pipe.set(key, registers)
+                for key in expiring:
+                    pipe.expire(key, _ttl())
+                if settled.intersection(raised):
+                    pipe.incr(_generation)
+                pipe.execute()
+                return
+            except WatchError:
+                continue
+
+
+def _updates(rows):
+    """
+    The registers to raise for (user id, cause id, created) rows
+    :return: tuple of (dict of key -> dict of register -> rank, set of weekly keys, set of settled weekly keys)
+    """
+    updates, expiring, settled = defaultdict(dict), set(), set()
+    this_week = week_of(now())
+    for user_id, cause_id, created in rows:
+        register, rank = _register(user_id)
+        lasting, weekly = _keys(cause_id, created)
+        expiring.update(weekly)
+        if week_of(created) < this_week:
+            settled.update(weekly)
+        for key in lasting + weekly:
+            if updates[key].get(register, 0) < rank:
+                updates[key][register] = rank
+    return updates, expiring, settled
+
+
+def add(rows):
+    """
+    Add users to the sketches of the causes and weeks they promised to, from (user id, cause id, created) rows.
+    Fed by the rollup job (`rollups.run`) as it walks new and changed promises, adding a user twice is harmless
+    """
+    rows = list(rows)
+    if rows:
+        _raise(*_updates(rows))
+
+
+def _estimate(registers):
+    """
+    HyperLogLog estimate of a sketch's distinct users, counted linearly while many registers are still empty
+    :param registers: bytes, a rank per register
+    """
+    zeros = registers.count(0)
+    raw = _alpha * _registers ** 2 / sum(2.0 ** -rank for rank in registers)
+    if raw <= 2.5 * _registers and zeros:
+        return _registers * math.log(_registers / zeros)
+    return raw
+
+
+def _union(sketches):
+    """
+    The largest of each register across sketches, missing ones left out
+    :return: bytes
+    """
+    union = _empty
+    for registers in sketches:
+        if registers:
+            union = bytes(map(max, union, registers))
+    return union
+
+
+def _weekly_keys(cause_ids, in_weeks):
+    if cause_ids is None:
+        return [_week_key(week) for week in in_weeks]
+    return [_cause_week_key(cause_id, week) for cause_id in cause_ids for week in in_weeks]
+
+
+def _merged(r, cause_ids, settled):
+    """
+    The union of the sketches of settled weeks, merged once per generation and kept for `_merged_ttl`
+    """
+    generation = int(r.get(_generation) or 0)
+    digest = blake2b(repr((cause_ids and sorted(set(cause_ids)), sorted(settled))).encode(), digest_size=16)
+    key = F'{_prefix}:merged:{generation}:{digest.hexdigest()}'
+    union = r.get(key)
+    if union is None:
+        union = _union(r.mget(_weekly_keys(cause_ids, settled)))
+        r.set(key, union, ex=_merged_ttl)
+    return union
+
+
+def count(cause_ids=None, in_weeks=None):
+    """
+    Approximate distinct users who promised to any of `cause_ids` within any of `in_weeks` (see `weeks`).
+    Either left out covers them all
+    :return: int
+    """
+    if (cause_ids is not None and not cause_ids) or (in_weeks is not None and not in_weeks):
+        return 0
+    r = get_redis()
+    if in_weeks is None:
+        keys = [_everyone] if cause_ids is None else [_cause_key(cause_id) for cause_id in cause_ids]
+        return round(_estimate(_union(r.mget(keys))))
+
+    this_week = week_of(now())
+    settled = [week for week in in_weeks if week < this_week]
+    current = [week for week in in_weeks if week >= this_week]
+    sketches = r.mget(_weekly_keys(cause_ids, current)) if current else []
+    if settled:
+        sketches.append(_merged(r, cause_ids, settled))
+    return round(_estimate(_union(sketches)))
+
+
+def rebuild():
+    """
+    Recompute the sketches from the promises table, users of deleted promises go
+    :return: int, the number of promises added
+    """
+    r = get_redis()
+    stale = list(r.scan_iter(match=F'{_prefix}:*', count=1000))
+    if stale:
+        r.delete(*stale)
+    size, batch = 0, []
+    for row in Promise.objects.order_by().values_list('user_id', 'cause_id', 'created').iterator(chunk_size=2000):
+        batch.append(row)
+        if len(batch) >= 2000:
+            _raise(*_updates(batch))
+            size, batch = size + len(batch), []
+    if batch:
+        _raise(*_updates(batch))
+    r.incr(_generation)
+    return size + len(batch)
@@ -0,0 +1,57 @@
+"""
+Excerpts of cause descriptions, stored on the cause.
+Lists render the stored excerpt rather than truncating the full description on every render, which lets them leave
+the description unloaded (`defer('description')`). Saves keep the excerpts in step, bulk writers set them themselves
+and the migration adding them fills them in for existing causes. `manage.py backfillexcerpts` recomputes them,
+e.g. with `--all` once `make` changes
+"""
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from dps_main.models import Cause
+from . import dependencies
+
+__all__ = ['WORDS', 'make', 'apply', 'backfill']
+
+# words kept, as `truncatewords_html:35` did in the templates
+WORDS = 35
+
+
+def make(description):
+    """
+    :return: tuple of (plain text excerpt, excerpt keeping the description's tags balanced)
+    """
+    description = description or ''
+    return (Truncator(strip_tags(description)).words(WORDS, truncate=' …'),
+            Truncator(description).words(WORDS, html=True, truncate=' …'))
+
+
+def apply(cause: Cause):
+    """
+    Set the excerpts of a cause from its description
+    :return: the cause
+    """
+    cause.excerpt, cause.excerpt_html = make(cause.description)
+    return cause
+
+
+def backfill(batch_size=500, everything=False):
+    """
+    Compute the excerpts of the causes missing them, or of all causes with `everything`
+    :return: int, the number of causes updated
+    """
+    q = Cause.objects.exclude(description='').order_by('id').only('id', 'description')
+    if not everything:
+        q = q.filter(excerpt='')
+    updated, last = 0, 0
+    while True:
+        causes = [apply(cause) for cause in q.filter(pk__gt=last)[:batch_size]]
+        if not causes:
+            if updated:
+                # pages rendered from the missing excerpts
+                dependencies.invalidate(dependencies.EVERYTHING)
+            return updated
+        Cause.objects.bulk_update(causes, ['excerpt', 'excerpt_html'])
+        updated += len(causes)
+        last = causes[-1].id
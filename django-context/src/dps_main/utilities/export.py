@@ -0,0 +1,132 @@
+"""
+Streaming exports of promises and causes, as CSV or NDJSON.
+Rows are read as tuples through a server-side cursor and written out a batch at a time, so memory stays flat however
+many rows there are. Used by the admin export endpoints and `manage.py export`
+"""
+
+import csv
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+
+from dps_main.models import Cause, Promise
+
+__all__ = ['CSV', 'NDJSON', 'FORMATS', 'CONTENT_TYPES', 'PROMISES', 'CAUSES', 'MODELS', 'parse_filters', 'rows',
+           'render']
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FORMATS = (CSV, NDJSON)
+CONTENT_TYPES = {CSV: 'text/csv; charset=utf-8', NDJSON: 'application/x-ndjson'}
+
+PROMISES = 'promises'
+CAUSES = 'causes'
+
+# model -> (model class, exported columns)
+MODELS = {
+    PROMISES: (Promise, ('id', 'cause_id', 'cause__title', 'user_id', 'user__username', 'amount', 'target_date',
+                         'created', 'modified')),
+    CAUSES: (Cause, ('id', 'title', 'target_amount', 'promise_count', 'promised_total', 'expiration_date', 'enabled',
+                     'creator_id', 'created', 'modified')),
+}
+
+# model -> filter -> the column it filters on
+_FILTERS = {
+    PROMISES: {'cause': 'cause_id', 'user': 'user_id'},
+    CAUSES: {'cause': 'id', 'user': 'creator_id'},
+}
+
+# rows fetched from the cursor per round trip
+_CHUNK = 2000
+# rows written out per chunk of the stream
+_BATCH = 500
+
+
+def _date(value, name):
+    found = parse_date(value) if isinstance(value, str) else value
+    if not found:
+        raise ValueError(F'{name} must be a date, YYYY-MM-DD')
+    return found
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(F'{name} must be an id')
+
+
+def parse_filters(model, cause=None, user=None, since=None, until=None):
+    """
+    Turn raw filters into queryset lookups on a model. `user` is the creator of causes, `since` and `until` are
+    inclusive dates the rows were created on
+    :raises ValueError: when a filter is malformed
+    """
+    lookups = {}
+    if cause not in (None, ''):
+        lookups[_FILTERS[model]['cause']] = _int(cause, 'cause')
+    if user not in (None, ''):
+        lookups[_FILTERS[model]['user']] = _int(user, 'user')
+    if since not in (None, ''):
+        lookups['created__gte'] = make_aware(datetime.combine(_date(since, 'since'), time.min))
+    if until not in (None, ''):
+        lookups['created__lt'] = make_aware(datetime.combine(_date(until, 'until') + timedelta(days=1), time.min))
+    return lookups
+
+
+def rows(model, **lookups):
+    """
+    The exported rows of a model, in id order, as tuples
+    :return: tuple of (columns, iterator of tuples)
+    """
+    model_class, columns = MODELS[model]
+    q = model_class.objects.filter(**lookups).order_by('id').values_list(*columns)
+    return columns, q.iterator(chunk_size=_CHUNK)
+
+
+class _Echo(object):
+    """
+    A file-like object handing back what is written, for `csv.writer`
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv(columns, items):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    batch = []
+    for item in items:
+        batch.append(writer.writerow(item))
+        if len(batch) >= _BATCH:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def _ndjson(columns, items):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    batch = []
+    for item in items:
+        batch.append(encoder.encode(dict(zip(columns, item))) + '\n')
+        if len(batch) >= _BATCH:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def render(model, fmt, **lookups):
+    """
+    Stream a model's rows in a format
+    :return: generator of str chunks
+    :raises ValueError: when the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(F'format must be one of {", ".join(FORMATS)}')
+    columns, items = rows(model, **lookups)
+    return _csv(columns, items) if fmt == CSV else _ndjson(columns, items)
@@ -3,20 +3,27 @@ Faker provides a way to create fake/sample model data for internal purposes
 """
 
 import re
+from io import BytesIO
 from random import randint, choice
 from datetime import date
 
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import IntegrityError
+from PIL import Image
 
 from mimesis import Generic
 
 from dps_main.models import Contact, Cause, Promise
+from dps_main.utilities import aggregates, amountstats, dependencies, excerpts, leaderboards, promisedcauses, versions
 
 _g = Generic('en')
 _re_numeric = re.compile("[^\\d.\\-+]")
 
+PLACEHOLDER_ILLUSTRATION = 'illustration/placeholder.png'
+
 
 def _data(model_class, _id=None, create=False, d=None):
     """
@@ -55,6 +62,18 @@ def bulk_users(size):
     User.objects.bulk_create([User(**user(superuser=choice([True, False]))[0]) for _ in indices])
 
 
+def placeholder_illustration() -> str:
+    """
+    A local illustration shared by demo causes, written to storage on first use so demo data works offline
+    :return: str, the name of the image in storage
+    """
+    if not default_storage.exists(PLACEHOLDER_ILLUSTRATION):
+        image = BytesIO()
+        Image.new('RGB', (500, 500), (222, 226, 230)).save(image, 'PNG')
+        default_storage.save(PLACEHOLDER_ILLUSTRATION, ContentFile(image.getvalue()))
+    return PLACEHOLDER_ILLUSTRATION
+
+
 def contact(_id=None, create=False):
     """
     Create a `Sampler/Demo` contact
@@ -84,7 +103,7 @@ def cause(_id=None, create=False, creator=None, _contact=None):
         description=_g.text.text(quantity=randint(6, 20)),
         expiration_date=_g.datetime.datetime(start=date.today().year).date(),
         target_amount=float(_re_numeric.sub('', _g.business.price())),
-        illustration=_g.internet.stock_image(500, 500),
+        illustration=placeholder_illustration(),
         creator=creator
     )
     return _data(Cause, _id=_id, create=create, d=data)
@@ -102,7 +121,9 @@ def bulk_causes(size, creator=None):
     Contact.objects.bulk_create([Contact(**contact()[0]) for _ in indices])
     contacts = Contact.objects.all()
     Cause.objects.bulk_create(
-        [Cause(**cause(creator=creator, _contact=contacts[index])[0]) for index in indices])
+        [excerpts.apply(Cause(**cause(creator=creator, _contact=contacts[index])[0])) for index in indices])
+    dependencies.invalidate(dependencies.CAUSE_LIST)
+    versions.touch(versions.CAUSE)
     return creator
 
 
@@ -114,12 +135,15 @@ def make_promise(_id=None, create=False, user=None, cause=None, amount=None):
         try:
             if create and not isinstance(cause, Cause) and cause:
                 cause = Cause.objects.get(pk=cause)
-            return _data(Promise, _id=_id, create=create, d=dict(
+            d, promise = _data(Promise, _id=_id, create=create, d=dict(
                 cause=cause,
                 user=user,
                 amount=amount or float(_re_numeric.sub('', _g.business.price())),
                 target_date=_g.datetime.datetime(start=date.today().year).date()
             ))
+            if promise:
+                aggregates.promise_created(promise)
+            return d, promise
         except IntegrityError:
             pass
 
@@ -128,7 +152,24 @@ def make_bulk_promises_with_data_list(promises_list: list):
     """
     Bulk make a bunch of promises in `promises_list`
     """
-    Promise.objects.bulk_create([Promise(**promise) for promise in promises_list])
+    promises = Promise.objects.bulk_create([Promise(**promise) for promise in promises_list])
+    # bulk inserts bypass the write path, so rebuild the aggregates of the affected causes
+    cause_ids = {promise.cause_id for promise in promises}
+    aggregates.rebuild_cause_aggregates(cause_ids)
+    leaderboards.rebuild(cause_ids)
+    amountstats.rebuild(cause_ids)
+    user_ids = {promise.user_id for promise in promises}
+    promisedcauses.invalidate(*user_ids)
+    dependencies.promise_written(user_ids, cause_ids)
+    versions.touch(versions.PROMISE)
+
+
+def _instances(model_class, items):
+    """
+    Instances for a mix of instances and ids
+    """
+    found = model_class.objects.in_bulk([item for item in items if not isinstance(item, model_class)])
+    return [item if isinstance(item, model_class) else found[item] for item in items]
 
 
 def make_bulk_promises(size, users=None, causes=None):
@@ -138,11 +179,11 @@ def make_bulk_promises(size, users=None, causes=None):
     indices = range(size)
     users = users or User.objects.all()
     causes = causes or Cause.objects.all()
-    # convert ids to instances
-    users = [_user if isinstance(_user, User) else User.objects.get(pk=_user) for _user in users]
-    causes = [_cause if isinstance(_cause, Cause) else Cause.objects.get(pk=_cause) for _cause in causes]
+    # convert ids to instances, in one query per model
+    users = _instances(User, users)
+    causes = _instances(Cause, causes)
 
-    unique = []
+    unique = set()
     promises_list = []
     try:
         for _ in indices:
@@ -159,7 +200,7 @@ def make_bulk_promises(size, users=None, causes=None):
                     break
 
             promises_list.append(make_promise(user=_user, cause=_cause)[0])
-            unique.append(_key)
+            unique.add(_key)
 
         make_bulk_promises_with_data_list(promises_list)
     except IntegrityError as ie:
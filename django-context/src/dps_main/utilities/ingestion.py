@@ -0,0 +1,157 @@
+"""
+Asynchronous promise ingestion.
+With `settings.PROMISE_INGESTION_ASYNC` on, validated promises are appended to a redis queue and acknowledged with a
+tracking id instead of being written in the request. A worker (`manage.py ingestpromises`) drains the queue and
+writes promises in batches, so write throughput follows the batch size rather than the request count.
+
+Items are moved to a per-worker processing list while a batch is written, and moved back by `recover` should the
+worker die half way
+"""
+
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils.dateparse import parse_date
+
+from dps_main.models import Cause, Promise
+from . import aggregates
+from .redisclient import get_redis
+
+__all__ = ['QUEUED', 'CREATED', 'DUPLICATE', 'FAILED', 'is_enabled', 'enqueue', 'status', 'recover', 'drain']
+
+QUEUED = 'queued'
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+FAILED = 'failed'
+
+_queue = 'dps_main:ingestion:queue'
+
+
+def _processing(worker):
+    return F'dps_main:ingestion:processing:{worker}'
+
+
+def _status_key(tracking_id):
+    return F'dps_main:ingestion:status:{tracking_id}'
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'PROMISE_INGESTION_ASYNC', False)
+
+
+def _set_status(pipe, tracking_id, state, user_id, promise_id=None):
+    key = _status_key(tracking_id)
+    pipe.hmset(key, {'state': state, 'user_id': user_id, 'promise_id': promise_id or ''})
+    pipe.expire(key, getattr(settings, 'PROMISE_INGESTION_STATUS_TIMEOUT', 60 * 60 * 24))
+
+
+def enqueue(user_id, cause_id, amount, target_date) -> str:
+    """
+    Queue a validated promise for writing
+    :return: the tracking id
+    """
+    tracking_id = uuid4().hex
+    item = json.dumps(dict(tracking_id=tracking_id, user_id=user_id, cause_id=int(cause_id), amount=float(amount),
+                           target_date=target_date.isoformat()))
+    pipe = get_redis().pipeline()
+    _set_status(pipe, tracking_id, QUEUED, user_id)
+    pipe.lpush(_queue, item)
+    pipe.execute()
+    return tracking_id
+
+
+def status(tracking_id):
+    """
+    :return: dict of state, user_id and promise_id. `None` for unknown or expired tracking ids
+    """
+    found = get_redis().hgetall(_status_key(tracking_id))
+    if not found:
+        return None
+    found = {k.decode() if isinstance(k, bytes) else k: v.decode() if isinstance(v, bytes) else v
+             for k, v in found.items()}
+    return dict(state=found['state'], user_id=int(found['user_id']),
+                promise_id=int(found['promise_id']) if found.get('promise_id') else None)
+
+
+def recover(worker='default') -> int:
+    """
+    Move items a dead worker left in its processing list back onto the queue
+    :return: int, the number of items recovered
+    """
+    r = get_redis()
+    size = 0
+    while r.rpoplpush(_processing(worker), _queue) is not None:
+        size += 1
+    return size
+
+
+def _write(items):
+    """
+    Write a batch of promises
+    :return: dict of tracking id -> (state, promise id)
+    """
+    statuses = {}
+    causes = set(Cause.objects.filter(pk__in={item['cause_id'] for item in items}).values_list('id', flat=True))
+    seen = set(Promise.objects.filter(cause_id__in=causes, user_id__in={item['user_id'] for item in items})
+               .order_by().values_list('cause_id', 'user_id'))
+
+    fresh = []
+    for item in items:
+        key = (item['cause_id'], item['user_id'])
+        if item['cause_id'] not in causes:
+            statuses[item['tracking_id']] = (FAILED, None)
+        elif key in seen:
+            statuses[item['tracking_id']] = (DUPLICATE, None)
+        else:
+            seen.add(key)
+            fresh.append((item['tracking_id'], Promise(cause_id=item['cause_id'], user_id=item['user_id'],
+                                                       amount=item['amount'],
+                                                       target_date=parse_date(item['target_date']))))
+
+    try:
+        with transaction.atomic():
+            created = Promise.objects.bulk_create([promise for _, promise in fresh])
+            aggregates.promises_created(created)
+        statuses.update({tracking_id: (CREATED, promise.id) for (tracking_id, _), promise in zip(fresh, created)})
+    except IntegrityError:
+        # a racing write spoiled the batch, fall back to one insert per item
+        for tracking_id, promise in fresh:
+            promise.pk = None
+            try:
+                with transaction.atomic():
+                    promise.save()
+                    aggregates.promise_created(promise)
+                statuses[tracking_id] = (CREATED, promise.id)
+            except IntegrityError:
+                exists = Promise.objects.filter(cause_id=promise.cause_id, user_id=promise.user_id).exists()
+                statuses[tracking_id] = (DUPLICATE if exists else FAILED, None)
+    return statuses
+
+
+def drain(batch_size=500, worker='default') -> dict:
+    """
+    Write one batch off the queue
+    :return: dict of state -> number of items
+    """
+    r = get_redis()
+    pipe = r.pipeline()
+    for _ in range(batch_size):
+        pipe.rpoplpush(_queue, _processing(worker))
+    raw = [item for item in pipe.execute() if item is not None]
+    if not raw:
+        return {}
+
+    items = [json.loads(item) for item in raw]
+    statuses = _write(items)
+
+    counts = {}
+    pipe = r.pipeline()
+    for item in items:
+        state, promise_id = statuses[item['tracking_id']]
+        _set_status(pipe, item['tracking_id'], state, item['user_id'], promise_id)
+        counts[state] = counts.get(state, 0) + 1
+    pipe.delete(_processing(worker))
+    pipe.execute()
+    return counts
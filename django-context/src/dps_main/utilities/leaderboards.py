@@ -0,0 +1,112 @@
+"""
+Real-time cause leaderboards kept in redis sorted sets.
+Scores are shifted on every promise write, so a top-N read costs O(log n + N) however many promises there are
+"""
+
+from django.conf import settings
+
+from dps_main.models import Cause
+from . import cachestats
+from .redisclient import get_redis
+
+__all__ = ['BY_AMOUNT', 'BY_PROMISES', 'leaderboard_size', 'record', 'remove_cause', 'top', 'top_causes', 'rebuild']
+
+BY_AMOUNT = 'amount'
+BY_PROMISES = 'promises'
+
+# leaderboard -> the denormalized `Cause` column it mirrors
+_columns = {BY_AMOUNT: 'promised_total', BY_PROMISES: 'promise_count'}
+
+
+def _key(board):
+    return F'dps_main:leaderboard:{board}'
+
+
+def leaderboard_size(limit=None):
+    """
+    Resolve the N in top-N, defaulting to `settings.LEADERBOARD_SIZE` and capped at `settings.LEADERBOARD_MAX_SIZE`
+    :raises ValueError: when `limit` isn't a positive integer
+    """
+    limit = int(limit or getattr(settings, 'LEADERBOARD_SIZE', 5))
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, getattr(settings, 'LEADERBOARD_MAX_SIZE', 100))
+
+
+def record(cause_id, count, amount):
+    """
+    Shift the scores of a cause by a number of promises and an amount
+    """
+    pipe = get_redis().pipeline()
+    if count:
+        pipe.zincrby(name=_key(BY_PROMISES), amount=count, value=cause_id)
+    if amount:
+        pipe.zincrby(name=_key(BY_AMOUNT), amount=amount, value=cause_id)
+    pipe.execute()
+
+
+def remove_cause(cause_id):
+    """
+    Drop a cause from all leaderboards
+    """
+    pipe = get_redis().pipeline()
+    for board in _columns:
+        pipe.zrem(_key(board), cause_id)
+    pipe.execute()
+
+
+def top(board, limit=None):
+    """
+    The highest ranked causes on a leaderboard
+    :return: list of (cause_id, score)
+    """
+    limit = leaderboard_size(limit)
+    return [(int(member), score) for member, score in
+            get_redis().zrevrange(_key(board), 0, limit - 1, withscores=True)]
+
+
+def top_causes(board, limit=None):
+    """
+    The highest ranked causes on a leaderboard, as `Cause` instances in rank order
+    :return: list
+    """
+    limit = leaderboard_size(limit)
+    ranked = [cause_id for cause_id, _ in top(board, limit)]
+    causes = Cause.objects.in_bulk(ranked)
+    result = [causes[cause_id] for cause_id in ranked if cause_id in causes]
+    if len(result) < limit:
+        # fewer causes have been promised than were asked for, pad with the unranked ones
+        cachestats.miss('leaderboard')
+        result += list(Cause.objects.exclude(pk__in=[cause.id for cause in result])
+                       .order_by(F'-{_columns[board]}')[:limit - len(result)])
+    else:
+        cachestats.hit('leaderboard')
+    return result
+
+
+def rebuild(cause_ids=None):
+    """
+    Rebuild the leaderboards from the denormalized aggregates on causes.
+    All causes are rebuilt if `cause_ids` isn't supplied
+    :return: int, the number of causes ranked
+    """
+    q = Cause.objects.order_by().filter(promise_count__gt=0)
+    pipe = get_redis().pipeline()
+    if cause_ids is None:
+        for board in _columns:
+            pipe.delete(_key(board))
+    else:
+        cause_ids = list(cause_ids)
+        if not cause_ids:
+            return 0
+        q = q.filter(pk__in=cause_ids)
+        for board in _columns:
+            pipe.zrem(_key(board), *cause_ids)
+
+    size = 0
+    for cause_id, count, total in q.values_list('id', 'promise_count', 'promised_total').iterator():
+        pipe.zincrby(name=_key(BY_PROMISES), amount=count, value=cause_id)
+        pipe.zincrby(name=_key(BY_AMOUNT), amount=total, value=cause_id)
+        size += 1
+    pipe.execute()
+    return size
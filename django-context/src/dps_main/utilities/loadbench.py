@@ -0,0 +1,209 @@
+"""
+HTTP load benchmark for the app's hot endpoints.
+Requests are driven from a pool of threads, each logged in as a user of its own, either through the WSGI handler
+in-process or against a running server. Latency percentiles and throughput are reported per endpoint, along with
+queries per request when running in-process
+"""
+
+from collections import namedtuple, Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.cookiejar import CookieJar
+from importlib import import_module
+from math import ceil
+from random import Random
+from timeit import default_timer
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import build_opener, HTTPCookieProcessor, Request
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .actions import ActionHelper
+
+__all__ = ['Endpoint', 'ENDPOINTS', 'InProcessSession', 'RemoteSession', 'percentile', 'run']
+
+# `path` is called with the session's available cause ids and the request's index
+Endpoint = namedtuple('Endpoint', 'name method admin path')
+
+
+def _promise_data():
+    return {'amount': 1000.0, 'target_date': (date.today() + timedelta(days=30)).isoformat()}
+
+
+ENDPOINTS = (
+    Endpoint('home', 'get', False, lambda causes, i: reverse('home')),
+    Endpoint('make_promise', 'get', False, lambda causes, i: reverse('make_promise', args=[causes[i % len(causes)]])),
+    Endpoint('cause_available', 'get', False, lambda causes, i: reverse('cause-available')),
+    # each request promises a different cause, a session runs out once it has promised all its available causes
+    Endpoint('promise_make', 'post', False, lambda causes, i: reverse('promise-make', args=[causes[i % len(causes)]])),
+    Endpoint('cause_top_amount', 'get', True, lambda causes, i: reverse('cause-top-amount')),
+    Endpoint('cause_top_promised', 'get', True, lambda causes, i: reverse('cause-top-promised')),
+)
+
+
+class InProcessSession(object):
+    """
+    Requests through the WSGI handler, in this process
+    """
+
+    def __init__(self, user, causes):
+        self.causes = causes
+        hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+        self.client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        self.client.force_login(user)
+
+    def request(self, method, path):
+        """
+        :return: tuple of (status code, number of queries)
+        """
+        with CaptureQueriesContext(connection) as queries:
+            if method == 'post':
+                response = self.client.post(path, _promise_data())
+            else:
+                response = self.client.get(path)
+        return response.status_code, len(queries)
+
+
+class RemoteSession(object):
+    """
+    Requests against a running server, which must share this process' database and session store
+    """
+
+    def __init__(self, base_url, user, causes):
+        self.causes = causes
+        self.base_url = base_url.rstrip('/')
+        jar = CookieJar()
+        # the login page hands out the CSRF cookie
+        build_opener(HTTPCookieProcessor(jar)).open(self.base_url + reverse('login')).read()
+        csrf = next((cookie.value for cookie in jar if cookie.name == settings.CSRF_COOKIE_NAME), '')
+        self.headers = {
+            'Cookie': F'{settings.SESSION_COOKIE_NAME}={self._session_key(user)}; {settings.CSRF_COOKIE_NAME}={csrf}',
+            'X-CSRFToken': csrf,
+        }
+        self.opener = build_opener()
+
+    @staticmethod
+    def _session_key(user):
+        """
+        A logged in session for the user, made the way `Client.force_login` does
+        """
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def request(self, method, path):
+        """
+        :return: tuple of (status code, None), queries can't be counted across processes
+        """
+        data = urlencode(_promise_data()).encode() if method == 'post' else None
+        try:
+            with self.opener.open(Request(self.base_url + path, data=data, headers=self.headers,
+                                          method=method.upper())) as response:
+                response.read()
+                return response.status, None
+        except HTTPError as e:
+            return e.code, None
+
+
+def percentile(ordered, p):
+    """
+    Nearest rank percentile of a sorted list
+    """
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, ceil(p / 100 * len(ordered)) - 1))]
+
+
+def _drive(session, endpoint, count, warmup):
+    """
+    Issue `warmup` + `count` requests in turn, in a pool thread
+    :return: list of (started, finished, status code, queries) for the measured requests
+    """
+    samples = []
+    try:
+        for i in range(warmup + count):
+            started = default_timer()
+            status, queries = session.request(endpoint.method, endpoint.path(session.causes, i))
+            if i >= warmup:
+                samples.append((started, default_timer(), status, queries))
+    finally:
+        # pool threads hold connections of their own
+        connections.close_all()
+    return samples
+
+
+def _summarize(samples):
+    latencies = sorted((finished - started) * 1000 for started, finished, _, _ in samples)
+    queries = [queries for _, _, _, queries in samples if queries is not None]
+    # throughput over the span of the measured requests, warmups left out
+    wall = max(sample[1] for sample in samples) - min(sample[0] for sample in samples) if samples else 0
+    return dict(
+        requests=len(samples),
+        rps=round(len(samples) / wall, 2) if wall else None,
+        p50_ms=round(percentile(latencies, 50), 2) if latencies else None,
+        p95_ms=round(percentile(latencies, 95), 2) if latencies else None,
+        p99_ms=round(percentile(latencies, 99), 2) if latencies else None,
+        queries_mean=round(sum(queries) / len(queries), 2) if queries else None,
+        queries_max=max(queries) if queries else None,
+        statuses={str(status): size for status, size in sorted(Counter(status for _, _, status, _ in samples).items())})
+
+
+def _sessions(make_session, concurrency, requests, warmup, seed, admin):
+    """
+    One session per thread. Members are picked with the seed, each with its own shuffled available causes
+    """
+    rng = Random(seed)
+    if admin:
+        user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if not user:
+            raise ValueError('An admin is required')
+        users = [user] * concurrency
+    else:
+        ids = list(User.objects.filter(is_superuser=False, is_active=True).order_by('id').values_list('id', flat=True))
+        if not ids:
+            raise ValueError('Members are required')
+        picked = rng.sample(ids, concurrency) if len(ids) >= concurrency else [rng.choice(ids) for _ in range(concurrency)]
+        found = User.objects.in_bulk(picked)
+        users = [found[_id] for _id in picked]
+
+    sessions = []
+    for user in users:
+        causes = [] if admin else \
+            list(ActionHelper(user).list_available_causes().values_list('id', flat=True)[:requests + warmup])
+        if not causes and not admin:
+            raise ValueError(F'{user} has no causes left to promise')
+        rng.shuffle(causes)
+        sessions.append(make_session(user, causes))
+    return sessions
+
+
+def run(endpoints=ENDPOINTS, concurrency=8, requests=200, warmup=10, seed=0, base_url=None):
+    """
+    Benchmark each endpoint in turn
+    :return: dict of endpoint name -> summary
+    :raises ValueError: when there are no users or causes to drive the endpoints with
+    """
+    if base_url:
+        def make_session(user, causes):
+            return RemoteSession(base_url, user, causes)
+    else:
+        make_session = InProcessSession
+
+    per_thread = max(1, ceil(requests / concurrency))
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for endpoint in endpoints:
+            sessions = _sessions(make_session, concurrency, per_thread, warmup, seed, endpoint.admin)
+            futures = [pool.submit(_drive, session, endpoint, per_thread, warmup) for session in sessions]
+            results[endpoint.name] = _summarize([sample for future in futures for sample in future.result()])
+    return results
@@ -0,0 +1,181 @@
+"""
+Prometheus style metrics.
+Samples are tallied in process memory, which costs a lock and a dict update, and every
+`settings.METRICS_FLUSH_INTERVAL` seconds they are added into a redis hash shared by all worker processes.
+`render` turns that hash into the prometheus text format
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+from time import perf_counter, time
+
+from django.conf import settings
+
+from .redisclient import get_redis
+
+__all__ = ['inc', 'observe', 'flush', 'maybe_flush', 'render', 'timed_methods', 'reset']
+
+logger = logging.getLogger(__name__)
+
+# name -> (type, help)
+METRICS = {
+    'dps_request_duration_seconds': ('histogram', 'Request latency, by url name'),
+    'dps_responses_total': ('counter', 'Responses, by url name and status code'),
+    'dps_db_queries_total': ('counter', 'Database queries run, by url name'),
+    'dps_db_query_seconds_total': ('counter', 'Time spent in database queries, by url name'),
+    'dps_cache_lookups_total': ('counter', 'Cache lookups, by cache and result'),
+    'dps_action_duration_seconds': ('histogram', 'ActionHelper method latency, by method'),
+}
+
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+_key = 'dps_main:metrics'
+
+# field -> value, fields are `name<TAB>labels[<TAB>bucket]`
+_pending = defaultdict(float)
+_lock = threading.Lock()
+_flushed = [time()]
+
+
+def _labels(labels):
+    return ','.join(F'{name}="{value}"' for name, value in sorted(labels.items()))
+
+
+def inc(name, amount=1.0, **labels):
+    """
+    Add to a counter
+    """
+    with _lock:
+        _pending[F'{name}\t{_labels(labels)}'] += amount
+
+
+def observe(name, value, **labels):
+    """
+    Record an observation in a histogram
+    """
+    labels = _labels(labels)
+    bucket = bisect_left(_BUCKETS, value)
+    with _lock:
+        _pending[F'{name}_bucket\t{labels}\t{bucket}'] += 1
+        _pending[F'{name}_sum\t{labels}'] += value
+        _pending[F'{name}_count\t{labels}'] += 1
+
+
+def flush():
+    """
+    Add this process' pending samples into redis
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed[0] = time()
+    if not pending:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for field, value in pending.items():
+            pipe.hincrbyfloat(_key, field, value)
+        pipe.execute()
+    except Exception as e:
+        # metrics must never fail a request, the samples are lost
+        logger.error(F'Unable to flush metrics, {e}')
+
+
+def maybe_flush():
+    """
+    Flush once the interval has elapsed
+    """
+    if time() - _flushed[0] >= getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+        flush()
+
+
+def reset():
+    """
+    Drop all samples, pending and flushed
+    """
+    with _lock:
+        _pending.clear()
+    get_redis().delete(_key)
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _le(bucket):
+    bound = _BUCKETS[bucket]
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def _number(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _series(name, labels, extra=''):
+    labels = ','.join(label for label in (labels, extra) if label)
+    return F'{name}{{{labels}}}' if labels else name
+
+
+def render() -> str:
+    """
+    All samples, from every process, in the prometheus text format
+    """
+    flush()
+    samples = defaultdict(dict)
+    buckets = defaultdict(lambda: [0.0] * len(_BUCKETS))
+    for field, value in get_redis().hgetall(_key).items():
+        parts = _decode(field).split('\t')
+        value = float(_decode(value))
+        if len(parts) == 3:
+            buckets[(parts[0], parts[1])][int(parts[2])] += value
+        else:
+            samples[parts[0]][parts[1]] = value
+
+    lines = []
+    for name, (kind, description) in sorted(METRICS.items()):
+        lines += [F'# HELP {name} {description}', F'# TYPE {name} {kind}']
+        if kind == 'histogram':
+            for (series, labels), counts in sorted(buckets.items()):
+                if series != F'{name}_bucket':
+                    continue
+                total = 0.0
+                for bucket, count in enumerate(counts):
+                    total += count
+                    le = F'le="{_le(bucket)}"'
+                    lines.append(F'{_series(series, labels, le)} {_number(total)}')
+                lines.append(F'{_series(name + "_sum", labels)} {_number(samples[name + "_sum"].get(labels, 0.0))}')
+                lines.append(F'{_series(name + "_count", labels)} {_number(samples[name + "_count"].get(labels, 0.0))}')
+        else:
+            for labels, value in sorted(samples[name].items()):
+                lines.append(F'{_series(name, labels)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _timed(label, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            observe('dps_action_duration_seconds', perf_counter() - started, method=label)
+
+    return wrapper
+
+
+def timed_methods(cls):
+    """
+    Class decorator, times every public method of the class.
+    Methods returning querysets are timed up to the queryset's creation, its evaluation is timed with the request
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_'):
+            continue
+        if isinstance(attr, (staticmethod, classmethod)):
+            setattr(cls, name, type(attr)(_timed(name, attr.__func__)))
+        elif callable(attr):
+            setattr(cls, name, _timed(name, attr))
+    return cls
@@ -3,6 +3,11 @@
 DPS Middlewares
 """
 
+from time import perf_counter
+
+from django.db import connection
+
+from . import metrics, profiler
 from .actions import ActionHelper
 
 
@@ -26,3 +31,47 @@ class DPSActionsMiddleWare(object):
 
         # chain next middleware
         return response
+
+
+class DPSMetricsMiddleWare(DPSActionsMiddleWare):
+    """
+    Records the latency, status and database queries of each request, labelled by the resolved url name
+    """
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def timed_query(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += perf_counter() - started
+
+        started = perf_counter()
+        with connection.execute_wrapper(timed_query):
+            response = super().__call__(request)
+        elapsed = perf_counter() - started
+
+        view = request.resolver_match.view_name if getattr(request, 'resolver_match', None) else 'unresolved'
+        metrics.observe('dps_request_duration_seconds', elapsed, view=view)
+        metrics.inc('dps_responses_total', view=view, status=response.status_code)
+        metrics.inc('dps_db_queries_total', queries[0], view=view)
+        metrics.inc('dps_db_query_seconds_total', queries[1], view=view)
+        metrics.maybe_flush()
+        return response
+
+
+class DPSProfilerMiddleWare(object):
+    """
+    Profiles the requests picked by `profiler.should_profile`, it needs to follow the authentication middleware
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiler.should_profile(request):
+            return profiler.profile(request, self.get_response)
+        return self.get_response(request)
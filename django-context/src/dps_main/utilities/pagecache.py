@@ -0,0 +1,82 @@
+"""
+Full-page cache for anonymous visitors.
+Anonymous visitors all get the same HTML for a given page, so it is rendered once and its bytes are kept in redis,
+with a bounded copy in each process. Keys carry the versions of the page's dependencies (see `dependencies`), so a
+change makes the next request render afresh and older copies just age out. Authenticated users are rendered per user
+as before.
+Lookups are counted as `page.local` and `page.redis` in `cachestats`
+"""
+
+import pickle
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.http import HttpResponse
+
+from . import cachestats, dependencies
+from .redisclient import get_redis
+from .twotier import LRU
+
+__all__ = ['PARAMETERS', 'anonymous_page']
+
+# query params telling pages apart, the others don't change what is rendered
+PARAMETERS = ('after', 'before')
+
+_local = LRU(getattr(settings, 'PAGE_CACHE_SIZE', 200), getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 10))
+
+
+def _cacheable(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated and not len(get_messages(request))
+
+
+def _key(request, tags):
+    versions = '.'.join(str(version) for version in dependencies.generation(*tags))
+    page = '&'.join(F'{name}={request.GET.get(name, "")}' for name in PARAMETERS)
+    return F'dps_main:page:{versions}:{request.get_host()}{request.path}?{page}'
+
+
+def _response(raw):
+    content, content_type = pickle.loads(raw)
+    return HttpResponse(content, content_type=content_type)
+
+
+def anonymous_page(*tags):
+    """
+    View decorator, caches the rendered page for anonymous visitors until one of `tags` is invalidated
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view(request, *args, **kwargs)
+
+            key = _key(request, tags)
+            raw = _local.get(key)
+            if raw is not None:
+                cachestats.hit('page.local')
+                return _response(raw)
+            cachestats.miss('page.local')
+
+            r = get_redis()
+            raw = r.get(key)
+            if raw is not None:
+                cachestats.hit('page.redis')
+                _local.set(key, raw)
+                return _response(raw)
+            cachestats.miss('page.redis')
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            # pages setting cookies are someone's own
+            if response.status_code == 200 and not response.cookies:
+                raw = pickle.dumps((response.content, response['Content-Type']))
+                r.set(key, raw, ex=getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 10))
+                _local.set(key, raw)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination over ('-created', '-id').
+Pages are sought by position rather than offset and no COUNT is issued, so deep pages cost the same as the first
+"""
+
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+__all__ = ['CreatedCursorPagination', 'KeysetPage', 'keyset_page', 'encode_cursor', 'decode_cursor']
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    DRF flavour, newest first
+    """
+    ordering = ('-created', '-id')
+
+
+def encode_cursor(instance) -> str:
+    """
+    An opaque cursor pointing at an instance
+    """
+    return urlsafe_b64encode(F'{instance.created.isoformat()}|{instance.id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    :return: tuple of (created, id)
+    :raises ValueError: when the cursor is malformed
+    """
+    try:
+        created, _id = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created = parse_datetime(created)
+        if created is None:
+            raise ValueError
+        return created, int(_id)
+    except (TypeError, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+class KeysetPage(object):
+    """
+    A page of results, quacks enough like django's `Page` for templates that only walk back and forth
+    """
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+
+
+def keyset_page(queryset, size, after=None, before=None) -> KeysetPage:
+    """
+    Fetch the page of `size` items following the `after` cursor, or preceding the `before` cursor.
+    The first page is returned when neither is supplied
+    :raises ValueError: when a cursor is malformed
+    """
+    if before:
+        created, _id = decode_cursor(before)
+        q = queryset.filter(Q(created__gt=created) | Q(created=created, id__gt=_id)).order_by('created', 'id')
+        items = list(q[:size + 1])
+        has_more = len(items) > size
+        return KeysetPage(list(reversed(items[:size])), has_next=True, has_previous=has_more)
+
+    q = queryset.order_by('-created', '-id')
+    if after:
+        created, _id = decode_cursor(after)
+        q = q.filter(Q(created__lt=created) | Q(created=created, id__lt=_id))
+    items = list(q[:size + 1])
+    return KeysetPage(items[:size], has_next=len(items) > size, has_previous=bool(after))
@@ -24,17 +24,40 @@ def get_factotum(request):
             self.is_make_promise = self.url_name == 'make_promise'
             self.kwargs = self.resolver.kwargs or {}
             self.pk = self.kwargs.get('pk')
+            # the user's promises by cause id, `None` marks a cause known to have no promise
+            self._promises = {}
+
+        @property
+        def context_cause_ids(self) -> set:
+            """
+            Ids of the causes rendered on the current page, as recorded by the view
+            """
+            ids = set(getattr(request, 'context_cause_ids', ()))
+            if self.pk:
+                ids.add(int(self.pk))
+            return ids
+
+        def _load_promises(self, cause_ids):
+            """
+            Fetch the user's promises on all causes not yet looked up, in a single query
+            """
+            cause_ids = set(cause_ids) - self._promises.keys()
+            if cause_ids:
+                self._promises.update(dict.fromkeys(cause_ids))
+                for promise in self.action_helper.get_promises_for_causes(cause_ids):
+                    self._promises[promise.cause_id] = promise
 
         def get_promise_on_cause(self, cause_id) -> Promise:
             """
-            Retrieve the promise on the cause belonging to current user
+            Retrieve the promise on the cause belonging to current user.
+            Promises for every cause on the page are loaded together on first use and kept for the request
             :param cause_id: int
             :return: Promise
             """
-            try:
-                return self.action_helper.get_promise_for_cause(cause_id).get()
-            except Promise.DoesNotExist:
-                pass
+            cause_id = int(cause_id)
+            if cause_id not in self._promises:
+                self._load_promises(self.context_cause_ids | {cause_id})
+            return self._promises[cause_id]
 
         @property
         def promise_for_context_cause(self) -> Promise:
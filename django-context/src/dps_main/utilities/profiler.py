@@ -0,0 +1,134 @@
+"""
+Request profiling on live traffic.
+A request is profiled with cProfile when a staff user asks for it (`?profile` or the `X-DPS-Profile` header), when
+it carries a token from `make_token` (for clients without a staff session), or when it is drawn by
+`settings.PROFILER_SAMPLE_RATE`. The hottest functions and the SQL run are kept in redis for
+`settings.PROFILER_TIMEOUT` seconds and listed in the admin
+"""
+
+import cProfile
+import json
+import pstats
+from datetime import datetime, timezone
+from random import random
+from time import time, perf_counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .redisclient import get_redis
+
+__all__ = ['HEADER', 'PARAMETER', 'make_token', 'should_profile', 'profile', 'recent', 'get']
+
+HEADER = 'HTTP_X_DPS_PROFILE'
+PARAMETER = 'profile'
+
+_salt = 'dps_main.profiler'
+_index = 'dps_main:profiles'
+# functions kept per profile
+_TOP = 40
+
+
+def _key(profile_id):
+    return F'dps_main:profile:{profile_id}'
+
+
+def make_token(max_age=60 * 60):
+    """
+    A token enabling profiling on requests carrying it, until it expires
+    """
+    return signing.dumps({'expires': time() + max_age}, salt=_salt)
+
+
+def _valid_token(token):
+    try:
+        return signing.loads(token, salt=_salt)['expires'] > time()
+    except (signing.BadSignature, KeyError, TypeError):
+        return False
+
+
+def should_profile(request) -> bool:
+    flag = request.META.get(HEADER) or request.GET.get(PARAMETER)
+    if flag is not None:
+        user = getattr(request, 'user', None)
+        if (user and user.is_staff) or _valid_token(flag):
+            return True
+    rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+    return bool(rate) and random() < rate
+
+
+def _functions(profiler):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append(dict(function=F'{filename}:{line}({name})', calls=calls, own=own, cumulative=cumulative))
+    rows.sort(key=lambda row: row['cumulative'], reverse=True)
+    return rows[:_TOP]
+
+
+def profile(request, get_response):
+    """
+    Serve the request under the profiler and store what was found
+    :return: the response
+    """
+    profiler = cProfile.Profile()
+    started = perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        try:
+            profiler.enable()
+        except ValueError:
+            # a request on another thread holds the profiler
+            return get_response(request)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    duration = perf_counter() - started
+
+    profile_id = uuid4().hex
+    match = getattr(request, 'resolver_match', None)
+    found = dict(
+        id=profile_id, started=time(), duration=duration, method=request.method, path=request.get_full_path(),
+        view=match.view_name if match else None, status=response.status_code,
+        user=request.user.get_username() if getattr(request, 'user', None) else '',
+        queries=[dict(sql=query['sql'], time=float(query['time'])) for query in queries.captured_queries],
+        functions=_functions(profiler))
+
+    timeout = getattr(settings, 'PROFILER_TIMEOUT', 60 * 60 * 24)
+    pipe = get_redis().pipeline()
+    pipe.set(_key(profile_id), json.dumps(found), ex=timeout)
+    pipe.lpush(_index, profile_id)
+    pipe.ltrim(_index, 0, getattr(settings, 'PROFILER_MAX_PROFILES', 100) - 1)
+    pipe.execute()
+    return response
+
+
+def recent():
+    """
+    The stored profiles, newest first, without their functions and queries
+    :return: list of dict
+    """
+    r = get_redis()
+    ids = [_id.decode() if isinstance(_id, bytes) else _id for _id in r.lrange(_index, 0, -1)]
+    if not ids:
+        return []
+    profiles = []
+    for raw in r.mget([_key(_id) for _id in ids]):
+        if raw:
+            found = json.loads(raw)
+            found['when'] = datetime.fromtimestamp(found['started'], tz=timezone.utc)
+            found['query_count'] = len(found.pop('queries'))
+            found.pop('functions')
+            profiles.append(found)
+    return profiles
+
+
+def get(profile_id):
+    """
+    :return: dict, or `None` once expired
+    """
+    raw = get_redis().get(_key(profile_id))
+    return json.loads(raw) if raw else None
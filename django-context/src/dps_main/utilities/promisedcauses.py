@@ -0,0 +1,85 @@
+"""
+A per-user redis set of the causes that user has promised.
+It's filled lazily from the database and dropped on that user's promise writes, which lets available causes be
+listed with a plain `NOT IN (...)` over a handful of ids instead of an anti-join against the promises table.
+Each invalidation moves a per-user generation, and a set read from the database is only stored while the generation
+it started under is current, so a read racing a promise write can't store the rows from before the write
+"""
+
+from django.conf import settings
+from redis.exceptions import WatchError
+
+from dps_main.models import Promise
+from . import cachestats
+from .redisclient import get_redis
+
+__all__ = ['promised_cause_ids', 'invalidate']
+
+# redis drops empty sets, so a loaded set always carries this member. Cause ids start at 1
+_LOADED = 0
+
+
+def _key(user_id):
+    return F'dps_main:user:{user_id}:promised-causes'
+
+
+def _generation_key(user_id):
+    return F'dps_main:user:{user_id}:promised-causes:generation'
+
+
+def _timeout():
+    return getattr(settings, 'PROMISED_CAUSES_TIMEOUT', 60 * 60)
+
+
+def _load(user_id):
+    return set(Promise.objects.filter(user_id=user_id).order_by().values_list('cause_id', flat=True))
+
+
+def _store(r, user_id, ids, generation):
+    """
+    Store the set unless it was invalidated since `generation` was read
+    """
+    with r.pipeline() as pipe:
+        try:
+            pipe.watch(_generation_key(user_id))
+            if pipe.get(_generation_key(user_id)) != generation:
+                return
+            pipe.multi()
+            pipe.sadd(_key(user_id), _LOADED, *ids)
+            pipe.expire(_key(user_id), _timeout())
+            pipe.execute()
+        except WatchError:
+            # invalidated meanwhile
+            pass
+
+
+def promised_cause_ids(user_id) -> set:
+    """
+    Ids of causes promised by the user
+    """
+    r = get_redis()
+    key = _key(user_id)
+    members = r.smembers(key)
+    if members:
+        cachestats.hit('promised-causes')
+        return {int(member) for member in members} - {_LOADED}
+
+    cachestats.miss('promised-causes')
+    generation = r.get(_generation_key(user_id))
+    ids = _load(user_id)
+    _store(r, user_id, ids, generation)
+    return ids
+
+
+def invalidate(*user_ids):
+    """
+    Drop the sets of these users, they are refilled on next read
+    """
+    if user_ids:
+        pipe = get_redis().pipeline()
+        pipe.delete(*[_key(user_id) for user_id in user_ids])
+        for user_id in user_ids:
+            # outlives any set stored under the generation it replaces
+            pipe.incr(_generation_key(user_id))
+            pipe.expire(_generation_key(user_id), _timeout())
+        pipe.execute()
@@ -0,0 +1,112 @@
+"""
+Query plan checks for the hot paths.
+Each `ActionHelper` and report queryset is EXPLAINed and its plan checked against what it needs from the indexes:
+no sequential scan over the app's tables, every column it filters on used in an index condition, and its ordering
+read off an index rather than sorted. Scanning a whole index passes for avoiding a sequential scan, so the last two
+are what tell a missing index apart
+"""
+
+import json
+import re
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from dps_main.models import Cause, Promise
+from .actions import ActionHelper
+
+__all__ = ['HotQuery', 'hot_querysets', 'sequential_scans', 'index_conditions', 'sorts', 'check_query_plans']
+
+_hot_tables = (Cause._meta.db_table, Promise._meta.db_table)
+
+# `filtered` are the columns expected in an index condition, `ordered` whether the ordering comes off an index
+HotQuery = namedtuple('HotQuery', 'name queryset filtered ordered')
+
+
+def hot_querysets(member: User, admin: User, cause_ids):
+    """
+    The querysets served on hot paths, shaped as the views consume them
+    :return: list of HotQuery
+    """
+    ah, sh = ActionHelper(member), ActionHelper(admin)
+    cause_id = cause_ids[0]
+    return [
+        HotQuery('list_causes', ah.list_causes()[:15], (), True),
+        HotQuery('list_available_causes', ah.list_available_causes()[:15], (), True),
+        HotQuery('get_cause', Cause.objects.filter(pk=cause_id), ('id',), False),
+        HotQuery('list_promises', ah.list_promises()[:50], ('user_id',), True),
+        HotQuery('list_promises/admin', sh.list_promises()[:50], (), True),
+        HotQuery('get_promise_for_cause', ah.get_promise_for_cause(cause_id), ('cause_id', 'user_id'), False),
+        HotQuery('get_promises_for_causes', ah.get_promises_for_causes(cause_ids), ('cause_id', 'user_id'), False),
+        HotQuery('list_promises_by_cause', sh.list_promises_by_cause(cause_id)[:50], ('cause_id',), True),
+        HotQuery('list_all_causes_promised', ah.list_all_causes_promised()[:50], (), False),
+        HotQuery('promised_cause_ids', Promise.objects.filter(user_id=member.id).order_by().values_list('cause_id'),
+                 ('user_id',), False),
+        HotQuery('top_causes_by_amount', Cause.objects.order_by('-promised_total')[:5], (), True),
+        HotQuery('top_causes_by_promises', Cause.objects.order_by('-promise_count')[:5], (), True),
+    ]
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _nodes(child)
+
+
+def sequential_scans(plan):
+    """
+    Tables that are sequentially scanned anywhere in a JSON plan
+    :return: list
+    """
+    return [node['Relation Name'] for node in _nodes(plan)
+            if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in _hot_tables]
+
+
+def index_conditions(plan):
+    """
+    The index conditions anywhere in a JSON plan
+    :return: list of str
+    """
+    return [node['Index Cond'] for node in _nodes(plan) if node.get('Index Cond')]
+
+
+def sorts(plan):
+    """
+    Whether a JSON plan sorts rows anywhere
+    :return: bool
+    """
+    return any(node.get('Node Type') in ('Sort', 'Incremental Sort') for node in _nodes(plan))
+
+
+def _problems(plan, hot):
+    problems = [F'sequential scan on {table}' for table in sequential_scans(plan)]
+    conditions = ' '.join(index_conditions(plan))
+    problems += [F'no index condition on {column}' for column in hot.filtered
+                 if not re.search(rF'\b{column}\b', conditions)]
+    if hot.ordered and sorts(plan):
+        problems.append('sorted rather than read in index order')
+    return problems
+
+
+def check_query_plans(querysets, natural=False):
+    """
+    EXPLAIN every queryset. Unless `natural`, sequential scans are priced out of the planner, so plans don't depend
+    on how much data is seeded; the index conditions and orderings are checked either way
+    :return: dict of name -> list of problems, for offending querysets only
+    :raises ImproperlyConfigured: when the database isn't postgres
+    """
+    if connection.vendor != 'postgresql':
+        raise ImproperlyConfigured('Query plans can only be checked against postgresql')
+
+    offenders = {}
+    with transaction.atomic():
+        if not natural:
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for hot in querysets:
+            problems = _problems(json.loads(hot.queryset.explain(format='json'))[0]['Plan'], hot)
+            if problems:
+                offenders[hot.name] = problems
+    return offenders
@@ -0,0 +1,61 @@
+"""
+A shared redis connection for the app's own redis data structures (leaderboards etc.)
+The test environment has no redis server configured, so a mock client stands in for it.
+Redis side effects of database writes go through `on_commit` and `now_and_on_commit`, so a redis outage is logged
+instead of failing writes that went through
+"""
+
+import logging
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from redis.exceptions import RedisError
+
+from . import mock_redis
+
+__all__ = ['get_redis', 'guarded', 'on_commit', 'now_and_on_commit']
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    """
+    Lazily connects to the server in `settings.REDIS_SERVER`, the connection is then kept per process
+    :return: redis.StrictRedis
+    """
+    global _client
+    if _client is None:
+        server = getattr(settings, 'REDIS_SERVER', None)
+        _client = redis.StrictRedis(**server) if server else mock_redis()
+    return _client
+
+
+def guarded(what, callback, *args):
+    """
+    Call `callback(*args)`, logging rather than raising when redis fails.
+    `what` completes "Unable to ..." in the log, along with how to recover
+    """
+    try:
+        callback(*args)
+    except RedisError as e:
+        logger.error(F'Unable to {what}, {e}')
+
+
+def on_commit(what, callback, *args):
+    """
+    `guarded` once the transaction commits, for redis state following writes that have gone through by then
+    """
+    transaction.on_commit(lambda: guarded(what, callback, *args))
+
+
+def now_and_on_commit(what, callback, *args):
+    """
+    `guarded` now and once more on commit, for invalidations: a read racing the transaction could otherwise cache
+    what the transaction is about to replace. Should redis fail both times, what the write replaced is served until
+    it expires or the next write invalidates it
+    """
+    guarded(what, callback, *args)
+    on_commit(what, callback, *args)
@@ -1,11 +1,23 @@
-from django.db.models import Sum, Count
-from django.db.models.functions import Coalesce
-from dps_main.models import Cause
+from dps_main.utilities import dependencies, leaderboards, rollups, stampede
 
 
-def top_causes_by_amount(limit=5):
-    return Cause.objects.annotate(sum=Coalesce(Sum('promise__amount'), 0)).order_by('-sum')[:limit]
+def _top_causes(board, limit, window=None):
+    """
+    Ranked causes, recomputed by one worker at a time once promises or causes change.
+    All-time ranks come from the leaderboards, ranks over a window (see `rollups.WINDOWS`) from the rollups
+    """
+    limit = leaderboards.leaderboard_size(limit)
+    if window:
+        return stampede.fetch('top_causes_window', lambda: rollups.top_causes(board, window, limit),
+                              key=F'{board}:{window}:{limit}',
+                              generation=dependencies.generation(dependencies.ROLLUPS, dependencies.CAUSE_LIST))
+    return stampede.fetch('top_causes', lambda: leaderboards.top_causes(board, limit), key=F'{board}:{limit}',
+                          generation=dependencies.generation(dependencies.LEADERBOARDS, dependencies.CAUSE_LIST))
 
 
-def top_causes_by_promises(limit=5):
-    return Cause.objects.annotate(count=Count('promise')).order_by('-count')[:limit]
+def top_causes_by_amount(limit=None, window=None):
+    return _top_causes(leaderboards.BY_AMOUNT, limit, window)
+
+
+def top_causes_by_promises(limit=None, window=None):
+    return _top_causes(leaderboards.BY_PROMISES, limit, window)
@@ -0,0 +1,181 @@
+"""
+Hourly and daily promise rollups per cause: count, sum and distinct users of the promises created in each bucket.
+`run` keeps them current incrementally. It walks promises modified past a high-watermark, and recomputes the buckets
+they fall in from the promises table, so replaying a batch is harmless. Deleted promises leave no row to walk and
+queryset updates leave `modified` as it was, so the buckets of those are queued for recomputation as they go
+(`promise_changed`).
+Promises modified within `settings.ROLLUP_LAG` seconds are left for the next run, which lets transactions in flight
+commit before the watermark passes them.
+A bucket that couldn't be queued, redis failing as the change committed, stays wrong until `rebuild`
+(`manage.py rollpromises --rebuild --once`) recomputes everything, the failure is logged.
+Windowed leaderboards and volume trends read from the rollups rather than from the promises.
+The same job keeps what would otherwise weigh on every promise write: it feeds the promises it walks to the donor
+sketches (`donors`) and applies the amounts queued for the amount statistics (`amountstats`)
+"""
+
+from datetime import timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Count, Sum
+from django.db.models.functions import Trunc
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from dps_main.models import Cause, Promise, CauseHourlyRollup, CauseDailyRollup
+from . import amountstats, dependencies, donors
+from .leaderboards import BY_AMOUNT, BY_PROMISES, leaderboard_size
+from .redisclient import get_redis, on_commit
+
+__all__ = ['HOUR', 'DAY', 'GRANULARITIES', 'WINDOWS', 'promise_changed', 'run', 'rebuild', 'top_causes', 'trend']
+
+HOUR = 'hour'
+DAY = 'day'
+
+# granularity -> (rollup model, bucket span)
+GRANULARITIES = {
+    HOUR: (CauseHourlyRollup, timedelta(hours=1)),
+    DAY: (CauseDailyRollup, timedelta(days=1)),
+}
+
+# window -> (granularity read, span), windows end now
+WINDOWS = {
+    'day': (HOUR, timedelta(days=1)),
+    'week': (DAY, timedelta(days=7)),
+    'month': (DAY, timedelta(days=30)),
+}
+
+# leaderboard -> the rollup column it ranks on
+_columns = {BY_AMOUNT: 'promised_total', BY_PROMISES: 'promise_count'}
+
+_watermark = 'dps_main:rollups:watermark'
+_changed = 'dps_main:rollups:changed'
+
+
+def _truncate(moment, granularity):
+    moment = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == DAY else moment
+
+
+def promise_changed(promise: Promise):
+    """
+    Queue the buckets of a promise removed or changed in place for recomputation, once the change commits
+    """
+    member = F'{promise.cause_id}|{promise.created.isoformat()}'
+    on_commit(F'queue rollup buckets {member}, rollpromises --rebuild recovers them',
+              lambda: get_redis().sadd(_changed, member))
+
+
+def _refresh(pairs):
+    """
+    Recompute the buckets of every granularity holding the (cause id, created) pairs
+    """
+    cause_ids = {cause_id for cause_id, _ in pairs}
+    for granularity, (model, span) in GRANULARITIES.items():
+        buckets = {_truncate(created, granularity) for _, created in pairs}
+        rows = Promise.objects.filter(cause_id__in=cause_ids, created__gte=min(buckets),
+                                      created__lt=max(buckets) + span) \
+            .annotate(bucket=Trunc('created', granularity, tzinfo=timezone.utc)).order_by() \
+            .values('cause_id', 'bucket') \
+            .annotate(promise_count=Count('id'), promised_total=Sum('amount'), user_count=Count('user', distinct=True))
+        # the range spans buckets that weren't touched, only those that were are replaced
+        fresh = [model(**row) for row in rows if row['bucket'] in buckets]
+        model.objects.filter(cause_id__in=cause_ids, bucket__in=buckets).delete()
+        model.objects.bulk_create(fresh)
+
+
+def _read_watermark():
+    raw = get_redis().get(_watermark)
+    if not raw:
+        return None
+    modified, _id = (raw.decode() if isinstance(raw, bytes) else raw).split('|')
+    return parse_datetime(modified), int(_id)
+
+
+def _drain_changed(r):
+    members = r.smembers(_changed)
+    pairs = set()
+    for member in members:
+        cause_id, created = (member.decode() if isinstance(member, bytes) else member).split('|')
+        pairs.add((int(cause_id), parse_datetime(created)))
+    return members, pairs
+
+
+def run(batch_size=5000):
+    """
+    Bring the rollups, the donor sketches and the amount statistics up to date with the promises modified since the
+    last run
+    :return: int, the number of promises rolled up
+    """
+    r = get_redis()
+    until = now() - timedelta(seconds=getattr(settings, 'ROLLUP_LAG', 60))
+    rolled = 0
+    amountstats.drain()
+
+    members, changed = _drain_changed(r)
+    if changed:
+        with transaction.atomic():
+            _refresh(changed)
+        r.srem(_changed, *members)
+
+    while True:
+        q = Promise.objects.filter(modified__lte=until).order_by('modified', 'id')
+        watermark = _read_watermark()
+        if watermark:
+            modified, _id = watermark
+            q = q.filter(Q(modified__gt=modified) | Q(modified=modified, id__gt=_id))
+        batch = list(q.values_list('id', 'modified', 'cause_id', 'created', 'user_id')[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            _refresh({(cause_id, created) for _, _, cause_id, created, _ in batch})
+        donors.add((user_id, cause_id, created) for _, _, cause_id, created, user_id in batch)
+        # set once the rollups are committed, a crash in between replays the batch
+        _id, modified = batch[-1][:2]
+        r.set(_watermark, F'{modified.isoformat()}|{_id}')
+        rolled += len(batch)
+
+    if rolled or changed:
+        dependencies.invalidate(dependencies.ROLLUPS)
+    return rolled
+
+
+def rebuild(batch_size=5000):
+    """
+    Recompute the rollups from scratch
+    :return: int, the number of promises rolled up
+    """
+    r = get_redis()
+    with transaction.atomic():
+        for model, _ in GRANULARITIES.values():
+            model.objects.all().delete()
+        r.delete(_watermark, _changed)
+    return run(batch_size)
+
+
+def top_causes(board, window, limit=None):
+    """
+    The causes ranked highest on a leaderboard over a window ending now, as `Cause` instances in rank order.
+    Windows start on a bucket boundary, so they reach back up to a bucket further than their span
+    :return: list
+    """
+    limit = leaderboard_size(limit)
+    granularity, span = WINDOWS[window]
+    model = GRANULARITIES[granularity][0]
+    ranked = list(model.objects.filter(bucket__gte=_truncate(now() - span, granularity))
+                  .values('cause_id').annotate(score=Sum(_columns[board])).order_by('-score', 'cause_id')
+                  .values_list('cause_id', flat=True)[:limit])
+    causes = Cause.objects.in_bulk(ranked)
+    return [causes[cause_id] for cause_id in ranked if cause_id in causes]
+
+
+def trend(cause_id, granularity=DAY, since=None):
+    """
+    Promise volume of a cause per bucket, oldest first. Buckets without promises are left out
+    :return: list of dict
+    """
+    model = GRANULARITIES[granularity][0]
+    q = model.objects.filter(cause_id=cause_id).order_by('bucket')
+    if since:
+        q = q.filter(bucket__gte=_truncate(since, granularity))
+    return list(q.values('bucket', 'promise_count', 'promised_total', 'user_count'))
@@ -36,12 +36,12 @@ def contains_static_variables(**kwargs):
 
 def create_default_superuser():
     """
-    Creates a default superuser when the first connection is made to the DB
+    Creates a default superuser when the deployment is bootstrapped
     """
     env = os.environ
     user = env.get('DJANGO_SUPER_USER')
     email = env.get('DJANGO_SUPER_EMAIL')
-    password = env.get('DJANGO_SUPER_PASSWORD', User.objects.make_random_password(length=45))
+    password = env.get('DJANGO_SUPER_PASSWORD') or User.objects.make_random_password(length=45)
 
     if user and email and password:
         user_class = get_user_model()
@@ -0,0 +1,101 @@
+"""
+Cache stampede protection for expensive reads.
+A value is cached along with the generation of the data it was computed from (e.g. model versions). Once it ages
+past its policy's `ttl`, or its generation is superseded, it turns stale: one worker takes a redis lock and
+recomputes while the others keep serving the stale value, for up to `stale` more seconds. Fresh values are also
+refreshed early at random (XFetch), more likely the closer they are to expiring and the longer they took to compute,
+so hot values seldom expire at all. When there is no value yet, the workers that didn't get the lock wait for the
+one that did.
+Policies are set per value in `settings.STAMPEDE_POLICIES`
+"""
+
+import pickle
+from math import log
+from random import random
+from time import time, sleep
+from uuid import uuid4
+
+from django.conf import settings
+
+from .redisclient import get_redis
+
+__all__ = ['DEFAULT_POLICY', 'policy', 'fetch', 'forget']
+
+DEFAULT_POLICY = {'ttl': 60, 'stale': 300, 'beta': 1.0, 'lock_timeout': 30}
+
+# seconds between checks for a value another worker is computing
+_POLL = 0.02
+
+
+def policy(name) -> dict:
+    return {**DEFAULT_POLICY, **getattr(settings, 'STAMPEDE_POLICIES', {}).get(name, {})}
+
+
+def _key(name, key):
+    return F'dps_main:stampede:{name}:{key}'
+
+
+def _release(r, lock, token):
+    if r.get(lock) == token.encode():
+        r.delete(lock)
+
+
+def _compute(r, name, key, compute, generation, _policy):
+    started = time()
+    value = compute()
+    delta = time() - started
+    entry = (value, generation, time() + _policy['ttl'], delta)
+    r.set(_key(name, key), pickle.dumps(entry), ex=int(_policy['ttl'] + _policy['stale']) + 1)
+    return value
+
+
+def fetch(name, compute, key='', generation=None):
+    """
+    The value computed by `compute()`, from the cache when it can be
+    :param name: the policy name
+    :param key: tells apart values under the same policy
+    :param generation: the current generation of the data the value derives from, values of another are stale
+    """
+    _policy = policy(name)
+    r = get_redis()
+    raw = r.get(_key(name, key))
+    entry = pickle.loads(raw) if raw else None
+
+    if entry is not None:
+        value, _generation, expires, delta = entry
+        fresh = _generation == generation and time() < expires
+        # XFetch: -log(random()) is exponentially distributed, so early refreshes get likelier near expiry
+        early = fresh and _policy['beta'] and time() - delta * _policy['beta'] * log(random() or 1e-12) >= expires
+        if fresh and not early:
+            return value
+
+    lock, token = _key(name, F'{key}:lock'), uuid4().hex
+    if r.set(lock, token, nx=True, ex=_policy['lock_timeout']):
+        try:
+            return _compute(r, name, key, compute, generation, _policy)
+        finally:
+            _release(r, lock, token)
+
+    if entry is not None:
+        # stale while revalidating, another worker holds the lock
+        return entry[0]
+
+    # nothing to serve yet, wait for the worker computing it
+    waited = 0.0
+    while waited < _policy['lock_timeout']:
+        sleep(_POLL)
+        waited += _POLL
+        raw = r.get(_key(name, key))
+        if raw:
+            return pickle.loads(raw)[0]
+        if not r.exists(lock):
+            break
+    # the other worker gave up or died
+    return compute()
+
+
+def forget(name, key=''):
+    """
+    Drop a cached value outright, the next read recomputes it
+    """
+    get_redis().delete(_key(name, key))
@@ -0,0 +1,166 @@
+"""
+Two-tier cache for hot single-object reads: a bounded in-process LRU in front of redis.
+Values are pickled, so every read gets its own copy. Local entries live for at most `settings.TWO_TIER_CACHE_TIMEOUT`
+seconds. Invalidations drop the redis entry and are published over redis pub/sub, and a listener thread in each
+process drops its local copy as soon as the message arrives.
+Lookups are counted per tier (`<name>.local`, `<name>.redis`) in `cachestats`, and so in the metrics
+"""
+
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from os import getpid
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from dps_main.models import Cause
+from . import cachestats
+from .redisclient import get_redis, now_and_on_commit
+
+__all__ = ['LRU', 'TwoTierCache', 'causes', 'users']
+
+logger = logging.getLogger(__name__)
+
+_channel = 'dps_main:twotier:invalidate'
+_registry = {}
+
+
+class LRU(object):
+    """
+    A thread safe LRU, bounded in size and in the age of its entries
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (value, monotonic() + self.timeout)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class _Listener(object):
+    """
+    Drops local entries as invalidations are published, one thread per process
+    """
+    _pid = None
+
+    @classmethod
+    def ensure(cls):
+        if cls._pid == getpid() or not getattr(settings, 'REDIS_SERVER', None):
+            # running already, or on a mock redis without pub/sub where invalidations are all local anyway
+            return
+        cls._pid = getpid()
+        threading.Thread(target=cls._listen, name='twotier-invalidations', daemon=True).start()
+
+    @staticmethod
+    def _listen():
+        while True:
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(_channel)
+                # messages may have been missed while (re)connecting
+                for cache in _registry.values():
+                    cache.local.clear()
+                for message in pubsub.listen():
+                    name, _, key = message['data'].decode().partition('\t')
+                    if name in _registry:
+                        _registry[name].local.delete(key)
+            except Exception as e:
+                logger.error(F'Two-tier cache invalidations interrupted, {e}')
+                sleep(1)
+
+
+class TwoTierCache(object):
+    """
+    Objects by key, loaded with `load(key)` when neither tier has them. `None` is never cached
+    """
+
+    def __init__(self, name, load, max_size=None, timeout=None, redis_timeout=60 * 60):
+        self.name = name
+        self.load = load
+        self.local = LRU(max_size or getattr(settings, 'TWO_TIER_CACHE_SIZE', 1000),
+                         timeout or getattr(settings, 'TWO_TIER_CACHE_TIMEOUT', 30))
+        self.redis_timeout = redis_timeout
+        _registry[name] = self
+
+    def _key(self, key):
+        return F'dps_main:twotier:{self.name}:{key}'
+
+    def get(self, key):
+        key = str(key)
+        _Listener.ensure()
+        raw = self.local.get(key)
+        if raw is not None:
+            cachestats.hit(F'{self.name}.local')
+            return pickle.loads(raw)
+        cachestats.miss(F'{self.name}.local')
+
+        r = get_redis()
+        raw = r.get(self._key(key))
+        if raw is not None:
+            cachestats.hit(F'{self.name}.redis')
+        else:
+            cachestats.miss(F'{self.name}.redis')
+            value = self.load(key)
+            if value is None:
+                return None
+            raw = pickle.dumps(value)
+            r.set(self._key(key), raw, ex=self.redis_timeout)
+        self.local.set(key, raw)
+        return pickle.loads(raw)
+
+    def _drop(self, keys):
+        self.local.delete(*keys)
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.delete(*[self._key(key) for key in keys])
+        for key in keys:
+            pipe.publish(_channel, F'{self.name}\t{key}')
+        pipe.execute()
+
+    def invalidate(self, *keys):
+        """
+        Drop the keys from both tiers in every process, along with a write, see `redisclient.now_and_on_commit`
+        """
+        keys = [str(key) for key in keys]
+        if keys:
+            now_and_on_commit(F'drop {self.name} {", ".join(keys)} from the two-tier cache', self._drop, keys)
+
+
+# the aggregates move with every promise, they are left to be read from their columns so that promises don't evict
+# the causes most promised
+causes = TwoTierCache('cause', lambda pk: Cause.objects.defer('promise_count', 'promised_total').filter(pk=pk).first())
+users = TwoTierCache('user', lambda pk: get_user_model().objects.filter(pk=pk).first(), redis_timeout=60 * 15)
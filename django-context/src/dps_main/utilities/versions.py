@@ -0,0 +1,61 @@
+"""
+Version counters for the app's models, kept in redis.
+Every write bumps the counter of the model it touched, which makes validators for conditional GETs (ETag /
+Last-Modified) a single round trip instead of a query
+"""
+
+from time import time
+
+from . import cachestats
+from .redisclient import get_redis, now_and_on_commit
+
+__all__ = ['CAUSE', 'PROMISE', 'bump', 'touch', 'current']
+
+CAUSE = 'cause'
+PROMISE = 'promise'
+
+
+def _key(label):
+    return F'dps_main:version:{label}'
+
+
+def bump(*labels):
+    """
+    Advance the version of each model label, stamping it with the current time
+    """
+    pipe = get_redis().pipeline()
+    now = time()
+    for label in labels:
+        pipe.hincrby(_key(label), 'version', 1)
+        pipe.hset(_key(label), 'modified', now)
+    pipe.execute()
+
+
+def touch(*labels):
+    """
+    Bump along with a write, see `redisclient.now_and_on_commit`
+    """
+    now_and_on_commit(F'bump the versions of {", ".join(labels)}', bump, *labels)
+
+
+def current(*labels):
+    """
+    The versions of the model labels along with the time of the latest change amongst them
+    :return: tuple of (tuple of versions, float timestamp)
+    """
+    r = get_redis()
+    pipe = r.pipeline()
+    for label in labels:
+        pipe.hmget(_key(label), 'version', 'modified')
+    rows = pipe.execute()
+
+    versions, modified = [], 0.0
+    for label, (version, stamp) in zip(labels, rows):
+        if stamp is None:
+            # never written since redis was last emptied, start the clock now
+            cachestats.miss('version')
+            stamp = time()
+            r.hsetnx(_key(label), 'modified', stamp)
+        versions.append(int(version or 0))
+        modified = max(modified, float(stamp))
+    return tuple(versions), modified
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
+from django.http import Http404, HttpResponse
 from django.urls import reverse_lazy
 
 from django.views.generic import CreateView, ListView, DetailView, FormView
 
+from dps_main.utilities import metrics
 from dps_main.utilities.actions import ActionHelper
+from dps_main.utilities.promisedcauses import promised_cause_ids
 from ..forms import MakePromiseForm
+from ..models import Cause
 
 
 class RegisterView(CreateView):
@@ -30,6 +35,21 @@ class ActionPropertyMixin(object):
         return self.request.action_helper
 
 
+class ContextCausesMixin(object):
+    """
+    Records the ids of the causes a page renders on the request, so per-cause lookups (`factotum.can_promise`)
+    can be batched in one query.
+    Mixin requires the following defined on the instance:
+    - request
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        causes = [context['object']] if 'object' in context else context.get('object_list') or []
+        self.request.context_cause_ids = [cause.id for cause in causes]
+        return context
+
+
 class AvailableCausesMixin(ActionPropertyMixin):
     """
     Mixin enables to work with available clauses
@@ -39,18 +59,42 @@ class AvailableCausesMixin(ActionPropertyMixin):
         return self.action_helper.list_available_causes()
 
 
-class CausesListView(AvailableCausesMixin, ListView):
+class CausesListView(ContextCausesMixin, AvailableCausesMixin, ListView):
     """
-    Show a list of causes
+    Show a list of causes, walked back and forth with `?after=` / `?before=` cursors
     """
     paginate_by = 15
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Keyset pagination in place of django's `Paginator`, which pays for a COUNT and an OFFSET scan.
+        The page is cached, `queryset` is left unevaluated
+        """
+        try:
+            page = self.action_helper.page_available_causes(page_size, after=self.request.GET.get('after'),
+                                                            before=self.request.GET.get('before'))
+        except ValueError:
+            raise Http404('Invalid cursor')
+        return None, page, page.object_list, page.has_other_pages()
+
 
-class CausesPromiseDetailsView(AvailableCausesMixin, DetailView):
+class CausesPromiseDetailsView(ContextCausesMixin, AvailableCausesMixin, DetailView):
     """
     Show the detail of a `cause` and prepare it to accept a promise
     """
 
+    def get_object(self, queryset=None):
+        """
+        The cause comes from the two-tier cache, it's only shown while it can be promised
+        """
+        try:
+            cause = self.action_helper.get_cause(self.kwargs.get('pk'))
+        except Cause.DoesNotExist:
+            raise Http404('No cause found')
+        if self.request.user.is_authenticated and cause.id in promised_cause_ids(self.request.user.id):
+            raise Http404('No cause found')
+        return cause
+
     def get_context_data(self, **kwargs):
         context = super(CausesPromiseDetailsView, self).get_context_data(**kwargs)
         form = MakePromiseForm()
@@ -76,3 +120,12 @@ class MakePromiseFormView(ActionPropertyMixin, FormView):
         form.make_promise(self.action_helper)
         self.success_url = form.cleaned_data.get('current_url', self.success_url)
         return super().form_valid(form)
+
+
+def metrics_view(request):
+    """
+    Metrics in the prometheus text format, for staff and the addresses in `settings.METRICS_ALLOWED_IPS`
+    """
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])):
+        raise Http404()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,13 +1,26 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError, NotFound
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
 from dps_main.permissions.rest_framework import IsAdminSuper, IsAuthenticatedOwnerOrSuperForPromises, \
     IsAuthenticatedAdmin
-from dps_main.serializers import ContactSerializer, CauseSerializer, PromiseSerializer
-from dps_main.models import Contact, Cause, Promise
+from dps_main.serializers import ContactSerializer, CauseSerializer, PromiseSerializer, CauseValuesSerializer, \
+    PromiseValuesSerializer
+from dps_main.models import Contact, Cause, Promise, CauseAmountStats
+from dps_main.utilities import aggregates, amountstats, dependencies, donors, export, ingestion, rollups, stampede, \
+    versions
+from dps_main.utilities.conditional import ConditionalGetMixin
+from dps_main.utilities.leaderboards import leaderboard_size
+from dps_main.utilities.pagination import CreatedCursorPagination
 from dps_main.utilities.actions import ActionHelper
 from dps_main.utilities.reports import top_causes_by_amount, top_causes_by_promises
 
@@ -41,7 +54,7 @@ class UsefulComponentsMixins(object):
             return []
 
 
-class ModelViewSet(UsefulComponentsMixins, viewsets.ModelViewSet):
+class ModelViewSet(ConditionalGetMixin, UsefulComponentsMixins, viewsets.ModelViewSet):
     """
     Replace permissions with the ones on actions if present.
     DRF doesn't do that originally
@@ -50,6 +63,36 @@ class ModelViewSet(UsefulComponentsMixins, viewsets.ModelViewSet):
     # add up action permissions instead of replacing them
     action_permissions_are_inclusive = False
 
+    # actions rendered from `.values()` rows, mapped to their read-only serializers
+    values_serializers = {}
+
+    @property
+    def values_serializer_class(self):
+        return self.values_serializers.get(self.action)
+
+    def get_serializer_class(self):
+        return self.values_serializer_class or super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.values_serializer_class:
+            return self.values_serializer_class.prepare(queryset)
+        return queryset
+
+    def _export(self, request, model, export_format):
+        """
+        Stream a model's rows, filtered by the `cause`, `user`, `since` and `until` query params, see `export`
+        """
+        try:
+            lookups = export.parse_filters(model, **{name: request.query_params.get(name)
+                                                     for name in ('cause', 'user', 'since', 'until')})
+            stream = export.render(model, export_format, **lookups)
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        response = StreamingHttpResponse(stream, content_type=export.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = F'attachment; filename="{model}.{export_format}"'
+        return response
+
     def get_permissions(self):
         if self.action_permissions_are_inclusive:
             self.permission_classes = list(set((self.permission_classes or []) + self.action_permissions))
@@ -72,8 +115,29 @@ class CauseViewSet(ModelViewSet):
     """
     queryset = Cause.objects.all()
     serializer_class = CauseSerializer
+    pagination_class = CreatedCursorPagination
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
     action_permissions_are_inclusive = True
+    values_serializers = {
+        'list': CauseValuesSerializer,
+        'retrieve': CauseValuesSerializer,
+        'available': CauseValuesSerializer,
+        'promised': CauseValuesSerializer,
+        'promises': PromiseValuesSerializer,
+    }
+    conditional_models = {
+        'list': (versions.CAUSE,),
+        'retrieve': (versions.CAUSE,),
+        'available': (versions.CAUSE, versions.PROMISE),
+        'promised': (versions.CAUSE, versions.PROMISE),
+        'promises': (versions.PROMISE,),
+        'promise': (versions.PROMISE,),
+        'top_amount': (versions.CAUSE, versions.PROMISE),
+        'top_promised': (versions.CAUSE, versions.PROMISE),
+        'stats': (versions.CAUSE, versions.PROMISE),
+        # rollup and donor reads are left out: they change when `rollups.run` writes, as their window slides and as
+        # the week turns, none of which moves the version counters
+    }
 
     def get_permissions(self):
         """
@@ -85,16 +149,36 @@ class CauseViewSet(ModelViewSet):
         return super().get_permissions()
 
     def get_serializer_class(self):
-        if any([self.action == item for item in ('promise', 'promises',)]):
+        if not self.values_serializer_class and any([self.action == item for item in ('promise', 'promises',)]):
             return PromiseSerializer
         return super().get_serializer_class()
 
+    def list(self, request, *args, **kwargs):
+        """
+        The first page is the hottest read of all, it's recomputed by one worker at a time once causes change
+        """
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        data = stampede.fetch('cause_first_page', lambda: super(CauseViewSet, self).list(request, *args, **kwargs).data,
+                              key=request.get_host(), generation=dependencies.generation(dependencies.CAUSE_LIST))
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Cached until the cause itself changes, promises to it don't show here
+        """
+        pk = kwargs.get(self.lookup_field)
+        data = dependencies.cached('cause-detail', F'{request.get_host()}:{pk}', [dependencies.cause(pk)],
+                                   lambda: super(CauseViewSet, self).retrieve(request, *args, **kwargs).data)
+        return Response(data)
+
     def _respond_with_instances(self, causes, detail=False):
         """
         Returns instances to DRF
         """
 
         if not detail:
+            causes = self.filter_queryset(causes)
             page = self.paginate_queryset(causes)
             if page is not None:
                 serializer = self.get_serializer(page, many=not detail)
@@ -103,12 +187,28 @@ class CauseViewSet(ModelViewSet):
         serializer = self.get_serializer(causes, many=not detail)
         return Response(serializer.data)
 
+    def _leaderboard_limit(self):
+        """
+        The N for top-N actions, read from the `limit` query param
+        """
+        try:
+            return leaderboard_size(self.request.query_params.get('limit'))
+        except ValueError:
+            raise ValidationError({'limit': 'A positive integer is expected'})
+
     @action(detail=False, methods=['get'])
     def available(self, request):
         """
-        Available causes are causes not yet promised by user
+        Available causes are causes not yet promised by user.
+        Pages are cached until causes change or the user's own promises do
         """
-        return self._respond_with_instances(self.action_helper.list_available_causes())
+        tags = [dependencies.CAUSE_LIST]
+        if request.user.is_authenticated:
+            tags.append(dependencies.availability(request.user.id))
+        data = dependencies.cached(
+            'available-causes-api', F'{request.get_host()}:{request.user.id}:{request.get_full_path()}', tags,
+            lambda: self._respond_with_instances(self.action_helper.list_available_causes()).data)
+        return Response(data)
 
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticatedAdmin])
     def promises(self, request, pk=None):
@@ -131,25 +231,148 @@ class CauseViewSet(ModelViewSet):
         """
         return self._respond_with_instances(self.action_helper.list_all_causes_promised())
 
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='top/amount')
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminSuper], url_name='export',
+            url_path=r'export\.(?P<export_format>csv|ndjson)')
+    def export_rows(self, request, export_format=None):
+        """
+        admin only, streams every cause as CSV or NDJSON, from `cause/export.csv/` or `cause/export.ndjson/`
+        """
+        return self._export(request, export.CAUSES, export_format)
+
+    # ranked reports are short lists held in rank order, so they keep page numbers
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='top/amount',
+            pagination_class=PageNumberPagination)
     def top_amount(self, request):
         """
         all causes which user has promised
         """
-        return self._respond_with_instances(top_causes_by_amount())
+        return self._respond_with_instances(top_causes_by_amount(self._leaderboard_limit()))
 
-    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='top/promised')
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='top/promised',
+            pagination_class=PageNumberPagination)
     def top_promised(self, request):
         """
         all causes which user has promised
         """
-        return self._respond_with_instances(top_causes_by_promises())
+        return self._respond_with_instances(top_causes_by_promises(self._leaderboard_limit()))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_name='top-amount-window',
+            url_path=F'top/amount/(?P<window>{"|".join(rollups.WINDOWS)})', pagination_class=PageNumberPagination)
+    def top_amount_window(self, request, window=None):
+        """
+        causes promised the most over the last day, week or month
+        """
+        return self._respond_with_instances(top_causes_by_amount(self._leaderboard_limit(), window))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_name='top-promised-window',
+            url_path=F'top/promised/(?P<window>{"|".join(rollups.WINDOWS)})', pagination_class=PageNumberPagination)
+    def top_promised_window(self, request, window=None):
+        """
+        causes promised the most times over the last day, week or month
+        """
+        return self._respond_with_instances(top_causes_by_promises(self._leaderboard_limit(), window))
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticatedAdmin])
+    def trend(self, request, pk=None):
+        """
+        admin only, promise volume of a cause per `granularity` (hour or day) over the last `days`
+        """
+        granularity = request.query_params.get('granularity', rollups.DAY)
+        if granularity not in rollups.GRANULARITIES:
+            raise ValidationError({'granularity': F'One of {", ".join(rollups.GRANULARITIES)} is expected'})
+        try:
+            days = int(request.query_params.get('days', 30))
+            if days < 1:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'days': 'A positive integer is expected'})
+        return Response(rollups.trend(pk, granularity, since=timezone.now() - timedelta(days=days)))
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticatedAdmin])
+    def stats(self, request, pk=None):
+        """
+        admin only, the typical amount promised to a cause next to its target: count, mean, standard deviation,
+        extremes and approximate quantiles, as of the last rollup run
+        """
+        cause = Cause.objects.filter(pk=pk).values('id', 'target_amount').first()
+        if cause is None:
+            raise NotFound()
+        stats = CauseAmountStats.objects.filter(cause_id=pk).first()
+        return Response({'cause': cause['id'], 'target_amount': cause['target_amount'], **amountstats.summary(stats),
+                         'quantile_accuracy': amountstats.ACCURACY})
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='donors',
+            url_name='donors')
+    def cause_donors(self, request, pk=None):
+        """
+        admin only, approximate distinct users who promised to a cause, ever and this week, as of the last rollup run
+        """
+        if not Cause.objects.filter(pk=pk).exists():
+            raise NotFound()
+        this_week = donors.weeks(timezone.now(), timezone.now())
+        return Response({'cause': int(pk), 'donors': donors.count([pk]), 'this_week': donors.count([pk], this_week),
+                         'error': donors.ERROR})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticatedAdmin], url_path='donors')
+    def reach(self, request):
+        """
+        admin only, approximate distinct users who promised to any of the `cause` ids (repeated) over the last
+        `weeks`, this one included. Either left out covers them all
+        """
+        try:
+            cause_ids = [int(cause_id) for cause_id in request.query_params.getlist('cause')] or None
+        except ValueError:
+            raise ValidationError({'cause': 'Cause ids are expected'})
+        in_weeks = None
+        if request.query_params.get('weeks'):
+            try:
+                size = int(request.query_params['weeks'])
+                if size < 1:
+                    raise ValueError
+            except ValueError:
+                raise ValidationError({'weeks': 'A positive integer is expected'})
+            in_weeks = donors.weeks(timezone.now() - timedelta(weeks=size - 1), timezone.now())
+        return Response({'causes': cause_ids, 'weeks': in_weeks and [week.isoformat() for week in in_weeks],
+                         'donors': donors.count(cause_ids, in_weeks), 'error': donors.ERROR})
 
 
 class PromiseViewSet(ModelViewSet):
     queryset = Promise.objects.all()
     serializer_class = PromiseSerializer
+    pagination_class = CreatedCursorPagination
     permission_classes = [IsAuthenticatedOwnerOrSuperForPromises]
+    # retrieve stays on instances, object permissions inspect the promise's owner
+    values_serializers = {
+        'list': PromiseValuesSerializer,
+    }
+    conditional_models = {
+        'list': (versions.PROMISE,),
+        'retrieve': (versions.PROMISE,),
+    }
+
+    def perform_create(self, serializer):
+        """
+        Keep the cause aggregates in step with the new promise
+        """
+        with transaction.atomic():
+            aggregates.promise_created(serializer.save())
+
+    def perform_update(self, serializer):
+        """
+        Keep the cause aggregates in step with the changed promise
+        """
+        with transaction.atomic():
+            previous = Promise.objects.select_for_update().get(pk=serializer.instance.pk)
+            aggregates.promise_updated(previous, serializer.save())
+
+    def perform_destroy(self, instance):
+        """
+        Keep the cause aggregates in step with the removed promise
+        """
+        with transaction.atomic():
+            previous = Promise.objects.select_for_update().get(pk=instance.pk)
+            instance.delete()
+            aggregates.promise_deleted(previous)
 
     def update(self, request, *args, **kwargs):
         """
@@ -161,6 +384,15 @@ class PromiseViewSet(ModelViewSet):
                                  user=request.user.id))
         return super().update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminSuper], url_name='export',
+            url_path=r'export\.(?P<export_format>csv|ndjson)')
+    def export_rows(self, request, export_format=None):
+        """
+        admin only, streams every promise as CSV or NDJSON without paging, from `promise/export.csv/` or
+        `promise/export.ndjson/`
+        """
+        return self._export(request, export.PROMISES, export_format)
+
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def make(self, request, pk=None):
         """
@@ -173,6 +405,14 @@ class PromiseViewSet(ModelViewSet):
         data.update(dict(cause=pk, user=request.user.id))
         serializer = self.get_serializer(data=data, many=False)
         serializer.is_valid(raise_exception=True)
+
+        if ingestion.is_enabled():
+            tracking_id = self.action_helper.queue_promise_to_cause(
+                pk, amount=serializer.validated_data['amount'], target_date=serializer.validated_data['target_date'])
+            return Response({'tracking_id': tracking_id, 'state': ingestion.QUEUED,
+                             'status': reverse('promise-ingestion', args=[tracking_id])},
+                            status=status.HTTP_202_ACCEPTED)
+
         promise_data = data.copy()
         promise_data.pop('cause')
         promise = self.action_helper.add_promise_to_cause(pk, **promise_data)
@@ -183,3 +423,17 @@ class PromiseViewSet(ModelViewSet):
         data[api_settings.URL_FIELD_NAME] = reverse('promise-detail', args=[promise.id])
         headers = self.get_success_headers(data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated],
+            url_path=r'ingestion/(?P<tracking_id>[0-9a-f]+)', url_name='ingestion')
+    def ingestion_status(self, request, tracking_id=None):
+        """
+        The state of a promise queued for asynchronous writing
+        """
+        found = ingestion.status(tracking_id)
+        if not found or not (found['user_id'] == request.user.id or request.user.is_superuser):
+            raise NotFound()
+        found['tracking_id'] = tracking_id
+        if found['promise_id']:
+            found[api_settings.URL_FIELD_NAME] = reverse('promise-detail', args=[found['promise_id']])
+        return Response(found)